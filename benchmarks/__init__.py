@@ -0,0 +1 @@
+"""Benchmarks of the datatables request processing on synthetic tables, run with python -m benchmarks"""
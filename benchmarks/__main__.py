@@ -0,0 +1,55 @@
+"""Benchmark datatable requests on synthetic tables and report the timings as json"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine
+
+from benchmarks.data import get_engine
+from benchmarks.data import populate
+from benchmarks.runner import get_environment
+from benchmarks.runner import run_scenario
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.scenarios import Scenario
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000], help='table sizes to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per scenario')
+    parser.add_argument('--scenario', nargs='+', choices=[s.name for s in SCENARIOS], help='scenarios to run')
+    parser.add_argument('--url', help='database url, e.g. of a local postgres, SQLite files by default')
+    parser.add_argument('--data-dir', type=Path, default=Path('.benchmarks'), help='directory of the SQLite files')
+    parser.add_argument('--output', type=Path, help='write the json results to the file instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> None:
+    args: argparse.Namespace = _parse_args(argv)
+    scenarios: list[Scenario] = [s for s in SCENARIOS if args.scenario is None or s.name in args.scenario]
+    results: list[dict[str, Any]] = []
+    environment: dict[str, Any] = {}
+    for rows in args.rows:
+        engine: Engine = get_engine(args.url, args.data_dir, rows)
+        populate(engine, rows)
+        environment = get_environment(engine)
+        for scenario in scenarios:
+            if scenario.max_rows is not None and rows > scenario.max_rows:
+                continue
+            result: dict[str, Any] = run_scenario(engine, scenario, rows, args.repeat)
+            # progress, the results go to stdout or the output file
+            print(f'{rows:>10} {scenario.name:<28} {result["median_ms"]:>10.2f} ms', file=sys.stderr)
+            results.append(result)
+        engine.dispose()
+    report: str = json.dumps({'environment': environment, 'results': results}, indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        args.output.write_text(report)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
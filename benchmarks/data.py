@@ -0,0 +1,93 @@
+import logging
+import random
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Engine
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import Numeric
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import Text
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy.future import create_engine
+
+CATEGORIES: list[str] = [f'category_{i}' for i in range(20)]
+WORDS: list[str] = ['krusty', 'krab', 'pizza', 'jellyfish', 'bubble', 'anchor', 'coral', 'reef', 'kelp', 'shell']
+
+metadata: MetaData = MetaData()
+items: Table = Table(
+    'bench_items',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(50), nullable=False),
+    Column('email', String(100), nullable=False),
+    Column('category', String(20), nullable=False),
+    Column('amount', Numeric(10, 2), nullable=False),
+    Column('created', DateTime, nullable=False),
+    Column('description', Text, nullable=False),
+)
+column_names: list[str] = ['id', 'name', 'email', 'category', 'amount', 'created', 'description']
+
+
+def get_engine(url: str | None, directory: Path, rows: int) -> Engine:
+    """
+    Get the engine of the benchmark database, a SQLite file per table size in the directory by default
+    :param url: str | None - database url, e.g. of a local postgres, the table sizes share the database then
+    :param directory: Path - directory of the SQLite files
+    :param rows: int - number of rows of the table
+    """
+    if url is not None:
+        return create_engine(url)
+    directory.mkdir(parents=True, exist_ok=True)
+    return create_engine(f'sqlite:///{directory / f"bench_{rows}.db"}')
+
+
+def _generate_rows(rows: int, seed: int) -> Iterator[dict[str, Any]]:
+    generator: random.Random = random.Random(seed)
+    start: datetime = datetime(2020, 1, 1)
+    for i in range(1, rows + 1):
+        words: list[str] = generator.choices(WORDS, k=3)
+        yield {
+            'id': i,
+            'name': f'{words[0]}_{i}',
+            'email': f'{words[1]}.{i}@example.org',
+            'category': generator.choice(CATEGORIES),
+            'amount': Decimal(generator.randrange(100, 1_000_000)) / 100,
+            'created': start + timedelta(minutes=generator.randrange(0, 60 * 24 * 365 * 4)),
+            # a wide column, like the notes or json documents of real tables
+            'description': ' '.join(generator.choices(WORDS, k=60)),
+        }
+
+
+def populate(engine: Engine, rows: int, seed: int = 0, batch_size: int = 10_000) -> bool:
+    """
+    Create and fill the benchmark table with deterministic synthetic rows, unless it has the number of rows already
+    :return: bool - whether the table was (re)created
+    """
+    if inspect(engine).has_table(items.name):
+        with engine.connect() as connection:
+            if connection.scalar(select(func.count()).select_from(items)) == rows:
+                return False
+    logging.info('generating %s rows in %s', rows, engine.url)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    batch: list[dict[str, Any]] = []
+    with engine.begin() as connection:
+        for row in _generate_rows(rows, seed):
+            batch.append(row)
+            if len(batch) == batch_size:
+                connection.execute(items.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(items.insert(), batch)
+    return True
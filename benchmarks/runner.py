@@ -0,0 +1,78 @@
+import platform
+import statistics
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+
+import sqlalchemy
+from sqlalchemy import Engine
+
+import datatables
+from benchmarks.data import column_names
+from benchmarks.data import items
+from benchmarks.scenarios import Scenario
+from benchmarks.scenarios import get_callbacks
+from datatables import DataTable
+from datatables import DataTableDefinition
+
+
+def _get_query_params(scenario: Scenario, definition: DataTableDefinition, rows: int) -> dict[str, Any]:
+    params: dict[str, Any] = scenario.get_query_params(column_names, rows)
+    if scenario.seek:
+        # get the cursor of the page before the requested page
+        start: int = scenario.get_start(rows)
+        previous: dict[str, Any] = scenario.get_query_params(column_names, rows)
+        previous['start'] = str(max(0, start - scenario.length))
+        output: dict[str, Any] = definition.execute(previous)
+        if output.get('cursor'):
+            params['cursor'] = output['cursor']
+    return params
+
+
+def run_scenario(engine: Engine, scenario: Scenario, rows: int, repeat: int) -> dict[str, Any]:
+    """
+    Time the datatable request of the scenario, the first run warms up the caches and is not timed
+    :return: dict[str, Any] - the timings in milliseconds and the sizes of the result
+    """
+    definition: DataTableDefinition = DataTableDefinition(
+        table=items,
+        column_names=column_names,
+        engine=engine,
+        callbacks=get_callbacks() if scenario.callbacks else None,
+        **scenario.options,
+    )
+    params: dict[str, Any] = _get_query_params(scenario, definition, rows)
+    timings: list[float] = []
+    output: dict[str, Any] = {}
+    for i in range(repeat + 1):
+        started: float = time.perf_counter()
+        output = DataTable(request_params=params, definition=definition).output_result()
+        if i > 0:
+            timings.append((time.perf_counter() - started) * 1000)
+        if output.get('error'):
+            raise RuntimeError(f'{scenario.name} failed: {output["error"]}')
+    return {
+        'rows': rows,
+        'scenario': scenario.name,
+        'repeat': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'records_filtered': output['recordsFiltered'],
+        'returned': len(output['data']),
+    }
+
+
+def get_environment(engine: Engine) -> dict[str, Any]:
+    """Describe the environment of the benchmark run, to compare results of the same environment only"""
+    return {
+        'datatables': datatables.__version__,
+        'sqlalchemy': sqlalchemy.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dialect': engine.dialect.name,
+        'driver': engine.dialect.driver,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+    }
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from datatables import DTDataCallbacks
+
+
+def create_query_params(
+    column_names: list[str],
+    search: str = '',
+    start: int = 0,
+    length: int = 10,
+    order: list[tuple[int, str]] | None = None,
+    column_search: dict[int, str] | None = None,
+) -> dict[str, Any]:
+    """Build the query parameters of a DataTables server side request"""
+    params: dict[str, Any] = {
+        'draw': '1',
+        'start': str(start),
+        'length': str(length),
+        'search[value]': search,
+        'search[regex]': 'false',
+    }
+    for i, name in enumerate(column_names):
+        params[f'columns[{i}][data]'] = name
+        params[f'columns[{i}][name]'] = name
+        params[f'columns[{i}][searchable]'] = 'true'
+        params[f'columns[{i}][orderable]'] = 'true'
+        params[f'columns[{i}][search][value]'] = (column_search or {}).get(i, '')
+        params[f'columns[{i}][search][regex]'] = 'false'
+    for i, (column, direction) in enumerate(order or [(0, 'asc')]):
+        params[f'order[{i}][column]'] = str(column)
+        params[f'order[{i}][dir]'] = direction
+    return params
+
+
+def get_callbacks() -> DTDataCallbacks:
+    callbacks: DTDataCallbacks = DTDataCallbacks()
+    callbacks.set_row_id_getter(lambda row: f'row_{row["id"]}')
+    callbacks.set_row_class_getter(lambda row: row['category'])
+    callbacks.set_row_attr_getter(lambda row: {'title': row['name']})
+    return callbacks
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    A benchmarked datatable request
+    :param name: str - name of the scenario in the results
+    :param depth: float - position of the requested page, 0 for the first and 1 for the last page of the table
+    :param length: int - page size, -1 for all rows
+    :param search: str - global search value
+    :param column_search: dict[int, str] - column search values by column index
+    :param order: list[tuple[int, str]] - order criteria, column index and direction
+    :param options: dict[str, Any] - DataTableDefinition options, e.g. keyset_column
+    :param callbacks: bool - run row callbacks
+    :param seek: bool - request the page with the keyset cursor of the previous page
+    :param max_rows: int | None - skip the scenario for larger tables
+    """
+
+    name: str
+    depth: float = 0
+    length: int = 10
+    search: str = ''
+    column_search: dict[int, str] = field(default_factory=dict)
+    order: list[tuple[int, str]] = field(default_factory=lambda: [(0, 'asc')])
+    options: dict[str, Any] = field(default_factory=dict)
+    callbacks: bool = False
+    seek: bool = False
+    max_rows: int | None = None
+
+    def get_start(self, rows: int) -> int:
+        if self.length < 0:
+            return 0
+        return max(0, min(int(rows * self.depth), rows - self.length))
+
+    def get_query_params(self, column_names: list[str], rows: int) -> dict[str, Any]:
+        return create_query_params(
+            column_names,
+            search=self.search,
+            start=self.get_start(rows),
+            length=self.length,
+            order=self.order,
+            column_search=self.column_search,
+        )
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario('first_page'),
+    Scenario('middle_page', depth=0.5),
+    Scenario('last_page', depth=1),
+    Scenario('last_page_keyset', depth=1, options={'keyset_column': 'id'}, seek=True),
+    Scenario('last_page_deferred_join', depth=1, options={'deferred_join': True}),
+    Scenario('global_search', search='jellyfish_1'),
+    Scenario('global_search_deep', search='jellyfish', depth=0.5),
+    Scenario('global_search_window_count', search='jellyfish', options={'window_count': True}),
+    Scenario('column_search', column_search={3: 'category_7'}),
+    Scenario('multi_column_order', depth=0.5, order=[(3, 'asc'), (4, 'desc')]),
+    Scenario('callbacks', length=100, callbacks=True),
+    Scenario('all_rows', length=-1, max_rows=100_000),
+]
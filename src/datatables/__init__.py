@@ -2,7 +2,54 @@
 
 __version__ = '0.6.2'
 
+from datatables.async_datatable import AsyncDataTable
 from datatables.base import DTDataCallbacks
+from datatables.cache import CacheBackend
+from datatables.cache import FilteredCountCache
+from datatables.cache import MemoryCacheBackend
+from datatables.cache import ResponseCache
+from datatables.cache import SearchPanesCache
+from datatables.cache import TotalCountCache
+from datatables.count import CountStrategy
 from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from datatables.prefetch import PagePrefetcher
+from datatables.search import LikeSearch
+from datatables.search import MySQLFullTextSearch
+from datatables.search import PostgresFullTextSearch
+from datatables.search import SearchStrategy
+from datatables.search import SQLiteFullTextSearch
+from datatables.search import TrigramSearch
+from datatables.search import TypedSearch
+from datatables.search import trigram_index_ddl
+from datatables.timeout import QueryTimeouts
+from datatables.tracing import CallbackTracer
+from datatables.tracing import DTTracer
+from datatables.tracing import OpenTelemetryTracer
 
-__all__ = ['DataTable', 'DTDataCallbacks']
+__all__ = [
+    'DataTable',
+    'DataTableDefinition',
+    'AsyncDataTable',
+    'DTDataCallbacks',
+    'CacheBackend',
+    'MemoryCacheBackend',
+    'TotalCountCache',
+    'ResponseCache',
+    'FilteredCountCache',
+    'PagePrefetcher',
+    'SearchPanesCache',
+    'CountStrategy',
+    'SearchStrategy',
+    'LikeSearch',
+    'PostgresFullTextSearch',
+    'SQLiteFullTextSearch',
+    'MySQLFullTextSearch',
+    'TypedSearch',
+    'TrigramSearch',
+    'trigram_index_ddl',
+    'QueryTimeouts',
+    'DTTracer',
+    'CallbackTracer',
+    'OpenTelemetryTracer',
+]
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from contextlib import AbstractContextManager
+from contextlib import asynccontextmanager
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Sequence
+
+from sqlalchemy import FromClause
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncResult
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import Label
+
+from datatables.base import DTDataCallbacks
+from datatables.datatable import DataTableBase
+from datatables.datatable import DataTableDefinition
+from datatables.serialize import dump_json
+
+
+class AsyncDataTable(DataTableBase):
+    """
+    Asyncio data table class for sqlalchemy AsyncEngine, e.g. for FastAPI or Starlette applications.
+    The statements are built and the results are processed exactly like in DataTable, the queries run
+    on the event loop via AsyncSession.run_sync instead of blocking a worker thread.
+    Unlike DataTable the request is not run by the constructor, await run(request_params) before output_result().
+
+    :param table: table: FromClause - sqlalchemy FromClause
+    :param column_names: Sequence[str | Label] - table column names or labelled column expressions to display in the
+           datatable, used for projection in sql, see DataTableDefinition
+    :param engine: AsyncEngine | None -  sqlalchemy asyncio database engine
+    :param callbacks: DTDataCallbacks  - callback that populate  DT_ROW_ID, DT_ROW_CLASS, DT_ROW_ATTR, DT_ROW_DATA
+    :param concurrent: bool - run the total count concurrently with the filtered count and data queries,
+           each on its own connection, requires an engine or a session factory
+    :param session: AsyncSession | AsyncConnection | Callable[[], AsyncSession] | None - run the queries through an
+           externally managed AsyncSession or AsyncConnection, or an AsyncSession created by the session factory
+           (e.g. an async_sessionmaker), instead of the engine
+    :param definition: DataTableDefinition | None - reusable definition to run the request for, replaces table,
+           column_names, callbacks and options, the engine and session of the definition are not used
+    :param stream: bool - run() only counts the records, the data is streamed by stream_result()
+    :param options: the other parameters of DataTableDefinition, e.g. keyset_column or count_strategy
+    See DataTable for the attributes.
+    """
+
+    engine: AsyncEngine | None
+    session: AsyncSession | AsyncConnection | Callable[[], AsyncSession] | None
+    concurrent: bool = False
+    stream: bool = False
+
+    def __init__(
+        self,
+        table: FromClause | None = None,
+        column_names: Sequence[str | Label[Any]] | None = None,
+        engine: AsyncEngine | None = None,
+        callbacks: DTDataCallbacks | None = None,
+        concurrent: bool = False,
+        session: AsyncSession | AsyncConnection | Callable[[], AsyncSession] | None = None,
+        definition: DataTableDefinition | None = None,
+        stream: bool = False,
+        **options: Any,
+    ):
+        if (engine is None) == (session is None):
+            raise ValueError('AsyncDataTable requires either an engine or a session')
+        self.engine = engine
+        self.session = session
+        self.concurrent = concurrent
+        self.stream = stream
+        self.data = []
+        logging.info('initialize AsyncDataTable for %s', table if definition is None else definition.table)
+        try:
+            self.definition = self._get_definition(definition, table, column_names, callbacks, options)
+        except Exception as exc:
+            # reported with the output of the request, like by DataTable
+            self._set_error(exc)
+
+    @asynccontextmanager
+    async def _get_session(self) -> AsyncIterator[AsyncSession]:
+        """Get the session to run the queries with, only sessions opened here are closed again"""
+        if isinstance(self.session, AsyncSession):
+            yield self.session
+        elif isinstance(self.session, AsyncConnection):
+            async with AsyncSession(bind=self.session) as session:
+                yield session
+        elif self.session is not None:
+            async with self.session() as session:
+                yield session
+        else:
+            async with AsyncSession(self.engine) as session:
+                yield session
+
+    async def _run_sync(self, *queries: Callable[[Session], None]) -> None:
+        """Run the queries in one AsyncSession, i.e. on one connection"""
+        async with self._get_session() as session:
+            for query in queries:
+                await session.run_sync(query)
+
+    @asynccontextmanager
+    async def _async_timeout(self, session: AsyncSession, query: str) -> AsyncIterator[None]:
+        """
+        Apply the timeout of the query to the statements awaited in the context, see DataTableBase._timeout,
+        for queries not run by run_sync, e.g. streamed results
+        """
+        timeout: AbstractContextManager[None] = self._timeout(session.sync_session, query)
+        await session.run_sync(lambda _: timeout.__enter__())
+        try:
+            yield
+        except Exception as exc:
+            error: Exception = exc
+            # a timed out statement is raised as timeout error on exit
+            if not await session.run_sync(lambda _: timeout.__exit__(type(error), error, error.__traceback__)):
+                raise
+        else:
+            await session.run_sync(lambda _: timeout.__exit__(None, None, None))
+
+    def _is_concurrent(self) -> bool:
+        # an externally managed session or connection can not run two queries at the same time
+        return self.concurrent and not isinstance(self.session, (AsyncSession, AsyncConnection))
+
+    async def _run_queries(self) -> None:
+        """Run the count and data queries, concurrently if enabled"""
+        if self._is_concurrent():
+            await asyncio.gather(
+                self._run_sync(self._query_records_total),
+                self._run_sync(self._query_records_filtered_and_data, self._query_search_panes),
+            )
+            self._set_unfiltered_count()
+        else:
+            await self._run_sync(self._run)
+
+    async def run(self, request_params: dict[str, Any]) -> None:
+        started: int = time.time_ns()
+        try:
+            self.params = self._parse_params(request_params)
+        except Exception as exc:
+            self._set_error(exc)
+            return
+        if self.error:
+            return
+        with self._start_request_span(started) as span:
+            try:
+                self._apply_limits()
+                if self.stream:
+                    await self._run_sync(self._run_counts)
+                elif not self._get_cached_response():
+                    await self._run_queries()
+                    self._cache_response()
+            except Exception as exc:
+                self._set_error(exc)
+            self._trace_result(span)
+
+    async def stream_result(self, serializer: Callable[[Any], str] = dump_json) -> AsyncIterator[str]:
+        """
+        Stream the json response of a request run with stream=True, see DataTable.stream_result()
+        :param serializer: Callable[[Any], str] - serializes the rows and values of the response to json
+        :return: AsyncIterator[str] - the chunks of the json response, one per batch of rows
+        """
+        if not self.stream or self.error:
+            yield serializer(self.output_result())
+            return
+        yield self._stream_head(serializer)
+        try:
+            async with self._get_session() as session, self._async_timeout(session, 'data'):
+                with self.definition.tracer.start_span('data') as span:
+                    paged: Select[Any] = self._get_stream_statement()
+                    statement_params: dict[str, Any] = self._get_statement_params()
+                    result: AsyncResult[Any] = await session.stream(paged, statement_params)
+                    row_count: int = 0
+                    last_row: Any = None
+                    async for partition in result.partitions():
+                        yield ('' if last_row is None else ',') + ','.join(
+                            serializer(record) for record in self._get_records(partition)
+                        )
+                        row_count += len(partition)
+                        last_row = partition[-1]
+                    if span.recording:
+                        span.set_attribute('sql', paged)
+                        span.set_attribute('params', statement_params)
+                        span.set_attribute('rows', row_count)
+                if last_row is not None:
+                    self._set_cursor(last_row, row_count)
+        except Exception as exc:
+            self._set_error(exc)
+        yield self._stream_tail(serializer)
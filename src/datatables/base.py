@@ -1,7 +1,30 @@
+import base64
+import binascii
+import json
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import date
+from datetime import datetime
+from datetime import time
+from decimal import Decimal
+from decimal import InvalidOperation
 from typing import Any
 from typing import Callable
+from uuid import UUID
+
+
+class DTRequestError(ValueError):
+    """
+    Datatable request rejected by the server, e.g. for exceeding the page size limit
+    :param message: str - the error message sent in the error property of the output
+    :param code: str - machine readable reason sent in the errorCode property of the output
+    """
+
+    code: str
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.code = code
 
 
 class DTKey:
@@ -16,6 +39,7 @@ class DTDataCallbacks:
     get_row_class: Callable[[dict[str, Any]], str] | None = None
     get_row_data: Callable[[dict[str, Any]], dict[str, Any]] | None = None
     get_row_attr: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+    batch_callback: Callable[[list[dict[str, Any]]], None] | None = None
 
     def set_row_id_getter(self, getter: Callable[[dict[str, Any]], str]) -> None:
         """
@@ -59,18 +83,42 @@ class DTDataCallbacks:
         """
         self.get_row_attr = getter
 
-    def run(self, row: dict[str, Any]) -> None:
-        if self.get_row_id and self.get_row_id(row):
-            row[DTKey.ROW_ID] = self.get_row_id(row)
+    def set_batch_callback(self, callback: Callable[[list[dict[str, Any]]], None]) -> None:
+        """
+        Set the callback that receives all result rows of a page at once, after the row getters ran.
+        It updates the rows in place, e.g. with DT_RowAttr values resolved by a single query for all rows
+        instead of a query per row.
+        :param: Callable - the callback that has access to the list of result rows (dicts of column name and value)
+        """
+        self.batch_callback = callback
 
-        if self.get_row_class and self.get_row_class(row):
-            row[DTKey.ROW_CLASS] = self.get_row_class(row)
+    def _get_getters(self) -> list[tuple[str, Callable[[dict[str, Any]], Any]]]:
+        getters: list[tuple[str, Callable[[dict[str, Any]], Any] | None]] = [
+            (DTKey.ROW_ID, self.get_row_id),
+            (DTKey.ROW_CLASS, self.get_row_class),
+            (DTKey.ROW_DATA, self.get_row_data),
+            (DTKey.ROW_ATTR, self.get_row_attr),
+        ]
+        return [(key, getter) for key, getter in getters if getter is not None]
 
-        if self.get_row_data and self.get_row_data(row):
-            row[DTKey.ROW_DATA] = self.get_row_data(row)
+    def run(self, row: dict[str, Any]) -> None:
+        """Run the row getters on the row, each getter is called once, empty values are not added"""
+        for key, getter in self._get_getters():
+            value: Any = getter(row)
+            if value:
+                row[key] = value
 
-        if self.get_row_attr and self.get_row_attr(row):
-            row[DTKey.ROW_ATTR] = self.get_row_attr(row)
+    def run_batch(self, rows: list[dict[str, Any]]) -> None:
+        """Run the row getters on every row, then the batch callback on all rows"""
+        getters: list[tuple[str, Callable[[dict[str, Any]], Any]]] = self._get_getters()
+        if getters:
+            for row in rows:
+                for key, getter in getters:
+                    value: Any = getter(row)
+                    if value:
+                        row[key] = value
+        if self.batch_callback is not None and rows:
+            self.batch_callback(rows)
 
 
 @dataclass(frozen=True)
@@ -124,6 +172,8 @@ class DTParams:
     :param search_regex: bool - whether the global search filter uses regular expressions or not
     :param columns: list[DTColumn] - list of column properties
     :param order: list[DTColumnOrder] = list of order criteria
+    :param cursor: str - opaque keyset cursor returned with the previous page, empty for offset paging
+    :param search_panes: dict[str, list[str]] - the values selected in the SearchPanes by column data
     """
 
     draw: int = 0
@@ -133,3 +183,74 @@ class DTParams:
     search_regex: bool = False
     columns: list[DTColumn] = field(default_factory=list)
     order: list[DTColumnOrder] = field(default_factory=list)
+    cursor: str = ''
+    search_panes: dict[str, list[str]] = field(default_factory=dict)
+
+
+# the sort value types json does not represent, by the tag they are encoded with in a cursor, datetime before date
+_CURSOR_VALUE_TYPES: dict[str, tuple[type, Callable[[str], Any]]] = {
+    'datetime': (datetime, datetime.fromisoformat),
+    'date': (date, date.fromisoformat),
+    'time': (time, time.fromisoformat),
+    'decimal': (Decimal, Decimal),
+    'uuid': (UUID, UUID),
+}
+
+
+def _encode_cursor_value(value: Any) -> dict[str, str]:
+    """Encode a sort value json does not represent as tagged string, raises TypeError for unsupported types"""
+    for tag, (value_type, _) in _CURSOR_VALUE_TYPES.items():
+        if isinstance(value, value_type):
+            return {'$t': tag, '$v': value.isoformat() if isinstance(value, (date, time)) else str(value)}
+    raise TypeError(f'{type(value).__name__} is not supported as cursor value')
+
+
+def _decode_cursor_value(payload: dict[str, Any]) -> Any:
+    """Decode a tagged sort value back to its type, other json objects are kept"""
+    if payload.keys() != {'$t', '$v'}:
+        return payload
+    return _CURSOR_VALUE_TYPES[payload['$t']][1](payload['$v'])
+
+
+@dataclass(frozen=True)
+class DTCursor:
+    """
+    Class holding the keyset position after the last row of a served page.
+    The cursor is handed to the client alongside draw and sent back with the request for the next page.
+
+    :param start: int - the row offset of the page this cursor leads to
+    :param values: list[Any] - the sort column values (incl. the tie-breaker) of the last row served
+    :param signature: str - fingerprint of the filter and order criteria the cursor was produced for
+    """
+
+    start: int
+    values: list[Any]
+    signature: str
+
+    def encode(self) -> str | None:
+        """
+        Encode the cursor as url safe string, the datetime, date, time, Decimal and UUID values are tagged with their
+        type to be decoded back to it, returns None if the values are not serializable
+        """
+        try:
+            payload: str = json.dumps(
+                {'s': self.start, 'v': self.values, 'k': self.signature},
+                separators=(',', ':'),
+                default=_encode_cursor_value,
+            )
+        except (TypeError, ValueError):
+            return None
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def decode(token: str) -> 'DTCursor | None':
+        """Decode a cursor string sent by the client, returns None for missing or malformed cursors"""
+        if not token:
+            return None
+        try:
+            payload: dict[str, Any] = json.loads(
+                base64.urlsafe_b64decode(token.encode()), object_hook=_decode_cursor_value
+            )
+            return DTCursor(start=int(payload['s']), values=list(payload['v']), signature=str(payload['k']))
+        except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError, InvalidOperation):
+            return None
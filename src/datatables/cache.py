@@ -0,0 +1,275 @@
+import copy
+import hashlib
+import threading
+import time
+import weakref
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import FromClause
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.sql.compiler import Compiled
+
+from datatables.serialize import dump_json_bytes
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the key value stores used by the datatables caches.
+    Implement it to point the caches at shared storage (e.g. redis or memcached), values have to be stored as is
+    or serialized and deserialized transparently by the backend.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """Get the value stored for key, None if there is no (unexpired) value"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store value for key, ttl is the time to live in seconds, None for no expiry"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the value stored for key if there is one"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all values"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Thread safe in-process LRU cache with time to live.
+
+    :param maxsize: int - maximal number of entries, the least recently used entry is evicted when exceeded
+    :param ttl: float | None - default time to live in seconds for entries set without ttl, None for no expiry
+    """
+
+    maxsize: int
+    ttl: float | None
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be a positive integer')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry: tuple[float | None, Any] | None = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires: float | None = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# the keys of joins, subqueries etc. by FromClause instance, rendering their sql is too slow for every cache access
+_table_keys: 'weakref.WeakKeyDictionary[FromClause, str]' = weakref.WeakKeyDictionary()
+_table_keys_lock: threading.Lock = threading.Lock()
+
+
+def table_cache_key(table: FromClause) -> str:
+    """
+    Get a stable cache key identifying the table/FromClause, the same for every instance of an equal FromClause.
+    The keys of other FromClauses than tables are computed once per instance.
+    :param table: FromClause - sqlalchemy table, join, subquery etc.
+    :return: str - the table name for tables, a hash of the rendered sql and its parameters otherwise
+    """
+    fullname: str | None = getattr(table, 'fullname', None)
+    if fullname is not None:
+        return fullname
+    with _table_keys_lock:
+        key: str | None = _table_keys.get(table)
+    if key is None:
+        compiled: Compiled = select(func.count()).select_from(table).compile()
+        key = hashlib.sha1(f'{compiled}{sorted(compiled.params.items())!r}'.encode()).hexdigest()
+        with _table_keys_lock:
+            _table_keys[table] = key
+    return key
+
+
+class TotalCountCache:
+    """
+    Cache for the unfiltered record count (recordsTotal) of datatable tables.
+    Use one cache per database, call invalidate from the write paths of a table to drop its stale count.
+
+    :param backend: CacheBackend | None - the key value store, defaults to an in-process MemoryCacheBackend
+    :param ttl: float | None - time to live of cached counts in seconds, None for no expiry
+    :param namespace: str - prefix of the backend keys, allows sharing a backend between caches
+    """
+
+    backend: CacheBackend
+    ttl: float | None
+    namespace: str
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = 60, namespace: str = 'dt:total'):
+        self.backend = MemoryCacheBackend() if backend is None else backend
+        self.ttl = ttl
+        self.namespace = namespace
+
+    def _key(self, table: FromClause) -> str:
+        return f'{self.namespace}:{table_cache_key(table)}'
+
+    def get(self, table: FromClause) -> int | None:
+        """Get the cached total count of the table, None if not cached or expired"""
+        count: Any | None = self.backend.get(self._key(table))
+        return None if count is None else int(count)
+
+    def set(self, table: FromClause, count: int) -> None:
+        """Cache the total count of the table"""
+        self.backend.set(self._key(table), count, self.ttl)
+
+    def invalidate(self, table: FromClause) -> None:
+        """Drop the cached total count of the table, e.g. after inserting or deleting rows"""
+        self.backend.delete(self._key(table))
+
+    def clear(self) -> None:
+        """Drop all cached values of the backend"""
+        self.backend.clear()
+
+
+class _VersionedCache:
+    """
+    Base of the caches of query results of a table, invalidate bumps a version of the table stored in the backend,
+    the values cached for older versions are never read again and expire or are evicted, so that any backend
+    can drop the values of a table without deleting keys by prefix
+    """
+
+    backend: CacheBackend
+    ttl: float | None
+    namespace: str
+
+    def __init__(self, backend: CacheBackend | None, ttl: float | None, namespace: str):
+        self.backend = MemoryCacheBackend(maxsize=256) if backend is None else backend
+        self.ttl = ttl
+        self.namespace = namespace
+
+    def _version_key(self, table: FromClause) -> str:
+        return f'{self.namespace}:version:{table_cache_key(table)}'
+
+    def _key(self, table: FromClause, fingerprint: str) -> str:
+        table_key: str = table_cache_key(table)
+        version: Any | None = self.backend.get(f'{self.namespace}:version:{table_key}')
+        return f'{self.namespace}:{table_key}:{version or 0}:{fingerprint}'
+
+    def invalidate(self, table: FromClause) -> None:
+        """Drop the cached values of the table, e.g. after writing to it"""
+        key: str = self._version_key(table)
+        version: Any | None = self.backend.get(key)
+        self.backend.set(key, int(version or 0) + 1)
+
+    def clear(self) -> None:
+        """Drop all cached values of the backend"""
+        self.backend.clear()
+
+
+class ResponseCache(_VersionedCache):
+    """
+    Cache of whole datatable responses, e.g. for dashboards polling the same page from many browsers.
+    The responses are keyed by a fingerprint of the table, the columns and the request parameters except draw,
+    a cached response is served with the draw of the request. Share a cache only between definitions producing
+    the same responses for a table, e.g. with the same searchable columns and callbacks, or use separate namespaces.
+    Each response comes with an ETag, a hash of its content, see DataTable.not_modified().
+
+    :param backend: CacheBackend | None - the key value store, defaults to an in-process MemoryCacheBackend,
+           its maxsize bounds the number of cached responses
+    :param ttl: float | None - time to live of cached responses in seconds, None for no expiry
+    :param namespace: str - prefix of the backend keys, allows sharing a backend between caches
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = 5, namespace: str = 'dt:response'):
+        super().__init__(backend, ttl, namespace)
+
+    def get(self, table: FromClause, fingerprint: str) -> tuple[dict[str, Any], str] | None:
+        """Get a copy of the cached response without draw and its ETag, None if not cached or expired"""
+        cached: Any | None = self.backend.get(self._key(table, fingerprint))
+        return None if cached is None else (copy.deepcopy(cached[0]), cached[1])
+
+    def set(self, table: FromClause, fingerprint: str, response: dict[str, Any]) -> str:
+        """
+        Cache a copy of the response, the draw is left out, so that changes to the served responses do not leak
+        into the cache
+        :return: str - the ETag of the response
+        """
+        response = copy.deepcopy({key: value for key, value in response.items() if key != 'draw'})
+        etag: str = f'"{hashlib.sha1(dump_json_bytes(response)).hexdigest()}"'
+        self.backend.set(self._key(table, fingerprint), (response, etag), self.ttl)
+        return etag
+
+
+class FilteredCountCache(_VersionedCache):
+    """
+    Cache for the filtered record count (recordsFiltered), keyed by the search criteria only, so that ordering
+    and paging through the same search result count it once. Estimated counts are not cached.
+    Call invalidate from the write paths of a table to drop its stale counts.
+
+    :param backend: CacheBackend | None - the key value store, defaults to an in-process MemoryCacheBackend,
+           its maxsize bounds the number of cached counts
+    :param ttl: float | None - time to live of cached counts in seconds, None for no expiry
+    :param namespace: str - prefix of the backend keys, allows sharing a backend between caches
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = 60, namespace: str = 'dt:filtered'):
+        super().__init__(backend, ttl, namespace)
+
+    def get(self, table: FromClause, signature: str) -> int | None:
+        """Get the cached count of the search result, None if not cached or expired"""
+        count: Any | None = self.backend.get(self._key(table, signature))
+        return None if count is None else int(count)
+
+    def set(self, table: FromClause, signature: str, count: int) -> None:
+        """Cache the count of the search result"""
+        self.backend.set(self._key(table, signature), count, self.ttl)
+
+
+class SearchPanesCache(_VersionedCache):
+    """
+    Cache for the search pane options and their counts, keyed by the search criteria only like FilteredCountCache.
+    Call invalidate from the write paths of a table to drop its stale options.
+
+    :param backend: CacheBackend | None - the key value store, defaults to an in-process MemoryCacheBackend,
+           its maxsize bounds the number of cached pane options
+    :param ttl: float | None - time to live of cached options in seconds, None for no expiry
+    :param namespace: str - prefix of the backend keys, allows sharing a backend between caches
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = 60, namespace: str = 'dt:panes'):
+        super().__init__(backend, ttl, namespace)
+
+    def get(self, table: FromClause, signature: str) -> dict[str, list[dict[str, Any]]] | None:
+        """Get a copy of the cached pane options of the search result, None if not cached or expired"""
+        options: Any | None = self.backend.get(self._key(table, signature))
+        return None if options is None else copy.deepcopy(options)
+
+    def set(self, table: FromClause, signature: str, options: dict[str, list[dict[str, Any]]]) -> None:
+        """Cache a copy of the pane options of the search result, changes to the responses do not leak into it"""
+        self.backend.set(self._key(table, signature), copy.deepcopy(options), self.ttl)
@@ -0,0 +1,133 @@
+import json
+import logging
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import FromClause
+from sqlalchemy import Select
+from sqlalchemy import text
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.compiler import Compiled
+from sqlalchemy.sql.expression import TableClause
+
+
+class CountStrategy(str, Enum):
+    """
+    How recordsTotal and recordsFiltered are counted
+    EXACT - count(*) queries
+    ESTIMATED - planner statistics where the dialect provides them, exact count otherwise
+    HYBRID - planner statistics if the estimate is above the count threshold, exact count below
+    """
+
+    EXACT = 'exact'
+    ESTIMATED = 'estimated'
+    HYBRID = 'hybrid'
+
+
+def _get_dialect(session: Session) -> Dialect:
+    return session.get_bind().dialect
+
+
+def _estimate_postgresql_table_count(session: Session, table: TableClause) -> int | None:
+    # reltuples is maintained by VACUUM/ANALYZE, it is -1 for tables that have never been analyzed
+    result: Any | None = session.scalar(
+        text('SELECT reltuples FROM pg_class WHERE oid = CAST(:name AS regclass)'),
+        {'name': table.fullname},
+    )
+    return None if result is None or result < 0 else int(result)
+
+
+def _estimate_sqlite_table_count(session: Session, table: TableClause) -> int | None:
+    # sqlite_stat1 is created and populated by ANALYZE, the first number of the stat column is the row count
+    exists: Any | None = session.scalar(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    )
+    if not exists:
+        return None
+    stat: str | None = session.scalar(text('SELECT stat FROM sqlite_stat1 WHERE tbl = :name'), {'name': table.name})
+    return None if not stat else int(stat.split()[0])
+
+
+def _estimate_mysql_table_count(session: Session, table: TableClause) -> int | None:
+    # the innodb table_rows statistic is an estimate, refreshed by ANALYZE TABLE
+    result: Any | None = session.scalar(
+        text(
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = COALESCE(:schema, DATABASE()) AND table_name = :name'
+        ),
+        {'schema': table.schema, 'name': table.name},
+    )
+    return None if result is None else int(result)
+
+
+def _compile_with_params(
+    stmt: Select[Any], dialect: Dialect, statement_params: dict[str, Any] | None
+) -> tuple[str, Any]:
+    """
+    Compile the statement for execution by the driver, the expanding parameters (e.g. of IN filters) are rendered
+    as one placeholder per value, they are only expanded on execution of the statement otherwise
+    :return: tuple[str, Any] - the sql and the parameters in the paramstyle of the dialect
+    """
+    bound: Select[Any] = stmt.params(statement_params) if statement_params else stmt
+    compiled: Compiled = bound.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+    params: Any = compiled.params
+    # drivers with positional paramstyle expect a tuple in the order of the placeholders
+    positiontup: list[str] | None = getattr(compiled, 'positiontup', None)
+    if positiontup is not None:
+        params = tuple(params[name] for name in positiontup)
+    return str(compiled), params
+
+
+def _estimate_postgresql_query_count(
+    session: Session, stmt: Select[Any], statement_params: dict[str, Any] | None
+) -> int | None:
+    sql, params = _compile_with_params(stmt, _get_dialect(session), statement_params)
+    plan: Any = session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}', params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_table_count(session: Session, table: FromClause) -> int | None:
+    """
+    Estimate the number of rows of a table from the planner statistics of the database.
+    :param session: Session - the session to query the statistics with
+    :param table: FromClause - the table, estimates are only available for tables, not for joins or subqueries
+    :return: int | None - the estimated row count, None if the dialect or table provides no statistics
+    """
+    if not isinstance(table, TableClause):
+        return None
+    try:
+        match _get_dialect(session).name:
+            case 'postgresql':
+                # a failing statement aborts the whole postgres transaction, isolate it in a savepoint
+                with session.begin_nested():
+                    return _estimate_postgresql_table_count(session, table)
+            case 'sqlite':
+                return _estimate_sqlite_table_count(session, table)
+            case 'mysql' | 'mariadb':
+                return _estimate_mysql_table_count(session, table)
+    except SQLAlchemyError as exc:
+        logging.warning('could not estimate row count of %s: %s', table, exc)
+    return None
+
+
+def estimate_query_count(
+    session: Session, stmt: Select[Any], statement_params: dict[str, Any] | None = None
+) -> int | None:
+    """
+    Estimate the number of rows of a select statement from the row estimate of the query plan.
+    :param session: Session - the session to explain the statement with
+    :param stmt: Select - the statement to estimate the result size for
+    :param statement_params: dict[str, Any] | None - values of the bind parameters of the statement
+    :return: int | None - the estimated row count, None if the dialect provides no row estimates
+    """
+    try:
+        if _get_dialect(session).name == 'postgresql':
+            with session.begin_nested():
+                return _estimate_postgresql_query_count(session, stmt, statement_params)
+    except (SQLAlchemyError, LookupError, TypeError, ValueError) as exc:
+        logging.warning('could not estimate row count of query: %s', exc)
+    return None
@@ -1,212 +1,1054 @@
+import copy
+import hashlib
 import logging
 import random
 import re
+import time
+from contextlib import contextmanager
+from dataclasses import replace
 from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Sequence
 
 from sqlalchemy import FromClause
 from sqlalchemy import Result
 from sqlalchemy import Select
-from sqlalchemy import Subquery
 from sqlalchemy import and_
 from sqlalchemy import func
 from sqlalchemy import or_
 from sqlalchemy import select
+from sqlalchemy import tuple_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.future import Connection
 from sqlalchemy.future import Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.compiler import Compiled
 from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.elements import KeyedColumnElement
+from sqlalchemy.sql.elements import Label
 
 from datatables.base import DTColumn
 from datatables.base import DTColumnOrder
+from datatables.base import DTCursor
 from datatables.base import DTDataCallbacks
 from datatables.base import DTParams
+from datatables.base import DTRequestError
+from datatables.cache import FilteredCountCache
+from datatables.cache import MemoryCacheBackend
+from datatables.cache import ResponseCache
+from datatables.cache import SearchPanesCache
+from datatables.cache import TotalCountCache
+from datatables.cache import table_cache_key
+from datatables.count import CountStrategy
+from datatables.count import estimate_query_count
+from datatables.count import estimate_table_count
+from datatables.prefetch import PagePrefetcher
+from datatables.search import LikeSearch
+from datatables.search import SearchPredicate
+from datatables.search import SearchStrategy
+from datatables.search_panes import GROUPING_SETS_DIALECTS
+from datatables.search_panes import search_pane_options
+from datatables.search_panes import search_pane_predicate
+from datatables.search_panes import search_panes_statement
+from datatables.serialize import dump_json
+from datatables.serialize import dump_json_bytes
+from datatables.timeout import QueryTimeouts
+from datatables.timeout import is_timeout_error
+from datatables.timeout import statement_timeout
+from datatables.tracing import DTSpan
+from datatables.tracing import DTTracer
 
+_PARAM_PATTERN: re.Pattern[str] = re.compile(r'(columns|order)\[(\d+)]\[(\w+)](?:\[(\w+)])?$')
+_SEARCH_PANES_PATTERN: re.Pattern[str] = re.compile(r'searchPanes\[(.+)]\[(\d+)]$')
 
-class DataTable:
+
+class DataTableDefinition:
     """
-    Sqlalchemy ORM-compatible data table class.
-    See https://www.datatables.net/manual/server-side#API
+    Reusable datatable definition, built once (e.g. at application startup) and shared between requests.
+    It resolves and validates the columns, precomputes the searchable and orderable columns and holds the caches,
+    execute() runs a request in its own DataTable and is safe to call from concurrent threads.
 
-    :param request_params: dict[str, Any] - the  query parameters sent via the jQuery datatables ajax request
-    :param engine: Engine -  sqlalchemy database engine
-    :param table: table: FromClause - sqlalchemy FromClause
-    :param column_names: list[str] - table column names to display in the datatable, used for projection in sql
+    :param table: FromClause - sqlalchemy FromClause
+    :param column_names: Sequence[str | Label] - table column names to display in the datatable, used for projection
+           in sql, or labelled column expressions (e.g. func.concat(...).label('name')) computed by the database,
+           searched and ordered by like table columns and served under their label
+    :param engine: Engine | None - sqlalchemy database engine, a new Session is opened for every request
+    :param session: Callable[[], Session] | None - session factory (e.g. a sessionmaker) used instead of the engine
     :param callbacks: DTDataCallbacks  - callback that populate  DT_ROW_ID, DT_ROW_CLASS, DT_ROW_ATTR, DT_ROW_DATA
-    :attr params: DTParams - parsed request parameters to use for result filtering, projection, sorting and paging
-    :attr recordsTotal: int -  the total number of records available in this model/table
-    :attr recordsFiltered: int - the number of records for the filtered result (before pagination)
-    :attr data: list[dict] - the list of data objects sent to the datatable
-    :attr error: str -  if there was an error with data retrieval, this the error message will be sent instead
+    :param searchable_columns: list[str] | None - the columns the client may search, None for all columns
+    :param orderable_columns: list[str] | None - the columns the client may order by, None for all columns
+    :param keyset_column: str | None - unique, non-null column (one of column_names) used as tie-breaker to enable
+           keyset (seek) pagination for sequential page requests, offset pagination is used otherwise and for orders
+           by nullable columns, as the seek predicate does not compare null values
+    :param total_count_cache: TotalCountCache | None - cache for recordsTotal, shared between requests
+    :param count_strategy: CountStrategy - exact counts, estimated counts from planner statistics, or hybrid
+    :param count_threshold: int - hybrid strategy only, estimates below the threshold are replaced by exact counts
+    :param window_count: bool - get the filtered record count with the data in one query via count(*) over ()
+    :param statement_cache: MemoryCacheBackend | None - in-process cache of the select statements by request shape,
+           search values are bound as parameters of the cached statements, defaults to a new cache
+    :param search_strategy: SearchStrategy | None - builds the global and column search criteria, e.g.
+           PostgresFullTextSearch to search a full text index, defaults to LikeSearch (LIKE '%value%')
+    :param yield_per: int - streamed requests only, number of rows fetched from the server side cursor at a time
+    :param max_page_size: int | None - maximal number of rows of a page (length), None for no limit
+    :param max_offset: int | None - maximal offset (start) of a page, pages served from a keyset cursor are exempt
+           as they do not scan the offset rows, None for no limit
+    :param allow_all_rows: bool - whether length=-1 may request all rows, regardless of max_page_size
+    :param clamp_limits: bool - clamp requests over the limits to the limits, reject them with an error if False
+    :param array_rows: bool - return the rows as lists of the values in the order of column_names instead of dicts,
+           DataTables reads the columns by index then, the row callbacks (DT_RowId etc.) need dict rows
+    :param deferred_join: bool - late row lookup, sort and page the primary keys of the table first and join them
+           back to the table to fetch the displayed columns of the page rows only, for tables with wide columns
+    :param statement_timeout: float | QueryTimeouts | None - timeout in seconds of each count and data query,
+           or the timeouts of the total count, filtered count and data queries, None for no timeout
+    :param tracer: DTTracer | None - traces the phases of the requests with their durations, row counts and sql,
+           e.g. CallbackTracer or OpenTelemetryTracer, defaults to a tracer tracing nothing
+    :param response_cache: ResponseCache | None - cache of the whole responses by request parameters except draw,
+           for identical requests of many clients, e.g. auto refreshing dashboards, streamed requests are not cached
+    :param filtered_count_cache: FilteredCountCache | None - cache for recordsFiltered by the search criteria only,
+           ordering and paging through a search result count it once
+    :param prefetcher: PagePrefetcher | None - prefetch the next page of each served page in the background,
+           DataTable only, the counts of prefetched pages are still queried (or served from the count caches)
+    :param search_panes: list[str] | None - the columns with a SearchPane (server-side processing), their options
+           are counted in total and under the filter of the request in one grouped query, and the values selected
+           in the panes filter the records like column searches
+    :param search_panes_cache: SearchPanesCache | None - cache for the pane options by the search criteria only
     """
 
-    callbacks: DTDataCallbacks | None
-    engine: Engine
     table: FromClause
     column_names: list[str]
-    params: DTParams
-    records_total: int = 0
-    records_filtered: int = 0
-    data: list[dict[str, Any]] = []
-    error: str | None = None
+    columns: list[KeyedColumnElement[Any]]
+    engine: Engine | None
+    session: Callable[[], Session] | None
+    callbacks: DTDataCallbacks | None
+    searchable: frozenset[int]
+    orderable: frozenset[int]
+    keyset_column: str | None
+    keyset_index: int | None
+    total_count_cache: TotalCountCache | None
+    count_strategy: CountStrategy
+    count_threshold: int
+    window_count: bool
+    statement_cache: MemoryCacheBackend
+    search_strategy: SearchStrategy
+    yield_per: int
+    max_page_size: int | None
+    max_offset: int | None
+    allow_all_rows: bool
+    clamp_limits: bool
+    array_rows: bool
+    deferred_join_key: list[KeyedColumnElement[Any]]
+    timeouts: QueryTimeouts
+    tracer: DTTracer
+    response_cache: ResponseCache | None
+    filtered_count_cache: FilteredCountCache | None
+    prefetcher: PagePrefetcher | None
+    search_panes: list[int]
+    search_panes_cache: SearchPanesCache | None
+    _table_key: str | None = None
 
     def __init__(
         self,
-        request_params: dict[str, Any],
         table: FromClause,
-        column_names: list[str],
-        engine: Engine,
+        column_names: Sequence[str | Label[Any]],
+        engine: Engine | None = None,
+        session: Callable[[], Session] | None = None,
         callbacks: DTDataCallbacks | None = None,
+        searchable_columns: list[str] | None = None,
+        orderable_columns: list[str] | None = None,
+        keyset_column: str | None = None,
+        total_count_cache: TotalCountCache | None = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        count_threshold: int = 100_000,
+        window_count: bool = False,
+        statement_cache: MemoryCacheBackend | None = None,
+        search_strategy: SearchStrategy | None = None,
+        yield_per: int = 1000,
+        max_page_size: int | None = None,
+        max_offset: int | None = None,
+        allow_all_rows: bool = True,
+        clamp_limits: bool = True,
+        array_rows: bool = False,
+        deferred_join: bool = False,
+        statement_timeout: float | QueryTimeouts | None = None,
+        tracer: DTTracer | None = None,
+        response_cache: ResponseCache | None = None,
+        filtered_count_cache: FilteredCountCache | None = None,
+        prefetcher: PagePrefetcher | None = None,
+        search_panes: list[str] | None = None,
+        search_panes_cache: SearchPanesCache | None = None,
     ):
         self.table = table
-        self.column_names = column_names
+        self.column_names = [column if isinstance(column, str) else column.name for column in column_names]
+        self.columns = [self._resolve_column(column) for column in column_names]
         self.engine = engine
+        self.session = session
         self.callbacks = callbacks
-        logging.info(f'initialize DataTable for {self.table}')
-        try:
-            self.run(request_params)
-        except Exception as exc:
-            self.error = str(exc)
+        self.searchable = self._get_indexes(searchable_columns)
+        self.orderable = self._get_indexes(orderable_columns)
+        self.keyset_column = keyset_column
+        self.keyset_index = None if keyset_column is None else min(self._get_indexes([keyset_column]))
+        self.total_count_cache = total_count_cache
+        self.count_strategy = count_strategy
+        self.count_threshold = count_threshold
+        self.window_count = window_count
+        self.statement_cache = MemoryCacheBackend(maxsize=256) if statement_cache is None else statement_cache
+        self.search_strategy = LikeSearch() if search_strategy is None else search_strategy
+        if yield_per < 1:
+            raise ValueError('yield_per must be a positive integer')
+        self.yield_per = yield_per
+        if max_page_size is not None and max_page_size < 1:
+            raise ValueError('max_page_size must be a positive integer')
+        self.max_page_size = max_page_size
+        self.max_offset = max_offset
+        self.allow_all_rows = allow_all_rows
+        self.clamp_limits = clamp_limits
+        if array_rows and callbacks is not None:
+            raise ValueError('The row callbacks require dict rows, they can not be used with array_rows')
+        self.array_rows = array_rows
+        self.deferred_join_key = list(table.primary_key) if deferred_join else []
+        if deferred_join and not self.deferred_join_key:
+            raise ValueError(f'The deferred join requires a primary key of {table}')
+        self.timeouts = QueryTimeouts.of(statement_timeout)
+        self.tracer = DTTracer() if tracer is None else tracer
+        self.response_cache = response_cache
+        self.filtered_count_cache = filtered_count_cache
+        self.prefetcher = prefetcher
+        self.search_panes = sorted(self._get_indexes(search_panes)) if search_panes else []
+        self.search_panes_cache = search_panes_cache
+
+    def _resolve_column(self, column: str | Label[Any]) -> KeyedColumnElement[Any]:
+        if isinstance(column, Label):
+            return column
+        if not isinstance(column, str):
+            raise ValueError(f'Computed column {column} requires a label')
+        if column not in self.table.columns:
+            raise ValueError(f'No column {column} in {self.table}')
+        return self.table.columns[column]
+
+    @property
+    def table_key(self) -> str:
+        """Cache key of the table, including the expressions of the computed columns, computed on first use"""
+        if self._table_key is None:
+            self._table_key = self._get_table_key()
+        return self._table_key
+
+    def _get_table_key(self) -> str:
+        """Cache key of the table, including the expressions of the computed columns"""
+        computed: list[Label[Any]] = [column for column in self.columns if isinstance(column, Label)]
+        if not computed:
+            return table_cache_key(self.table)
+        # the bound values, e.g. of literals, are not part of the rendered sql
+        compiled: Compiled = select(*computed).compile()
+        digest: str = hashlib.sha1(f'{compiled}{sorted(compiled.params.items())!r}'.encode()).hexdigest()
+        return f'{table_cache_key(self.table)}:{digest}'
+
+    def _get_indexes(self, names: list[str] | None) -> frozenset[int]:
+        """Get the datatable column indexes of the column names, all indexes for None"""
+        if names is None:
+            return frozenset(range(len(self.column_names)))
+        unknown: list[str] = [name for name in names if name not in self.column_names]
+        if unknown:
+            raise ValueError(f'No datatable columns {", ".join(unknown)}')
+        return frozenset(self.column_names.index(name) for name in names)
+
+    def execute(
+        self, request_params: dict[str, Any], session: Session | Connection | Callable[[], Session] | None = None
+    ) -> dict[str, Any]:
+        """
+        Run the datatable request and get its result.
+        :param request_params: dict[str, Any] - the query parameters sent via the jQuery datatables ajax request
+        :param session: Session | Connection | Callable[[], Session] | None - run the queries through this session,
+               connection or session factory instead of the engine or session factory of the definition
+        :return: dict - the output of the DataTable for the request, see DataTable.output_result()
+        """
+        return DataTable(request_params=request_params, session=session, definition=self).output_result()
+
+    def stream(
+        self,
+        request_params: dict[str, Any],
+        session: Session | Connection | Callable[[], Session] | None = None,
+        serializer: Callable[[Any], str] = dump_json,
+    ) -> Iterator[str]:
+        """
+        Run the datatable request and stream its json response, see DataTable.stream_result()
+        :param request_params: dict[str, Any] - the query parameters sent via the jQuery datatables ajax request
+        :param session: Session | Connection | Callable[[], Session] | None - run the queries through this session,
+               connection or session factory instead of the engine or session factory of the definition
+        :param serializer: Callable[[Any], str] - serializes the rows and values of the response to json
+        :return: Iterator[str] - the chunks of the json response
+        """
+        datatable: DataTable = DataTable(request_params=request_params, session=session, definition=self, stream=True)
+        return datatable.stream_result(serializer)
+
+
+class DataTableBase:
+    """
+    Request parsing, statement building and result handling shared by DataTable and AsyncDataTable.
+    The subclasses provide the database access, see DataTable for the parameters and attributes.
+    """
+
+    definition: DataTableDefinition
+    params: DTParams
+    records_total: int = 0
+    records_filtered: int = 0
+    data: list[Any]
+    error: str | None = None
+    error_code: str | None = None
+    cursor: str | None = None
+    records_total_approximate: bool = False
+    records_filtered_approximate: bool = False
+    search_panes: dict[str, list[dict[str, Any]]] | None = None
+    cached: bool = False
+    etag: str | None = None
+    # the search predicates and the request parameters they were built for
+    _search_predicates: tuple[DTParams, SearchPredicate | None, list[SearchPredicate]] | None = None
+
+    @staticmethod
+    def _get_definition(
+        definition: DataTableDefinition | None,
+        table: FromClause | None,
+        column_names: Sequence[str | Label[Any]] | None,
+        callbacks: DTDataCallbacks | None,
+        options: dict[str, Any],
+    ) -> DataTableDefinition:
+        """Get the definition passed in or build one from the table, column names and options"""
+        if definition is not None:
+            if table is not None or column_names is not None or callbacks is not None or options:
+                raise ValueError('Pass either a definition or table, column names, callbacks and options')
+            return definition
+        if table is None or column_names is None:
+            raise ValueError('A table and column names or a definition are required')
+        return DataTableDefinition(table=table, column_names=column_names, callbacks=callbacks, **options)
+
+    @property
+    def table(self) -> FromClause:
+        return self.definition.table
+
+    @property
+    def column_names(self) -> list[str]:
+        return self.definition.column_names
+
+    @property
+    def callbacks(self) -> DTDataCallbacks | None:
+        return self.definition.callbacks
+
+    @staticmethod
+    def _is_true(value: Any) -> bool:
+        """Boolean request parameter, 'true' in query strings and form data, true in json bodies"""
+        return value is True or value == 'true'
+
+    @staticmethod
+    def _group_params(request_params: dict[str, Any]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Group the flat columns[i][key][subkey] and order[i][key] parameters in one pass into lists of dicts,
+        shaped like the nested columns and order lists of a json request body
+        """
+        columns: dict[int, dict[str, Any]] = {}
+        order: dict[int, dict[str, Any]] = {}
+        for key, value in request_params.items():
+            match: re.Match[str] | None = _PARAM_PATTERN.match(key)
+            if match is None:
+                continue
+            group, index, name, subname = match.groups()
+            item: dict[str, Any] = (columns if group == 'columns' else order).setdefault(int(index), {})
+            if subname is None:
+                item[name] = value
+            else:
+                item.setdefault(name, {})[subname] = value
+        return [columns[i] for i in sorted(columns)], [order[i] for i in sorted(order)]
+
+    @staticmethod
+    def _group_search_panes(request_params: dict[str, Any]) -> dict[str, list[str]]:
+        """Group the flat searchPanes[data][i] parameters into the selected values by column data"""
+        search_panes: dict[str, list[str]] = {}
+        for key, value in request_params.items():
+            if not key.startswith('searchPanes['):
+                continue
+            match: re.Match[str] | None = _SEARCH_PANES_PATTERN.match(key)
+            if match is not None:
+                search_panes.setdefault(match.group(1), []).append(str(value))
+        return search_panes
 
     @staticmethod
-    def _parse_order(request_params: dict[str, Any]) -> list[DTColumnOrder]:
+    def _parse_order(order_params: list[dict[str, Any]]) -> list[DTColumnOrder]:
         """Parse the order[index][*] parameters"""
-        order: list[DTColumnOrder] = []
-        order_pattern = re.compile(r'order\[(.*?)]\[column]')
-        order_params: dict[str, Any] = {k: v for k, v in request_params.items() if order_pattern.match(k)}
-
-        for i in range(len(order_params)):
-            dt_column_order: DTColumnOrder = DTColumnOrder(
-                column_index=int(request_params[f'order[{i}][column]']),
-                is_asc=request_params[f'order[{i}][dir]'] == 'asc',
-            )
-            order.append(dt_column_order)
-        return order
+        return [
+            DTColumnOrder(column_index=int(item['column']), is_asc=item.get('dir') == 'asc')
+            for item in order_params
+            if 'column' in item
+        ]
 
     @staticmethod
-    def _parse_columns(request_params: dict[str, Any]) -> list[DTColumn]:
+    def _parse_columns(column_params: list[dict[str, Any]]) -> list[DTColumn]:
         """Parse the column[index][*] parameters"""
+        is_true: Callable[[Any], bool] = DataTableBase._is_true
         columns: list[DTColumn] = []
-        data_pattern = re.compile(r'columns\[(.*?)]\[data]')
-        # Extract only the keys of type columns[i][data] from the params
-        data_param: dict[str, Any] = {k: v for k, v in request_params.items() if data_pattern.match(k)}
-
-        for i in range(len(data_param)):
+        for i, item in enumerate(column_params):
+            search: dict[str, Any] = item.get('search') or {}
+            data: Any = item.get('data')
             column: DTColumn = DTColumn(
                 index=i,
-                data=data_param.get(f'columns[{i}][data]'),
-                name=request_params.get(f'columns[{i}][name]'),
-                searchable=request_params.get(f'columns[{i}][searchable]') == 'true',
-                orderable=request_params.get(f'columns[{i}][orderable]') == 'true',
-                search_value=request_params.get(f'columns[{i}][search][value]'),
-                search_regex=request_params.get(f'columns[{i}][search][regex]') == 'true',
+                data='' if data is None else str(data),
+                name=item.get('name') or '',
+                searchable=is_true(item.get('searchable')),
+                orderable=is_true(item.get('orderable')),
+                search_value=search.get('value') or '',
+                search_regex=is_true(search.get('regex')),
             )
             columns.append(column)
         return columns
 
     @staticmethod
     def _parse_params(request_params: dict[str, Any]) -> DTParams:
-        """Parse the request (query) parameters"""
+        """
+        Parse the request (query) parameters, either the flat parameters of query strings and form data or
+        the nested json body sent with ajax.contentType application/json
+        """
+        column_params: Any = request_params.get('columns')
+        order_params: Any = request_params.get('order')
+        if not isinstance(column_params, list):
+            column_params, order_params = DataTableBase._group_params(request_params)
+        search: Any = request_params.get('search')
+        if not isinstance(search, dict):
+            search = {'value': request_params.get('search[value]'), 'regex': request_params.get('search[regex]')}
+        search_panes: Any = request_params.get('searchPanes')
+        if isinstance(search_panes, dict):
+            search_panes = {data: [str(value) for value in values] for data, values in search_panes.items() if values}
+        else:
+            search_panes = DataTableBase._group_search_panes(request_params)
         params = DTParams(
             draw=int(request_params.get('draw', random.randint(1, 1000))),
             start=int(request_params.get('start', 0)),
             length=int(request_params.get('length', -1)),
-            search_value=request_params.get('search[value]', ''),
-            search_regex=request_params.get('search[regex]') == 'true',
-            columns=DataTable._parse_columns(request_params),
-            order=DataTable._parse_order(request_params),
+            search_value=search.get('value') or '',
+            search_regex=DataTableBase._is_true(search.get('regex')),
+            columns=DataTableBase._parse_columns(column_params),
+            order=DataTableBase._parse_order(order_params or []),
+            cursor=request_params.get('cursor') or '',
+            search_panes=search_panes,
         )
-        logging.info(f'params: {params}')
+        # formatted only if info logging is enabled
+        logging.info('params: %s', params)
         return params
 
+    def _set_error(self, exc: Exception) -> None:
+        """Report the exception in the output of the request"""
+        self.error = str(exc)
+        self.error_code = exc.code if isinstance(exc, DTRequestError) else None
+
+    def _start_request_span(self, started: int) -> DTSpan:
+        """Start the span of the request and trace the parse phase, the request was parsed since started"""
+        span: DTSpan = self.definition.tracer.start_span('request', started)
+        self.definition.tracer.start_span('parse', started).end()
+        return span
+
+    def _trace_result(self, span: DTSpan) -> None:
+        """Set the counts and the error of the request as attributes of the request span"""
+        if span.recording:
+            span.set_attribute('records_total', self.records_total)
+            span.set_attribute('records_filtered', self.records_filtered)
+            span.set_attribute('rows', len(self.data))
+            span.set_attribute('cached', self.cached)
+            if self.error:
+                span.set_attribute('error', self.error)
+
+    def _apply_limits(self) -> None:
+        """Clamp the page size and offset of the request to the limits of the definition, or reject the request"""
+        definition: DataTableDefinition = self.definition
+        length: int = self.params.length
+        start: int = self.params.start
+        if length < 0 and not definition.allow_all_rows:
+            if not definition.clamp_limits or definition.max_page_size is None:
+                raise DTRequestError('Requesting all rows is not allowed', 'all_rows_not_allowed')
+            length = definition.max_page_size
+        elif length >= 0 and definition.max_page_size is not None and length > definition.max_page_size:
+            if not definition.clamp_limits:
+                raise DTRequestError(
+                    f'Page size {length} exceeds the maximum of {definition.max_page_size}', 'page_size_exceeded'
+                )
+            length = definition.max_page_size
+        if definition.max_offset is not None and start > definition.max_offset and self._get_keyset_cursor() is None:
+            if not definition.clamp_limits:
+                raise DTRequestError(
+                    f'Offset {start} exceeds the maximum of {definition.max_offset}', 'offset_exceeded'
+                )
+            start = definition.max_offset
+        if length != self.params.length or start != self.params.start:
+            logging.info('page limited to start %s, length %s', start, length)
+            self.params = replace(self.params, start=start, length=length)
+
+    @contextmanager
+    def _timeout(self, session: Session, query: str) -> Iterator[None]:
+        """
+        Apply the timeout of the query (total_count, filtered_count or data, see QueryTimeouts),
+        a timed out query is reported as timeout error
+        """
+        try:
+            with statement_timeout(session, getattr(self.definition.timeouts, query)):
+                yield
+        except DBAPIError as exc:
+            if not is_timeout_error(exc):
+                raise
+            raise DTRequestError(f'The {query.replace("_", " ")} query timed out', 'timeout') from exc
+
+    def _get_response_fingerprint(self) -> str:
+        """Fingerprint of the request for the response cache, of everything shaping the response except the draw"""
+        shape: tuple[Any, ...] = (self.definition.table_key, self.column_names, replace(self.params, draw=0))
+        return hashlib.sha1(repr(shape).encode()).hexdigest()
+
+    def _get_cached_response(self) -> bool:
+        """Serve the request from the response cache of the definition, returns whether the response was cached"""
+        cache: ResponseCache | None = self.definition.response_cache
+        if cache is None:
+            return False
+        cached: tuple[dict[str, Any], str] | None = cache.get(self.table, self._get_response_fingerprint())
+        if cached is None:
+            return False
+        response, self.etag = cached
+        self.records_total = response['recordsTotal']
+        self.records_filtered = response['recordsFiltered']
+        self.records_total_approximate = response.get('recordsTotalApproximate', False)
+        self.records_filtered_approximate = response.get('recordsFilteredApproximate', False)
+        self.cursor = response.get('cursor')
+        self.search_panes = response['searchPanes']['options'] if 'searchPanes' in response else None
+        self.data = response['data']
+        self.cached = True
+        return True
+
+    def _cache_response(self) -> None:
+        """Store the response in the response cache of the definition"""
+        cache: ResponseCache | None = self.definition.response_cache
+        if cache is not None and not self.error:
+            self.etag = cache.set(self.table, self._get_response_fingerprint(), self.output_result())
+
+    def not_modified(self, if_none_match: str | None) -> bool:
+        """
+        Whether the response has the ETag the client sent in the If-None-Match header, answer 304 Not Modified then.
+        The responses have an ETag with a response cache only. Note that DataTables itself discards responses
+        with the draw of an earlier request, 304 responses are meant for polling clients keeping their current page.
+        :param if_none_match: str | None - the If-None-Match header of the request
+        """
+        if self.etag is None or not if_none_match:
+            return False
+        tags: list[str] = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or self.etag in tags
+
+    def _count(self, estimate: Callable[[], int | None], count: Callable[[], int]) -> tuple[int, bool]:
+        """Count according to the count strategy, returns the count and whether it is an estimate"""
+        if self.definition.count_strategy == CountStrategy.EXACT:
+            return count(), False
+        estimated: int | None = estimate()
+        if estimated is None or (
+            self.definition.count_strategy == CountStrategy.HYBRID and estimated < self.definition.count_threshold
+        ):
+            return count(), False
+        return estimated, True
+
     def _get_records_total(self, session: Session) -> int:
         # total record count before filtering
-        result: int | None = session.scalar(select(func.count()).select_from(self.table))
-        return 0 if result is None else result
+        if self.definition.total_count_cache is not None:
+            cached: int | None = self.definition.total_count_cache.get(self.table)
+            if cached is not None:
+                return cached
 
-    @staticmethod
-    def _get_records_filtered(session: Session, subquery: Subquery) -> int:
-        result: int | None = session.scalar(select(func.count()).select_from(subquery))
-        return 0 if result is None else result
+        def count() -> int:
+            with self._timeout(session, 'total_count'):
+                result: int | None = session.scalar(select(func.count()).select_from(self.table))
+            return 0 if result is None else result
+
+        total, self.records_total_approximate = self._count(lambda: estimate_table_count(session, self.table), count)
+        # estimates are cheap and not worth caching, and must not be mistaken for exact counts later on
+        if self.definition.total_count_cache is not None and not self.records_total_approximate:
+            self.definition.total_count_cache.set(self.table, total)
+        return total
+
+    def _get_filter_signature(self) -> str:
+        """
+        Key of the filtered record count in the filtered count cache, of the search criteria only,
+        the order and the page do not change the count
+        """
+        global_search: SearchPredicate | None = self._get_global_search_predicate()
+        criteria: tuple[Any, ...] = (
+            self.definition.table_key,
+            self.column_names,
+            None if global_search is None else global_search.shape,
+            tuple(predicate.shape for predicate in self._get_column_search_predicates()),
+            sorted(self._get_statement_params().items()),
+        )
+        return hashlib.sha1(repr(criteria).encode()).hexdigest()
+
+    def _get_cached_records_filtered(self) -> int | None:
+        """Get the filtered record count from the filtered count cache, None if not cached"""
+        cache: FilteredCountCache | None = self.definition.filtered_count_cache
+        return None if cache is None else cache.get(self.table, self._get_filter_signature())
+
+    def _cache_records_filtered(self, count: int) -> None:
+        """Store the exact filtered record count in the filtered count cache"""
+        cache: FilteredCountCache | None = self.definition.filtered_count_cache
+        if cache is not None:
+            cache.set(self.table, self._get_filter_signature(), count)
+
+    def _get_records_filtered(self, session: Session, stmt: Select[Any]) -> int:
+        cached: int | None = self._get_cached_records_filtered()
+        if cached is not None:
+            with self.definition.tracer.start_span('filtered_count') as span:
+                if span.recording:
+                    span.set_attribute('records_filtered', cached)
+                    span.set_attribute('cached', True)
+            self.records_filtered_approximate = False
+            return cached
+        # the order does not change the count, but can make the database sort the whole filtered result
+        stmt = stmt.order_by(None)
+
+        statement_params: dict[str, Any] = self._get_statement_params()
+
+        count_stmt: Select[Any] = select(func.count()).select_from(stmt.subquery())
+
+        def count() -> int:
+            with self._timeout(session, 'filtered_count'):
+                result: int | None = session.scalar(count_stmt, statement_params)
+            return 0 if result is None else result
+
+        with self.definition.tracer.start_span('filtered_count') as span:
+            filtered, self.records_filtered_approximate = self._count(
+                lambda: estimate_query_count(session, stmt, statement_params), count
+            )
+            if span.recording:
+                span.set_attribute('sql', count_stmt)
+                span.set_attribute('params', statement_params)
+                span.set_attribute('records_filtered', filtered)
+                span.set_attribute('approximate', self.records_filtered_approximate)
+        if not self.records_filtered_approximate:
+            self._cache_records_filtered(filtered)
+        return filtered
 
     def _get_table_column_by_index(self, index: int) -> KeyedColumnElement[Any]:
-        name: str = self.column_names[index]
-        return self.table.columns[name]
+        return self.definition.columns[index]
+
+    def _get_order_criteria(self) -> list[DTColumnOrder]:
+        """Get the requested order criteria, extended by the keyset tie-breaker column if keyset paging is enabled"""
+        orderable: frozenset[int] = self.definition.orderable
+        order: list[DTColumnOrder] = [o for o in self.params.order if o.column_index in orderable]
+        index: int | None = self.definition.keyset_index
+        if index is None or any(o.column_index == index for o in order):
+            return order
+        return [*order, DTColumnOrder(column_index=index, is_asc=True)]
+
+    def _get_global_search_columns(self) -> list[DTColumn]:
+        """Get the columns of the global search, i.e. the searchable columns if there is a global search value"""
+        if not self.params.search_value:
+            return []
+        searchable: frozenset[int] = self.definition.searchable
+        return [dt_col for dt_col in self.params.columns if dt_col.searchable and dt_col.index in searchable]
+
+    def _get_column_search_columns(self) -> list[DTColumn]:
+        """Get the columns with an individual column search value"""
+        searchable: frozenset[int] = self.definition.searchable
+        return [dt_col for dt_col in self.params.columns if dt_col.search_value and dt_col.index in searchable]
+
+    def _get_keyset_signature(self) -> str:
+        """Fingerprint of the filter and order criteria, a cursor is only valid for the criteria it was made for"""
+        criteria: tuple[Any, ...] = (
+            self.params.search_value,
+            self.params.search_regex,
+            tuple((col.searchable, col.search_value, col.search_regex) for col in self.params.columns),
+            tuple((order.column_index, order.is_asc) for order in self._get_order_criteria()),
+            sorted(self.params.search_panes.items()),
+        )
+        return hashlib.sha1(repr(criteria).encode()).hexdigest()[:16]
+
+    def _is_keyset_order(self) -> bool:
+        """
+        Whether the rows can be paged by keyset in the requested order: null values do not compare in the seek
+        predicate, so that rows would be lost if any order column is nullable, labeled expressions count as nullable
+        """
+        if self.definition.keyset_index is None:
+            return False
+        return not any(
+            getattr(self._get_table_column_by_index(order.column_index), 'nullable', True)
+            for order in self._get_order_criteria()
+        )
+
+    def _get_keyset_cursor(self) -> DTCursor | None:
+        """Get the cursor sent with the request if it leads to the requested page, None to fall back to offset"""
+        if self.params.length < 0 or not self._is_keyset_order():
+            return None
+        cursor: DTCursor | None = DTCursor.decode(self.params.cursor)
+        if cursor is None or cursor.start != self.params.start or cursor.signature != self._get_keyset_signature():
+            return None
+        if len(cursor.values) != len(self._get_order_criteria()):
+            return None
+        return cursor
+
+    def _get_keyset_criterion(self, cursor: DTCursor) -> ColumnElement[bool]:
+        """Build the seek predicate selecting the rows that sort after the last row of the previous page"""
+        orders: list[DTColumnOrder] = self._get_order_criteria()
+        columns: list[KeyedColumnElement[Any]] = [self._get_table_column_by_index(o.column_index) for o in orders]
+        if all(o.is_asc for o in orders):
+            return tuple_(*columns) > tuple_(*cursor.values)
+        if not any(o.is_asc for o in orders):
+            return tuple_(*columns) < tuple_(*cursor.values)
+        # mixed sort directions can not be expressed as one row value comparison
+        expressions: list[ColumnElement[bool]] = []
+        for i, order in enumerate(orders):
+            column: KeyedColumnElement[Any] = columns[i]
+            seek: ColumnElement[bool] = column > cursor.values[i] if order.is_asc else column < cursor.values[i]
+            expressions.append(and_(*[columns[j] == cursor.values[j] for j in range(i)], seek))
+        return or_(*expressions)
 
     def _add_order_criteria(self, stmt: Select[Any]) -> Select[Any]:
         """Add order by criteria to select statement"""
-        for order in self.params.order:
+        for order in self._get_order_criteria():
             column: KeyedColumnElement[Any] = self._get_table_column_by_index(order.column_index)
             stmt = stmt.order_by(column.asc()) if order.is_asc else stmt.order_by(column.desc())
         return stmt
 
+    def _get_search_predicates(self) -> tuple[SearchPredicate | None, list[SearchPredicate]]:
+        """
+        Get the global and the column search predicates, built once for the request parameters
+        and rebuilt only if the parameters are replaced
+        """
+        if self._search_predicates is None or self._search_predicates[0] is not self.params:
+            self._search_predicates = (
+                self.params,
+                self._build_global_search_predicate(),
+                self._build_column_search_predicates(),
+            )
+        return self._search_predicates[1], self._search_predicates[2]
+
+    def _get_global_search_predicate(self) -> SearchPredicate | None:
+        """Get the predicate of the global search of the search strategy, None without a global search"""
+        return self._get_search_predicates()[0]
+
+    def _get_column_search_predicates(self) -> list[SearchPredicate]:
+        """
+        Get the predicates of the individual column searches of the search strategy,
+        and of the values selected in the search panes
+        """
+        return self._get_search_predicates()[1]
+
+    def _build_global_search_predicate(self) -> SearchPredicate | None:
+        dt_cols: list[DTColumn] = self._get_global_search_columns()
+        if not dt_cols:
+            return None
+        columns: list[tuple[int, ColumnElement[Any]]] = [
+            (dt_col.index, self._get_table_column_by_index(dt_col.index)) for dt_col in dt_cols
+        ]
+        return self.definition.search_strategy.global_search(
+            columns, self.params.search_value, self.params.search_regex
+        )
+
+    def _build_column_search_predicates(self) -> list[SearchPredicate]:
+        predicates: list[SearchPredicate] = []
+        for dt_col in self._get_column_search_columns():
+            column: KeyedColumnElement[Any] = self._get_table_column_by_index(dt_col.index)
+            predicate: SearchPredicate | None = self.definition.search_strategy.column_search(
+                dt_col.index, column, dt_col.search_value, self.params.search_regex
+            )
+            if predicate is not None:
+                predicates.append(predicate)
+        if self.params.search_panes:
+            for dt_col in self.params.columns:
+                values: list[str] | None = self.params.search_panes.get(dt_col.data)
+                if values and dt_col.index in self.definition.search_panes:
+                    column = self._get_table_column_by_index(dt_col.index)
+                    predicates.append(search_pane_predicate(dt_col.index, column, values))
+        return predicates
+
     def _add_global_search_criterion(self, stmt: Select[Any]) -> Select[Any]:
         """Add global search filter across all searchable columns to select statement"""
-        expressions: list[ColumnElement[Any]] = []
-        for dt_col in self.params.columns:
-            if dt_col.searchable:
-                column: KeyedColumnElement[Any] = self._get_table_column_by_index(dt_col.index)
-                col_element: ColumnElement[Any]
-                if self.params.search_regex:
-                    regex: str = self.params.search_value
-                    col_element = column.regexp_match(regex)
-                else:
-                    col_element = column.like(f'%{self.params.search_value}%')
-                expressions.append(col_element)
-        return stmt.where(or_(*expressions)) if len(expressions) > 0 else stmt
+        predicate: SearchPredicate | None = self._get_global_search_predicate()
+        return stmt if predicate is None else stmt.where(predicate.build())
 
     def _add_column_search_criteria(self, stmt: Select[Any]) -> Select[Any]:
         """add the individual column filters to select statement"""
-        expressions: list[ColumnElement[Any]] = []
-        for dt_col in self.params.columns:
-            if dt_col.search_value:
-                column: KeyedColumnElement[Any] = self._get_table_column_by_index(dt_col.index)
-                if self.params.search_regex:
-                    col_element = column.regexp_match(dt_col.search_value)
-                else:
-                    col_element = column.like(f'%{dt_col.search_value}%')
-                expressions.append(col_element)
+        expressions: list[ColumnElement[Any]] = [
+            predicate.build() for predicate in self._get_column_search_predicates()
+        ]
         return stmt.where(and_(*expressions)) if len(expressions) > 0 else stmt
 
-    def _built_select_statement(self) -> Select[Any]:
-        stmt: Select[Any] = select().select_from(self.table)
-        for name in self.column_names:
-            if name not in self.table.columns:
-                raise ValueError(f'No column {name} in {self.table}')
-            stmt = stmt.add_columns(self.table.columns[name])
-        if self.params.search_value:
-            stmt = self._add_global_search_criterion(stmt)
+    def _get_statement_params(self) -> dict[str, Any]:
+        """Get the values of the search parameters bound into the select statement"""
+        statement_params: dict[str, Any] = {}
+        global_search: SearchPredicate | None = self._get_global_search_predicate()
+        if global_search is not None:
+            statement_params.update(global_search.params)
+        for predicate in self._get_column_search_predicates():
+            statement_params.update(predicate.params)
+        return statement_params
+
+    def _get_statement_key(self) -> str:
+        """
+        Get the cache key of the select statement, i.e. of everything that shapes the statement
+        but not the search values, which are bound at execution time
+        """
+        global_search: SearchPredicate | None = self._get_global_search_predicate()
+        shape: tuple[Any, ...] = (
+            # a statement cache may be shared between definitions
+            self.definition.table_key,
+            self.column_names,
+            None if global_search is None else global_search.shape,
+            tuple(predicate.shape for predicate in self._get_column_search_predicates()),
+            tuple((order.column_index, order.is_asc) for order in self._get_order_criteria()),
+        )
+        return repr(shape)
+
+    def _build_select_statement(self) -> Select[Any]:
+        stmt: Select[Any] = select(*self.definition.columns).select_from(self.table)
+        stmt = self._add_global_search_criterion(stmt)
         stmt = self._add_column_search_criteria(stmt)
         stmt = self._add_order_criteria(stmt)
         return stmt
 
-    def _get_data(self, session: Session, stmt: Select[Any]) -> list[dict[str, Any]]:
-        """Get the data from the database"""
+    def _built_select_statement(self) -> Select[Any]:
+        """Get the select statement for the request shape from the statement cache or build it"""
+        key: str = self._get_statement_key()
+        stmt: Select[Any] | None = self.definition.statement_cache.get(key)
+        if stmt is None:
+            stmt = self._build_select_statement()
+            self.definition.statement_cache.set(key, stmt)
+        return stmt
+
+    def _get_paged_statement(self, stmt: Select[Any], count_filtered: bool = False) -> tuple[Select[Any], bool]:
+        """
+        Add the pagination to the select statement
+        :return: tuple[Select, bool] - the statement and whether it has the count(*) over () window column
+        """
+        paged: Select[Any]
+        key_columns: list[KeyedColumnElement[Any]] = self.definition.deferred_join_key
+        if key_columns:
+            # sort and page the narrow rows of the key columns only
+            stmt = stmt.with_only_columns(*key_columns)
         # adding pagination by page (offset/start) and page size (limit/length)
-        stmt = stmt.offset(self.params.start).limit(self.params.length)
-        logging.info(f'stmt: {stmt.compile()}')
-        result: Result[Any] = session.execute(stmt)
-        # create a dictionary that maps the result of the query to a list
-        # data: list[dict[str, Any]] = [{k: v for k, v in zip(self.column_names, row)} for row in result.all()]
-        data: list[dict[str, Any]] = []
-        for row in result.all():
-            result_row: dict[str, Any] = {k: v for k, v in zip(self.column_names, row, strict=True)}
-            if self.callbacks:
-                self.callbacks.run(result_row)
-            data.append(result_row)
+        cursor: DTCursor | None = self._get_keyset_cursor()
+        if cursor is not None:
+            # seek past the last row of the previous page instead of scanning and discarding the offset rows
+            paged = stmt.where(self._get_keyset_criterion(cursor)).limit(self.params.length)
+        else:
+            # all rows are requested with a negative length, only sqlite accepts a negative limit
+            paged = stmt.offset(self.params.start) if self.params.start > 0 else stmt
+            if self.params.length >= 0:
+                paged = paged.limit(self.params.length)
+        # the window would only count the rows after the cursor when seeking
+        windowed: bool = count_filtered and cursor is None
+        if windowed:
+            paged = paged.add_columns(func.count().over().label('dt_records_filtered'))
+        if key_columns:
+            paged = self._get_deferred_join(paged, key_columns, windowed)
+        # compiled only if info logging is enabled
+        logging.info('stmt: %s', paged)
+        return paged, windowed
+
+    def _get_deferred_join(
+        self, paged: Select[Any], key_columns: list[KeyedColumnElement[Any]], windowed: bool
+    ) -> Select[Any]:
+        """Join the keys of the page back to the table to fetch the displayed columns of the page rows only"""
+        keys = paged.subquery('dt_keys')
+        on: list[ColumnElement[bool]] = [column == keys.corresponding_column(column) for column in key_columns]
+        stmt: Select[Any] = select(*self.definition.columns).select_from(self.table.join(keys, and_(*on)))
+        if windowed:
+            stmt = stmt.add_columns(keys.c.dt_records_filtered)
+        return self._add_order_criteria(stmt)
+
+    def _get_records(self, rows: Iterable[Any]) -> list[Any]:
+        """Map the column values of the result rows to the column names and run the callbacks, or list them"""
+        if self.definition.array_rows:
+            return [list(values) for values in rows]
+        column_names: list[str] = self.column_names
+        records: list[dict[str, Any]] = [dict(zip(column_names, values, strict=True)) for values in rows]
+        if self.callbacks:
+            with self.definition.tracer.start_span('callbacks') as span:
+                self.callbacks.run_batch(records)
+                if span.recording:
+                    span.set_attribute('rows', len(records))
+        return records
+
+    def _set_cursor(self, last_row: Any, row_count: int) -> None:
+        """Set the keyset cursor pointing after the last row of the page, if the rows can be paged by keyset"""
+        if self._is_keyset_order():
+            self.cursor = DTCursor(
+                start=self.params.start + row_count,
+                values=[last_row[order.column_index] for order in self._get_order_criteria()],
+                signature=self._get_keyset_signature(),
+            ).encode()
+
+    def _get_page_key(self) -> str:
+        """Key of the requested page in the prefetcher, of the request shape, the search values and the page"""
+        page: tuple[Any, ...] = (
+            self._get_statement_key(),
+            sorted(self._get_statement_params().items()),
+            self.params.start,
+            self.params.length,
+        )
+        return hashlib.sha1(repr(page).encode()).hexdigest()
+
+    def _get_prefetched_data(self) -> list[Any] | None:
+        """Get the records of the requested page from the prefetcher and set its cursor, None if not prefetched"""
+        prefetcher: PagePrefetcher | None = self.definition.prefetcher
+        if prefetcher is None or self.params.length < 0:
+            return None
+        page: tuple[list[Any], str | None] | None = prefetcher.get(self._get_page_key())
+        if page is None:
+            return None
+        data, self.cursor = page
         return data
 
-    def run(self, request_params: dict[str, Any]) -> None:
-        self.params = self._parse_params(request_params)
-        with Session(self.engine) as session:
-            # get total record count from the table
+    def _get_data(self, session: Session, stmt: Select[Any], count_filtered: bool = False) -> list[Any]:
+        """
+        Get the data from the database, or from the prefetcher
+        :param count_filtered: bool - also get the filtered record count with a count(*) over () window
+               in the same query, instead of a separate count query
+        """
+        prefetched: list[Any] | None = self._get_prefetched_data()
+        if prefetched is not None:
+            with self.definition.tracer.start_span('data') as span:
+                if span.recording:
+                    span.set_attribute('rows', len(prefetched))
+                    span.set_attribute('prefetched', True)
+            if count_filtered:
+                self.records_filtered = self._get_records_filtered(session, stmt)
+            return prefetched
+        with self.definition.tracer.start_span('data') as span:
+            paged, windowed = self._get_paged_statement(stmt, count_filtered)
+            statement_params: dict[str, Any] = self._get_statement_params()
+            with self._timeout(session, 'data'):
+                result: Result[Any] = session.execute(paged, statement_params)
+                # create a dictionary that maps the result of the query to a list
+                rows = result.all()
+            if span.recording:
+                span.set_attribute('sql', paged)
+                span.set_attribute('params', statement_params)
+                span.set_attribute('rows', len(rows))
+        data: list[Any] = self._get_records([row[:-1] for row in rows] if windowed else rows)
+        if count_filtered:
+            if windowed and rows:
+                self.records_filtered = rows[0][-1]
+            elif windowed and self.params.start == 0:
+                self.records_filtered = 0
+            else:
+                # a page past the end has no rows to carry the window count
+                self.records_filtered = self._get_records_filtered(session, stmt)
+        if rows:
+            self._set_cursor(rows[-1], len(rows))
+        return data
+
+    def _get_stream_statement(self) -> Select[Any]:
+        """Get the paged select statement fetching the result in batches from a server side cursor"""
+        paged, _ = self._get_paged_statement(self._built_select_statement())
+        return paged.execution_options(stream_results=True, yield_per=self.definition.yield_per)
+
+    def _iter_data(self, session: Session) -> Iterator[list[Any]]:
+        """Get the data from the database in batches of yield_per records, without loading the whole result"""
+        row_count: int = 0
+        last_row: Any = None
+        with self.definition.tracer.start_span('data') as span, self._timeout(session, 'data'):
+            paged: Select[Any] = self._get_stream_statement()
+            statement_params: dict[str, Any] = self._get_statement_params()
+            result: Result[Any] = session.execute(paged, statement_params)
+            for partition in result.partitions():
+                row_count += len(partition)
+                last_row = partition[-1]
+                yield self._get_records(partition)
+            if span.recording:
+                span.set_attribute('sql', paged)
+                span.set_attribute('params', statement_params)
+                span.set_attribute('rows', row_count)
+        if last_row is not None:
+            self._set_cursor(last_row, row_count)
+
+    def _query_search_panes(self, session: Session) -> None:
+        """Get the options of the search panes with their total and filtered counts in one grouped query"""
+        pane_indexes: list[int] = self.definition.search_panes
+        if not pane_indexes:
+            return
+        cache: SearchPanesCache | None = self.definition.search_panes_cache
+        if cache is not None:
+            self.search_panes = cache.get(self.table, self._get_filter_signature())
+            if self.search_panes is not None:
+                return
+        grouping_sets: bool = session.get_bind().dialect.name in GROUPING_SETS_DIALECTS
+        with self.definition.tracer.start_span('search_panes') as span:
+            key: str = f'search_panes:{grouping_sets}:{self._get_statement_key()}'
+            stmt: Any | None = self.definition.statement_cache.get(key)
+            if stmt is None:
+                global_search: SearchPredicate | None = self._get_global_search_predicate()
+                predicates: list[SearchPredicate] = [
+                    *self._get_column_search_predicates(),
+                    *([] if global_search is None else [global_search]),
+                ]
+                stmt = search_panes_statement(
+                    self.table,
+                    [(index, self._get_table_column_by_index(index)) for index in pane_indexes],
+                    and_(*[predicate.build() for predicate in predicates]) if predicates else None,
+                    grouping_sets,
+                )
+                self.definition.statement_cache.set(key, stmt)
+            statement_params: dict[str, Any] = self._get_statement_params()
+            with self._timeout(session, 'filtered_count'):
+                rows: list[Any] = list(session.execute(stmt, statement_params).all())
+            self.search_panes = search_pane_options(rows, pane_indexes, self.column_names, grouping_sets)
+            if span.recording:
+                span.set_attribute('sql', stmt)
+                span.set_attribute('params', statement_params)
+                span.set_attribute('rows', len(rows))
+        if cache is not None:
+            cache.set(self.table, self._get_filter_signature(), self.search_panes)
+
+    def _is_filtered(self) -> bool:
+        """Whether the request has a global or column search that can reduce the number of records"""
+        return self._get_global_search_predicate() is not None or bool(self._get_column_search_predicates())
+
+    def _query_records_total(self, session: Session) -> None:
+        # get total record count from the table
+        with self.definition.tracer.start_span('total_count') as span:
             self.records_total = self._get_records_total(session)
-            # get the select statement with all the search and order criteria
-            stmt: Select[Any] = self._built_select_statement()
+            if span.recording:
+                span.set_attribute('records_total', self.records_total)
+                span.set_attribute('approximate', self.records_total_approximate)
+
+    def _query_records_filtered_and_data(self, session: Session) -> None:
+        # get the select statement with all the search and order criteria
+        stmt: Select[Any] = self._built_select_statement()
+        if not self._is_filtered():
+            # without search criteria the filtered record count is the total record count, see _set_unfiltered_count
+            self.data = self._get_data(session, stmt)
+        elif self.definition.window_count and self._get_cached_records_filtered() is None:
+            # get the filtered records together with the filtered record count in one round trip
+            self.data = self._get_data(session, stmt, count_filtered=True)
+            self._cache_records_filtered(self.records_filtered)
+        else:
             # get the filtered record count from the statement that will also produce the data
-            self.records_filtered = self._get_records_filtered(session, stmt.subquery())
+            self.records_filtered = self._get_records_filtered(session, stmt)
             # get the filtered records from the database
             self.data = self._get_data(session, stmt)
 
+    def _run(self, session: Session) -> None:
+        self._query_records_total(session)
+        self._query_records_filtered_and_data(session)
+        self._query_search_panes(session)
+        self._set_unfiltered_count()
+
+    def _run_counts(self, session: Session) -> None:
+        """Get the record counts only, the data of streamed requests is queried by stream_result"""
+        self._query_records_total(session)
+        if self._is_filtered():
+            self.records_filtered = self._get_records_filtered(session, self._built_select_statement())
+        self._query_search_panes(session)
+        self._set_unfiltered_count()
+
+    def _set_unfiltered_count(self) -> None:
+        """
+        Complete the filtered count once the total is known, the total is queried concurrently in async datatables
+        """
+        if not self._is_filtered():
+            self.records_filtered = self.records_total
+            self.records_filtered_approximate = self.records_total_approximate
+        elif self.records_filtered_approximate:
+            # estimates are not consistent with each other, the filtered result can not be larger than the table
+            self.records_filtered = min(self.records_filtered, self.records_total)
+
     def output_result(self) -> dict[str, Any]:
         result: dict[str, Any] = {
             'start': self.params.start,
@@ -216,6 +1058,191 @@ class DataTable:
             'recordsFiltered': self.records_filtered,
             'data': self.data if self.data else [],
         }
+        if self.records_total_approximate:
+            result['recordsTotalApproximate'] = True
+        if self.records_filtered_approximate:
+            result['recordsFilteredApproximate'] = True
+        if self.cursor:
+            result['cursor'] = self.cursor
+        if self.search_panes is not None:
+            result['searchPanes'] = {'options': self.search_panes}
         if self.error:
             result['error'] = self.error
+        if self.error_code:
+            result['errorCode'] = self.error_code
         return result
+
+    def output_json(self) -> bytes:
+        """Get the output_result() serialized to utf-8 encoded json, with orjson or msgspec if installed"""
+        return dump_json_bytes(self.output_result())
+
+    def _stream_head(self, serializer: Callable[[Any], str]) -> str:
+        """Get the start of the streamed json response, everything up to the opening bracket of the data"""
+        result: dict[str, Any] = self.output_result()
+        del result['data']
+        return f'{serializer(result)[:-1]},"data":['
+
+    def _stream_tail(self, serializer: Callable[[Any], str]) -> str:
+        """Get the end of the streamed json response, the cursor and error are only known after the data"""
+        tail: str = ']'
+        if self.cursor:
+            tail += f',"cursor":{serializer(self.cursor)}'
+        if self.error:
+            tail += f',"error":{serializer(self.error)}'
+        if self.error_code:
+            tail += f',"errorCode":{serializer(self.error_code)}'
+        return f'{tail}}}'
+
+
+class DataTable(DataTableBase):
+    """
+    Sqlalchemy ORM-compatible data table class.
+    See https://www.datatables.net/manual/server-side#API
+
+    :param request_params: dict[str, Any] - the  query parameters sent via the jQuery datatables ajax request
+    :param table: table: FromClause - sqlalchemy FromClause
+    :param column_names: Sequence[str | Label] - table column names or labelled column expressions to display in the
+           datatable, used for projection in sql, see DataTableDefinition
+    :param engine: Engine | None -  sqlalchemy database engine, a new Session is opened for every request
+    :param callbacks: DTDataCallbacks  - callback that populate  DT_ROW_ID, DT_ROW_CLASS, DT_ROW_ATTR, DT_ROW_DATA
+    :param session: Session | Connection | Callable[[], Session] | None - run the queries through an externally
+           managed Session or Connection (left open, its transaction is joined but neither committed nor rolled back),
+           or through a Session created by the session factory (e.g. a sessionmaker), instead of the engine
+    :param definition: DataTableDefinition | None - reusable definition to run the request for, replaces table,
+           column_names, callbacks and options, engine and session default to the ones of the definition
+    :param stream: bool - only count the records in the constructor, the data is streamed by stream_result()
+    :param options: the other parameters of DataTableDefinition, e.g. keyset_column or count_strategy
+    :attr params: DTParams - parsed request parameters to use for result filtering, projection, sorting and paging
+    :attr recordsTotal: int -  the total number of records available in this model/table
+    :attr recordsFiltered: int - the number of records for the filtered result (before pagination)
+    :attr data: list[dict] | list[list] - the list of data objects (or arrays) sent to the datatable
+    :attr error: str -  if there was an error with data retrieval, this the error message will be sent instead
+    :attr cursor: str | None - keyset cursor pointing after the last row served, sent back for the next page
+    :attr records_total_approximate: bool - whether recordsTotal is an estimate
+    :attr records_filtered_approximate: bool - whether recordsFiltered is an estimate
+    :attr cached: bool - whether the response was served from the response cache
+    :attr etag: str | None - ETag of the response, with a response cache only, see not_modified()
+    """
+
+    engine: Engine | None
+    session: Session | Connection | Callable[[], Session] | None
+    stream: bool = False
+
+    def __init__(
+        self,
+        request_params: dict[str, Any],
+        table: FromClause | None = None,
+        column_names: Sequence[str | Label[Any]] | None = None,
+        engine: Engine | None = None,
+        callbacks: DTDataCallbacks | None = None,
+        session: Session | Connection | Callable[[], Session] | None = None,
+        definition: DataTableDefinition | None = None,
+        stream: bool = False,
+        **options: Any,
+    ):
+        if definition is not None and engine is None and session is None:
+            engine, session = definition.engine, definition.session
+        if (engine is None) == (session is None):
+            raise ValueError('DataTable requires either an engine or a session')
+        self.engine = engine
+        self.session = session
+        self.stream = stream
+        self.data = []
+        logging.info('initialize DataTable for %s', table if definition is None else definition.table)
+        started: int = time.time_ns()
+        try:
+            self.params = self._parse_params(request_params)
+            # the definition is validated for every request, unless a reusable definition is passed in
+            self.definition = self._get_definition(definition, table, column_names, callbacks, options)
+        except Exception as exc:
+            self._set_error(exc)
+            return
+        with self._start_request_span(started) as span:
+            try:
+                self._run_request()
+            except Exception as exc:
+                self._set_error(exc)
+            self._trace_result(span)
+
+    @contextmanager
+    def _get_session(self) -> Iterator[Session]:
+        """Get the session to run the queries with, only sessions opened here are closed again"""
+        if isinstance(self.session, Session):
+            yield self.session
+        elif isinstance(self.session, Connection):
+            with Session(bind=self.session) as session:
+                yield session
+        elif self.session is not None:
+            with self.session() as session:
+                yield session
+        else:
+            with Session(self.engine) as session:
+                yield session
+
+    def _run_request(self) -> None:
+        """Run the parsed request, or serve it from the response cache"""
+        self._apply_limits()
+        if not self.stream and self._get_cached_response():
+            return
+        with self._get_session() as session:
+            if self.stream:
+                self._run_counts(session)
+            else:
+                self._run(session)
+        if not self.stream:
+            self._cache_response()
+            self._prefetch_next_page()
+
+    def _prefetch_next_page(self) -> None:
+        """Prefetch the page after the served page in the background, if there is a prefetcher and a next page"""
+        prefetcher: PagePrefetcher | None = self.definition.prefetcher
+        length: int = self.params.length
+        if prefetcher is None or length < 1 or length > prefetcher.max_rows or len(self.data) < length:
+            return
+        if isinstance(self.session, (Session, Connection)):
+            # externally managed sessions and connections can not be used from other threads
+            return
+        next_page: DataTable = copy.copy(self)
+        next_page.params = replace(self.params, start=self.params.start + length, cursor=self.cursor or '')
+        max_offset: int | None = self.definition.max_offset
+        if max_offset is not None and next_page.params.start > max_offset and next_page._get_keyset_cursor() is None:
+            # the next page is beyond the offset limit, it would be rejected or clamped when requested
+            return
+        prefetcher.submit(next_page._get_page_key(), next_page._fetch_page)
+
+    def _fetch_page(self) -> tuple[list[Any], str | None]:
+        """Get the records and the keyset cursor of the page, for the prefetcher"""
+        with self._get_session() as session:
+            data: list[Any] = self._get_data(session, self._built_select_statement())
+        return data, self.cursor
+
+    def run(self, request_params: dict[str, Any]) -> None:
+        started: int = time.time_ns()
+        self.params = self._parse_params(request_params)
+        with self._start_request_span(started) as span:
+            self._run_request()
+            self._trace_result(span)
+
+    def stream_result(self, serializer: Callable[[Any], str] = dump_json) -> Iterator[str]:
+        """
+        Stream the json response of a request run with stream=True, e.g. for large pages or exports with length=-1.
+        The data is fetched from a server side cursor in batches of yield_per rows and serialized batch by batch,
+        so memory stays bounded by the batch size. The session is held until the iterator is exhausted or closed.
+        An error while streaming the data is reported in the error property after the rows streamed so far.
+        Without stream=True the output_result() is serialized as a whole.
+        :param serializer: Callable[[Any], str] - serializes the rows and values of the response to json
+        :return: Iterator[str] - the chunks of the json response, one per batch of rows
+        """
+        if not self.stream or self.error:
+            yield serializer(self.output_result())
+            return
+        yield self._stream_head(serializer)
+        try:
+            with self._get_session() as session:
+                separator: str = ''
+                for records in self._iter_data(session):
+                    yield separator + ','.join(serializer(record) for record in records)
+                    separator = ','
+        except Exception as exc:
+            self._set_error(exc)
+        yield self._stream_tail(serializer)
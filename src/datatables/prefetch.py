@@ -0,0 +1,86 @@
+import copy
+import logging
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import Callable
+
+from datatables.cache import MemoryCacheBackend
+
+
+class PagePrefetcher:
+    """
+    Prefetch the page after each served page on background threads and keep the prefetched pages in a small
+    in-process cache, so that paging forward is served without the data query.
+    The pages are keyed by the request shape, the search values, start and length: a changed search or order
+    misses the prefetched pages, which expire with their ttl or are evicted.
+    The row callbacks of prefetched pages run on the prefetch threads.
+    Used by DataTable for requests run through an engine or a session factory, sessions and connections
+    passed to the DataTable are not shared with the prefetch threads.
+
+    :param max_workers: int - number of prefetch threads, i.e. of pages prefetched concurrently
+    :param max_pending: int - maximal number of queued and running prefetches, pages are not prefetched beyond
+    :param maxsize: int - maximal number of prefetched pages kept, the least recently used page is evicted
+    :param max_rows: int - maximal page size (length) to prefetch, larger pages are not prefetched
+    :param ttl: float | None - time to live of prefetched pages in seconds, None for no expiry
+    """
+
+    max_pending: int
+    max_rows: int
+    pages: MemoryCacheBackend
+
+    def __init__(
+        self, max_workers: int = 2, max_pending: int = 8, maxsize: int = 32, max_rows: int = 500, ttl: float | None = 10
+    ):
+        if max_pending < 1:
+            raise ValueError('max_pending must be a positive integer')
+        self.max_pending = max_pending
+        self.max_rows = max_rows
+        self.pages = MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='datatables-prefetch')
+        self._pending: dict[str, Future[None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[list[Any], str | None] | None:
+        """Get a copy of the prefetched page, its records and keyset cursor, None if not prefetched"""
+        page: Any | None = self.pages.get(key)
+        return None if page is None else (copy.deepcopy(page[0]), page[1])
+
+    def submit(self, key: str, fetch: Callable[[], tuple[list[Any], str | None]]) -> bool:
+        """
+        Prefetch a page in the background, unless it is prefetched already or too many prefetches are pending
+        :param key: str - the key of the page
+        :param fetch: Callable[[], tuple[list[Any], str | None]] - gets the records and keyset cursor of the page
+        :return: bool - whether the prefetch was started
+        """
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending or self.pages.get(key) is not None:
+                return False
+            self._pending[key] = self._executor.submit(self._prefetch, key, fetch)
+            return True
+
+    def _prefetch(self, key: str, fetch: Callable[[], tuple[list[Any], str | None]]) -> None:
+        try:
+            self.pages.set(key, fetch())
+        except Exception as exc:
+            # the page is fetched again when requested
+            logging.warning('could not prefetch page: %s', exc)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Wait for the pending prefetches to finish"""
+        with self._lock:
+            pending: list[Future[None]] = list(self._pending.values())
+        wait(pending, timeout)
+
+    def clear(self) -> None:
+        """Drop all prefetched pages"""
+        self.pages.clear()
+
+    def shutdown(self) -> None:
+        """Stop the prefetch threads after the pending prefetches"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,531 @@
+import re
+from abc import ABC
+from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+from decimal import InvalidOperation
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Hashable
+
+from sqlalchemy import BindParameter
+from sqlalchemy import Boolean
+from sqlalchemy import Date
+from sqlalchemy import DateTime
+from sqlalchemy import Enum
+from sqlalchemy import Integer
+from sqlalchemy import Numeric
+from sqlalchemy import Select
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import false
+from sqlalchemy import func
+from sqlalchemy import literal_column
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import table as table_clause
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.sql.compiler import Compiled
+from sqlalchemy.sql.compiler import IdentifierPreparer
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.expression import TableClause
+
+if TYPE_CHECKING:
+    from datatables.datatable import DataTableDefinition
+
+GLOBAL_SEARCH_KEY: str = 'dt_search'
+
+
+def column_search_key(index: int) -> str:
+    """Name of the bind parameter of the search value of the column with the datatable column index"""
+    return f'dt_search_{index}'
+
+
+@dataclass(frozen=True)
+class SearchPredicate:
+    """
+    A search filter of a datatable request.
+    The criterion is only built for statements that are not in the statement cache, the search values are bound
+    to the bind parameters of the criterion when the statement is executed.
+
+    :param shape: Hashable - everything but the search values that determines the criterion, part of the cache key
+    :param params: dict[str, Any] - the values of the bind parameters of the criterion
+    :param build: Callable[[], ColumnElement[bool]] - builds the criterion from named bind parameters
+    """
+
+    shape: Hashable
+    params: dict[str, Any]
+    build: Callable[[], ColumnElement[bool]]
+
+
+class SearchStrategy:
+    """
+    Strategy turning the global and the column search values of a request into filter criteria.
+    The default strategy matches values containing the search value with LIKE '%value%' (or the regular expression
+    with regexp_match for regex searches), subclasses implement other, e.g. index-friendly, predicates.
+    """
+
+    def _bind(self, key: str) -> BindParameter[str]:
+        return bindparam(key, type_=String())
+
+    def get_pattern(self, value: str, regex: bool) -> str:
+        """Get the value bound to the search parameter for the search value"""
+        return value if regex else f'%{value}%'
+
+    def get_criterion(self, column: ColumnElement[Any], key: str, regex: bool) -> ColumnElement[bool]:
+        """Build the filter criterion of one column for the search value bound to the key"""
+        value: BindParameter[str] = self._bind(key)
+        return column.regexp_match(value) if regex else column.like(value)
+
+    def global_search(
+        self, columns: list[tuple[int, ColumnElement[Any]]], value: str, regex: bool
+    ) -> SearchPredicate | None:
+        """
+        Get the global search predicate, any of the searchable columns matches the search value
+        :param columns: list[tuple[int, ColumnElement]] - the datatable column indexes and columns to search
+        :param value: str - the global search value
+        :param regex: bool - whether the search value is a regular expression
+        :return: SearchPredicate | None - the predicate, None if there is nothing to search
+        """
+        if not columns:
+            return None
+
+        def build() -> ColumnElement[bool]:
+            return or_(*[self.get_criterion(column, GLOBAL_SEARCH_KEY, regex) for _, column in columns])
+
+        shape: Hashable = (type(self).__name__, regex, tuple(index for index, _ in columns))
+        return SearchPredicate(shape=shape, params={GLOBAL_SEARCH_KEY: self.get_pattern(value, regex)}, build=build)
+
+    def column_search(self, index: int, column: ColumnElement[Any], value: str, regex: bool) -> SearchPredicate | None:
+        """
+        Get the search predicate of an individual column search
+        :param index: int - the datatable column index of the column
+        :param column: ColumnElement - the column to search
+        :param value: str - the column search value
+        :param regex: bool - whether the search value is a regular expression
+        :return: SearchPredicate | None - the predicate, None if the column is not filtered
+        """
+        key: str = column_search_key(index)
+        return SearchPredicate(
+            shape=(type(self).__name__, regex, index),
+            params={key: self.get_pattern(value, regex)},
+            build=lambda: self.get_criterion(column, key, regex),
+        )
+
+
+class LikeSearch(SearchStrategy):
+    """Default search strategy, LIKE '%value%' or regexp_match for regex searches"""
+
+
+def _escape_like(value: str) -> str:
+    """Escape the like wildcards of the value, for patterns with escape character backslash"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+_DATE_PATTERN: re.Pattern[str] = re.compile(r'(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?$')
+
+
+def _global_search_key(index: int) -> str:
+    # the typed global search binds a value per column, apart from the column search values
+    return f'{GLOBAL_SEARCH_KEY}_all_{index}'
+
+
+def _next_month(year: int, month: int) -> date:
+    return date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+
+class TypedSearch(SearchStrategy):
+    """
+    Type aware search, the predicate of a column is chosen by its sqlalchemy type, so that it can use an index:
+    numbers are searched for by equality, dates by the range of the searched year, month or day,
+    enums by IN (the values containing the search value), booleans by equality and strings by LIKE 'value%'.
+    Numbers and dates also accept a range, e.g. 10..20 or 2024-01..2024-03.
+    Columns whose type can not match the search value are left out of the global search,
+    a column search that can not match any value filters out all rows.
+    Regex searches use regexp_match like the default strategy.
+
+    :param prefix: bool - match strings by prefix LIKE 'value%', LIKE '%value%' if False
+    """
+
+    prefix: bool
+
+    def __init__(self, prefix: bool = True):
+        self.prefix = prefix
+
+    @staticmethod
+    def _split_range(value: str) -> tuple[str, str] | None:
+        low, separator, high = value.partition('..')
+        return (low.strip(), high.strip()) if separator else None
+
+    @staticmethod
+    def _parse_number(column: ColumnElement[Any], value: str) -> Any | None:
+        try:
+            if isinstance(column.type, Integer):
+                return int(value)
+            number: Decimal = Decimal(value)
+        except (ValueError, InvalidOperation):
+            return None
+        if not number.is_finite():
+            return None
+        return number if getattr(column.type, 'asdecimal', True) else float(number)
+
+    @staticmethod
+    def _parse_date(value: str) -> tuple[date, date] | None:
+        """Get the half open range of days of a year, month or day"""
+        parts: re.Match[str] | None = _DATE_PATTERN.match(value)
+        if parts is None:
+            return None
+        year, month, day = (None if group is None else int(group) for group in parts.groups())
+        assert year is not None
+        try:
+            if month is None:
+                return date(year, 1, 1), date(year + 1, 1, 1)
+            if day is None:
+                return date(year, month, 1), _next_month(year, month)
+            return date(year, month, day), date(year, month, day) + timedelta(days=1)
+        except (ValueError, OverflowError):
+            return None
+
+    def _match_number(self, column: ColumnElement[Any], value: str) -> tuple[str, list[Any]] | None:
+        bounds: tuple[str, str] | None = self._split_range(value)
+        if bounds is None:
+            number: Any | None = self._parse_number(column, value)
+            return None if number is None else ('eq', [number])
+        low: Any | None = self._parse_number(column, bounds[0])
+        high: Any | None = self._parse_number(column, bounds[1])
+        return None if low is None or high is None else ('between', [low, high])
+
+    def _match_date(self, column: ColumnElement[Any], value: str) -> tuple[str, list[Any]] | None:
+        bounds: tuple[str, str] = self._split_range(value) or (value, value)
+        low: tuple[date, date] | None = self._parse_date(bounds[0])
+        high: tuple[date, date] | None = self._parse_date(bounds[1])
+        if low is None or high is None:
+            if isinstance(column.type, DateTime) and bounds[0] == bounds[1]:
+                try:
+                    return 'eq', [datetime.fromisoformat(value)]
+                except ValueError:
+                    return None
+            return None
+        start, end = low[0], high[1]
+        if isinstance(column.type, DateTime):
+            return 'range', [datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())]
+        return 'range', [start, end]
+
+    def _match_enum(self, column: ColumnElement[Any], value: str) -> tuple[str, list[Any]] | None:
+        enums: list[str] = list(getattr(column.type, 'enums', []))
+        matching: list[str] = [enum for enum in enums if value.lower() in enum.lower()]
+        return ('in', [matching]) if matching else None
+
+    @staticmethod
+    def _match_boolean(value: str) -> tuple[str, list[Any]] | None:
+        normalized: str = value.lower()
+        if normalized in ('true', 'yes', '1'):
+            return 'eq', [True]
+        if normalized in ('false', 'no', '0'):
+            return 'eq', [False]
+        return None
+
+    def _match_string(self, value: str) -> tuple[str, list[Any]]:
+        escaped: str = _escape_like(value)
+        return 'like', [f'{escaped}%' if self.prefix else f'%{escaped}%']
+
+    def match(self, column: ColumnElement[Any], value: str) -> tuple[str, list[Any]] | None:
+        """
+        Choose the predicate for the column type and the search value
+        :param column: ColumnElement - the column to search
+        :param value: str - the search value
+        :return: tuple[str, list] | None - the kind of predicate (eq, between, range, in or like) and its values,
+                 None if no value of the column can match the search value
+        """
+        value = value.strip()
+        if not value:
+            return None
+        column_type: Any = column.type
+        # Enum is a String subtype, check it first
+        if isinstance(column_type, Enum):
+            return self._match_enum(column, value)
+        if isinstance(column_type, Boolean):
+            return self._match_boolean(value)
+        if isinstance(column_type, (Integer, Numeric)):
+            return self._match_number(column, value)
+        if isinstance(column_type, (Date, DateTime)):
+            return self._match_date(column, value)
+        if isinstance(column_type, String):
+            return self._match_string(value)
+        return None
+
+    @staticmethod
+    def _get_params(key: str, kind: str, values: list[Any]) -> dict[str, Any]:
+        if kind in ('between', 'range'):
+            return {f'{key}_low': values[0], f'{key}_high': values[1]}
+        return {key: values[0]}
+
+    def get_typed_criterion(self, column: ColumnElement[Any], key: str, kind: str) -> ColumnElement[bool]:
+        """Build the filter criterion of the kind for the values bound to the key, see match"""
+        match kind:
+            case 'like':
+                return column.like(self._bind(key), escape='\\')
+            case 'in':
+                return column.in_(bindparam(key, expanding=True))
+            case 'between':
+                low: BindParameter[Any] = bindparam(f'{key}_low', type_=column.type)
+                return column.between(low, bindparam(f'{key}_high', type_=column.type))
+            case 'range':
+                start: BindParameter[Any] = bindparam(f'{key}_low', type_=column.type)
+                return and_(column >= start, column < bindparam(f'{key}_high', type_=column.type))
+        return column == bindparam(key, type_=column.type)
+
+    def global_search(
+        self, columns: list[tuple[int, ColumnElement[Any]]], value: str, regex: bool
+    ) -> SearchPredicate | None:
+        if regex or not value.strip():
+            return super().global_search(columns, value, regex)
+        if not columns:
+            return None
+        matches: list[tuple[int, ColumnElement[Any], str]] = []
+        params: dict[str, Any] = {}
+        for index, column in columns:
+            matched: tuple[str, list[Any]] | None = self.match(column, value)
+            if matched is not None:
+                matches.append((index, column, matched[0]))
+                params.update(self._get_params(_global_search_key(index), *matched))
+
+        def build() -> ColumnElement[bool]:
+            if not matches:
+                # the search value can not match any of the searchable columns
+                return false()
+            return or_(*[self.get_typed_criterion(column, _global_search_key(i), kind) for i, column, kind in matches])
+
+        shape: Hashable = (type(self).__name__, self.prefix, tuple((index, kind) for index, _, kind in matches))
+        return SearchPredicate(shape=shape, params=params, build=build)
+
+    def column_search(self, index: int, column: ColumnElement[Any], value: str, regex: bool) -> SearchPredicate | None:
+        if regex or not value.strip():
+            return super().column_search(index, column, value, regex)
+        key: str = column_search_key(index)
+        matched: tuple[str, list[Any]] | None = self.match(column, value)
+        if matched is None:
+            return SearchPredicate(shape=(type(self).__name__, index, None), params={}, build=false)
+        kind: str = matched[0]
+        return SearchPredicate(
+            shape=(type(self).__name__, self.prefix, index, kind),
+            params=self._get_params(key, *matched),
+            build=lambda: self.get_typed_criterion(column, key, kind),
+        )
+
+
+class TrigramSearch(SearchStrategy):
+    """
+    Case insensitive contains search, column ILIKE '%value%', served by pg_trgm GIN indexes on PostgreSQL,
+    see trigram_index_ddl. Other dialects compile ILIKE to lower(column) LIKE lower(value).
+    With similarity the columns are matched by the pg_trgm similarity operator column % value instead,
+    which tolerates typos, its threshold is the pg_trgm.similarity_threshold setting (PostgreSQL only).
+    Regex searches use regexp_match like the default strategy.
+
+    :param similarity: bool - match by trigram similarity instead of ILIKE
+    """
+
+    similarity: bool
+
+    def __init__(self, similarity: bool = False):
+        self.similarity = similarity
+
+    def get_pattern(self, value: str, regex: bool) -> str:
+        if regex or self.similarity:
+            return value
+        return f'%{_escape_like(value)}%'
+
+    def get_criterion(self, column: ColumnElement[Any], key: str, regex: bool) -> ColumnElement[bool]:
+        if regex:
+            return super().get_criterion(column, key, regex)
+        if self.similarity:
+            return column.op('%', is_comparison=True)(self._bind(key))
+        return column.ilike(self._bind(key), escape='\\')
+
+    def global_search(
+        self, columns: list[tuple[int, ColumnElement[Any]]], value: str, regex: bool
+    ) -> SearchPredicate | None:
+        predicate: SearchPredicate | None = super().global_search(columns, value, regex)
+        if predicate is None:
+            return None
+        return SearchPredicate(shape=(predicate.shape, self.similarity), params=predicate.params, build=predicate.build)
+
+    def column_search(self, index: int, column: ColumnElement[Any], value: str, regex: bool) -> SearchPredicate | None:
+        predicate: SearchPredicate | None = super().column_search(index, column, value, regex)
+        if predicate is None:
+            return None
+        return SearchPredicate(shape=(predicate.shape, self.similarity), params=predicate.params, build=predicate.build)
+
+
+def trigram_index_ddl(definition: 'DataTableDefinition', concurrently: bool = True) -> list[str]:
+    """
+    Generate the PostgreSQL DDL of the pg_trgm GIN indexes serving TrigramSearch on the searchable columns.
+    Only string columns of tables are indexed, enums and computed columns are skipped.
+    :param definition: DataTableDefinition - the datatable definition to index the searchable columns of
+    :param concurrently: bool - build the indexes without locking out writes, must run outside of a transaction
+    :return: list[str] - CREATE EXTENSION pg_trgm followed by a CREATE INDEX statement per column
+    """
+    preparer: IdentifierPreparer = postgresql.dialect().identifier_preparer  # type: ignore[no-untyped-call]
+    statements: list[str] = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+    for index in sorted(definition.searchable):
+        column: ColumnElement[Any] = definition.columns[index]
+        table: Any = getattr(column, 'table', None)
+        if not isinstance(table, Table) or not isinstance(column.type, String) or isinstance(column.type, Enum):
+            continue
+        column_name: str = column.name
+        # postgres truncates identifiers to 63 characters
+        name: str = f'ix_{table.name}_{column_name}_trgm'[:63]
+        statements.append(
+            f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}IF NOT EXISTS {preparer.quote(name)} '
+            f'ON {preparer.format_table(table)} USING gin ({preparer.quote(column_name)} gin_trgm_ops)'
+        )
+    return statements
+
+
+def _expression_key(expression: ColumnElement[Any]) -> str:
+    """Cache key of an expression, its sql and its bound values, e.g. of literals"""
+    compiled: Compiled = expression.compile()
+    return f'{compiled}{sorted(compiled.params.items())!r}'
+
+
+class _FullTextSearch(SearchStrategy, ABC):
+    """
+    Global search against a full text index, regex searches and column searches use the column search strategy
+    :param column_search: SearchStrategy | None - strategy for the column searches, defaults to LikeSearch
+    """
+
+    column_strategy: SearchStrategy
+
+    def __init__(self, column_search: SearchStrategy | None = None):
+        self.column_strategy = LikeSearch() if column_search is None else column_search
+
+    def get_query(self, value: str) -> str:
+        """Get the full text query bound to the search parameter for the search value"""
+        return value
+
+    @abstractmethod
+    def get_config_shape(self) -> Hashable:
+        """Get the configuration of the strategy that shapes the match criterion, part of the predicate shape"""
+
+    @abstractmethod
+    def get_match_criterion(self, columns: list[ColumnElement[Any]], key: str) -> ColumnElement[bool]:
+        """Build the full text match criterion for the query bound to the key"""
+
+    def global_search(
+        self, columns: list[tuple[int, ColumnElement[Any]]], value: str, regex: bool
+    ) -> SearchPredicate | None:
+        if regex:
+            return self.column_strategy.global_search(columns, value, regex)
+        if not columns:
+            return None
+        query: str = self.get_query(value)
+        if not query:
+            return None
+        search_columns: list[ColumnElement[Any]] = [column for _, column in columns]
+        return SearchPredicate(
+            shape=(type(self).__name__, self.get_config_shape(), tuple(index for index, _ in columns)),
+            params={GLOBAL_SEARCH_KEY: query},
+            build=lambda: self.get_match_criterion(search_columns, GLOBAL_SEARCH_KEY),
+        )
+
+    def column_search(self, index: int, column: ColumnElement[Any], value: str, regex: bool) -> SearchPredicate | None:
+        return self.column_strategy.column_search(index, column, value, regex)
+
+
+class PostgresFullTextSearch(_FullTextSearch):
+    """
+    Global search with the PostgreSQL full text search, document @@ plainto_tsquery(config, value).
+    :param document: ColumnElement | None - tsvector column or expression matching a GIN index, e.g. a generated
+           column, defaults to to_tsvector(config, concat_ws(' ', searchable columns))
+    :param config: str - text search configuration, e.g. simple or english
+    :param column_search: SearchStrategy | None - strategy for the column searches, defaults to LikeSearch
+    """
+
+    document: ColumnElement[Any] | None
+    config: str
+
+    def __init__(
+        self,
+        document: ColumnElement[Any] | None = None,
+        config: str = 'simple',
+        column_search: SearchStrategy | None = None,
+    ):
+        super().__init__(column_search)
+        self.document = document
+        self.config = config
+
+    def get_config_shape(self) -> Hashable:
+        return self.config, None if self.document is None else _expression_key(self.document)
+
+    def get_match_criterion(self, columns: list[ColumnElement[Any]], key: str) -> ColumnElement[bool]:
+        document: ColumnElement[Any]
+        if self.document is not None:
+            document = self.document
+        else:
+            document = func.to_tsvector(self.config, func.concat_ws(' ', *columns))
+        return document.op('@@')(func.plainto_tsquery(self.config, self._bind(key)))
+
+
+class SQLiteFullTextSearch(_FullTextSearch):
+    """
+    Global search with a SQLite FTS5 table indexing the datatable table, e.g. an external content table
+    CREATE VIRTUAL TABLE users_fts USING fts5(username, email_address, content='users', content_rowid='id').
+    Every term of the search value is matched as prefix: key IN (SELECT rowid FROM fts WHERE fts MATCH '"term"*').
+    :param fts_table: str - name of the FTS5 table
+    :param key: ColumnElement - the column of the datatable table the rowid of the FTS5 table refers to
+    :param column_search: SearchStrategy | None - strategy for the column searches, defaults to LikeSearch
+    """
+
+    fts_table: TableClause
+    key: ColumnElement[Any]
+
+    def __init__(self, fts_table: str, key: ColumnElement[Any], column_search: SearchStrategy | None = None):
+        super().__init__(column_search)
+        self.fts_table = table_clause(fts_table)
+        self.key = key
+
+    def get_config_shape(self) -> Hashable:
+        return self.fts_table.name, _expression_key(self.key)
+
+    def get_query(self, value: str) -> str:
+        # quoted terms can not be mistaken for fts5 query syntax
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in value.split())
+
+    def get_match_criterion(self, columns: list[ColumnElement[Any]], key: str) -> ColumnElement[bool]:
+        matching: Select[Any] = select(literal_column('rowid')).select_from(self.fts_table)
+        matching = matching.where(literal_column(self.fts_table.name).op('MATCH')(self._bind(key)))
+        return self.key.in_(matching)
+
+
+class MySQLFullTextSearch(_FullTextSearch):
+    """
+    Global search with MySQL full text search in boolean mode, MATCH (columns) AGAINST ('+term*' IN BOOLEAN MODE).
+    Every term of the search value is required and matched as prefix.
+    :param columns: list[ColumnElement] | None - the columns of the FULLTEXT index, the searchable columns by default,
+           MATCH requires a FULLTEXT index on exactly these columns
+    :param column_search: SearchStrategy | None - strategy for the column searches, defaults to LikeSearch
+    """
+
+    columns: list[ColumnElement[Any]] | None
+
+    def __init__(self, columns: list[ColumnElement[Any]] | None = None, column_search: SearchStrategy | None = None):
+        super().__init__(column_search)
+        self.columns = columns
+
+    def get_config_shape(self) -> Hashable:
+        return None if self.columns is None else tuple(_expression_key(column) for column in self.columns)
+
+    def get_query(self, value: str) -> str:
+        # boolean mode operators in the search value are dropped
+        terms: list[str] = [re.sub(r'[+\-<>()~*"@]', '', term) for term in value.split()]
+        return ' '.join(f'+{term}*' for term in terms if term)
+
+    def get_match_criterion(self, columns: list[ColumnElement[Any]], key: str) -> ColumnElement[bool]:
+        return match(*(self.columns or columns), against=self._bind(key)).in_boolean_mode()
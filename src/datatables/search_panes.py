@@ -0,0 +1,120 @@
+from typing import Any
+from typing import Sequence
+
+from sqlalchemy import CompoundSelect
+from sqlalchemy import Enum
+from sqlalchemy import FromClause
+from sqlalchemy import Integer
+from sqlalchemy import Select
+from sqlalchemy import String
+from sqlalchemy import bindparam
+from sqlalchemy import case
+from sqlalchemy import cast
+from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy import union_all
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.elements import Label
+
+from datatables.search import SearchPredicate
+
+# dialects grouping by all pane columns in one pass with GROUP BY GROUPING SETS, the others union a GROUP BY per column
+GROUPING_SETS_DIALECTS: frozenset[str] = frozenset({'postgresql', 'mssql', 'oracle'})
+
+
+def search_pane_value(column: ColumnElement[Any]) -> ColumnElement[Any]:
+    """
+    Get the value of the column as listed in its search pane, as string, so that the values of all panes fit in one
+    result column and the selected values sent back by the client compare to them regardless of the column type,
+    enums are cast as well, their values are strings but the enum type would validate the values of the other panes
+    """
+    expression: ColumnElement[Any] = column.element if isinstance(column, Label) else column
+    if isinstance(expression.type, String) and not isinstance(expression.type, Enum):
+        return expression
+    return cast(expression, String)
+
+
+def search_pane_predicate(index: int, column: ColumnElement[Any], values: list[str]) -> SearchPredicate:
+    """
+    Get the filter of the values selected in the search pane of a column
+    :param index: int - the datatable column index
+    :param column: ColumnElement - the column
+    :param values: list[str] - the selected values, the rows with one of the values are kept
+    """
+    key: str = f'dt_pane_{index}'
+    return SearchPredicate(
+        shape=('pane', index),
+        params={key: values},
+        build=lambda: search_pane_value(column).in_(bindparam(key, expanding=True)),
+    )
+
+
+def search_panes_statement(
+    table: FromClause,
+    panes: Sequence[tuple[int, ColumnElement[Any]]],
+    criterion: ColumnElement[bool] | None,
+    grouping_sets: bool,
+) -> 'Select[Any] | CompoundSelect[Any]':
+    """
+    Build the query of the options of all search panes, counting the rows of each value in total and under the filter
+    of the request in one statement, see search_pane_options for its result
+    :param table: FromClause - the datatable table
+    :param panes: Sequence[tuple[int, ColumnElement]] - the datatable column indexes and columns of the search panes
+    :param criterion: ColumnElement[bool] | None - the filter of the request, None if it is not filtered
+    :param grouping_sets: bool - group by all pane columns in one pass with GROUPING SETS, see GROUPING_SETS_DIALECTS,
+           union a GROUP BY query per column otherwise
+    """
+    count: ColumnElement[Any] = func.count() if criterion is None else func.sum(case((criterion, 1), else_=0))
+    values: list[ColumnElement[Any]] = [search_pane_value(column) for _, column in panes]
+    if grouping_sets:
+        return (
+            select(
+                *[value.label(f'dt_value_{i}') for i, value in enumerate(values)],
+                *[func.grouping(value).label(f'dt_grouping_{i}') for i, value in enumerate(values)],
+                func.count().label('dt_total'),
+                count.label('dt_count'),
+            )
+            .select_from(table)
+            .group_by(func.grouping_sets(*values))
+        )
+    return union_all(
+        *[
+            select(
+                literal(index, Integer).label('dt_pane'),
+                value.label('dt_value'),
+                func.count().label('dt_total'),
+                count.label('dt_count'),
+            )
+            .select_from(table)
+            .where(value.is_not(None))
+            .group_by(value)
+            for (index, _), value in zip(panes, values, strict=True)
+        ]
+    )
+
+
+def search_pane_options(
+    rows: Sequence[Any], pane_indexes: Sequence[int], column_names: Sequence[str], grouping_sets: bool
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Get the options of the search panes from the result of the search_panes_statement,
+    in the format of the SearchPanes server-side protocol, the null values are not listed
+    :return: dict[str, list[dict]] - the label, value, total and filtered count of the values by column name
+    """
+    options: dict[str, list[dict[str, Any]]] = {column_names[index]: [] for index in pane_indexes}
+    count: int = len(pane_indexes)
+    for row in rows:
+        if grouping_sets:
+            # the values of the columns not grouped by in the grouping set of the row are null
+            i: int = next(i for i in range(count) if row[count + i] == 0)
+            index, value, total, filtered = pane_indexes[i], row[i], row[-2], row[-1]
+        else:
+            index, value, total, filtered = row
+        if value is not None:
+            options[column_names[index]].append(
+                {'label': value, 'total': int(total), 'value': value, 'count': int(filtered or 0)}
+            )
+    for values in options.values():
+        values.sort(key=lambda option: option['value'])
+    return options
@@ -0,0 +1,50 @@
+import importlib
+import json
+from datetime import date
+from datetime import datetime
+from datetime import time
+from decimal import Decimal
+from types import ModuleType
+from typing import Any
+from uuid import UUID
+
+
+def _import_optional(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# optional fast json encoders, see the orjson extra
+_orjson: ModuleType | None = _import_optional('orjson')
+_msgspec_json: ModuleType | None = _import_optional('msgspec.json')
+
+
+def json_default(value: Any) -> Any:
+    """
+    Serialize the column values the json encoders do not handle natively,
+    dates and times in ISO 8601 format, decimals as strings to keep their precision, UUIDs as strings
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dump_json(value: Any) -> str:
+    """Serialize the value to a json string with the standard library json module"""
+    return json.dumps(value, default=json_default)
+
+
+def dump_json_bytes(value: Any) -> bytes:
+    """
+    Serialize the value to utf-8 encoded json with the fastest encoder installed, orjson, msgspec or json.
+    Dates, times, decimals and UUIDs are serialized the same way by all of them, see json_default.
+    """
+    if _orjson is not None:
+        return bytes(_orjson.dumps(value, default=json_default))
+    if _msgspec_json is not None:
+        return bytes(_msgspec_json.encode(value, enc_hook=json_default))
+    return dump_json(value).encode()
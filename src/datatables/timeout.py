@@ -0,0 +1,126 @@
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+# sqlstate query_canceled of postgres and error number ER_QUERY_TIMEOUT of mysql
+_POSTGRESQL_QUERY_CANCELED: str = '57014'
+_MYSQL_QUERY_TIMEOUT: int = 3024
+
+
+@dataclass(frozen=True)
+class QueryTimeouts:
+    """
+    Timeouts in seconds of the queries of a datatable request, None for no timeout
+
+    :param total_count: float | None - the count of all records (recordsTotal)
+    :param filtered_count: float | None - the count of the filtered records (recordsFiltered)
+    :param data: float | None - the query of the page, including the window count of the filtered records
+    """
+
+    total_count: float | None = None
+    filtered_count: float | None = None
+    data: float | None = None
+
+    @classmethod
+    def of(cls, timeout: 'float | QueryTimeouts | None') -> 'QueryTimeouts':
+        """Get the timeouts, a number is the timeout of every query"""
+        if isinstance(timeout, QueryTimeouts):
+            return timeout
+        return cls(total_count=timeout, filtered_count=timeout, data=timeout)
+
+
+def is_timeout_error(exc: DBAPIError) -> bool:
+    """Whether the database error was raised for a statement cancelled by its statement timeout"""
+    orig: Any = exc.orig
+    # pgcode of psycopg2, sqlstate of psycopg 3 and asyncpg
+    sqlstate: str | None = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    if sqlstate == _POSTGRESQL_QUERY_CANCELED:
+        return True
+    args: tuple[Any, ...] = getattr(orig, 'args', ())
+    if args and args[0] == _MYSQL_QUERY_TIMEOUT:
+        return True
+    # sqlite3.OperationalError raised for statements interrupted by the progress handler
+    return str(orig) == 'interrupted'
+
+
+def _get_driver_connection(session: Session) -> Any:
+    return session.connection().connection.driver_connection
+
+
+@contextmanager
+def _postgresql_timeout(session: Session, milliseconds: int) -> Iterator[None]:
+    # a cancelled statement aborts the transaction, the savepoint isolates it from the (joined) transaction,
+    # set_config(..., true) is SET LOCAL, it is rolled back with the savepoint and restored otherwise
+    with session.begin_nested():
+        previous: str | None = session.scalar(text("SELECT current_setting('statement_timeout')"))
+        session.execute(text("SELECT set_config('statement_timeout', :value, true)"), {'value': str(milliseconds)})
+        yield
+        session.execute(text("SELECT set_config('statement_timeout', :value, true)"), {'value': previous})
+
+
+@contextmanager
+def _mysql_timeout(session: Session, milliseconds: int) -> Iterator[None]:
+    # max_execution_time only applies to read-only SELECT statements
+    previous: Any | None = session.scalar(text('SELECT @@SESSION.max_execution_time'))
+    session.execute(text('SET SESSION max_execution_time = :value'), {'value': milliseconds})
+    try:
+        yield
+    finally:
+        session.execute(text('SET SESSION max_execution_time = :value'), {'value': previous or 0})
+
+
+@contextmanager
+def _sqlite_timeout(session: Session, seconds: float) -> Iterator[None]:
+    connection: Any = _get_driver_connection(session)
+    set_progress_handler: Callable[..., Any] | None = getattr(connection, 'set_progress_handler', None)
+    if set_progress_handler is None or inspect.iscoroutinefunction(set_progress_handler):
+        # e.g. aiosqlite, its connection is only usable from its own thread
+        logging.debug('statement timeout is not supported by the sqlite driver')
+        yield
+        return
+    deadline: float = time.monotonic() + seconds
+    # a non-zero return value of the handler interrupts the running statement
+    set_progress_handler(lambda: int(time.monotonic() > deadline), 10_000)
+    try:
+        yield
+    finally:
+        set_progress_handler(None, 0)
+
+
+@contextmanager
+def statement_timeout(session: Session, seconds: float | None) -> Iterator[None]:
+    """
+    Limit the execution time of the statements executed in the context, with the mechanism of the dialect:
+    PostgreSQL statement_timeout (SET LOCAL in a savepoint), MySQL max_execution_time and a progress handler
+    interrupting SQLite statements. The previous setting is restored on exit and a timed out statement leaves
+    the transaction usable, see is_timeout_error to tell timeouts from other errors.
+    Other dialects run without a timeout.
+    :param session: Session - the session executing the statements
+    :param seconds: float | None - the timeout in seconds, None for no timeout
+    """
+    if seconds is None:
+        yield
+        return
+    milliseconds: int = max(1, int(seconds * 1000))
+    match session.get_bind().dialect.name:
+        case 'postgresql':
+            with _postgresql_timeout(session, milliseconds):
+                yield
+        case 'mysql' | 'mariadb':
+            with _mysql_timeout(session, milliseconds):
+                yield
+        case 'sqlite':
+            with _sqlite_timeout(session, seconds):
+                yield
+        case name:
+            logging.debug('statement timeout is not supported for %s', name)
+            yield
@@ -0,0 +1,130 @@
+import importlib
+import time
+from types import ModuleType
+from types import TracebackType
+from typing import Any
+from typing import Callable
+
+
+class DTSpan:
+    """
+    Span of a phase of a datatable request, a context manager ending the span on exit.
+    The base class records nothing, it is the span of the default tracer, check recording before
+    collecting expensive attributes.
+    """
+
+    __slots__ = ()
+
+    recording: bool = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Set an attribute of the span: rows, records_total, records_filtered, approximate, error,
+        sql - the executed statement, rendered only by tracers calling str() on it, and params - its bound parameters
+        """
+
+    def end(self, error: BaseException | None = None) -> None:
+        """End the span, with the exception the phase failed with"""
+
+    def __enter__(self) -> 'DTSpan':
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self.end(exc)
+
+
+_NOOP_SPAN: DTSpan = DTSpan()
+
+
+class DTTracer:
+    """
+    Tracer of the phases of datatable requests, set as tracer of the DataTableDefinition.
+    A request span contains the spans of the phases parse, total_count, filtered_count, data and callbacks,
+    the data phase of streamed requests is traced by stream_result().
+    The base class traces nothing at the cost of a method call per phase, subclass it and override start_span
+    to trace the phases, see CallbackTracer and OpenTelemetryTracer.
+    """
+
+    def start_span(self, phase: str, start_time: int | None = None) -> DTSpan:
+        """
+        Start the span of a phase
+        :param phase: str - request, parse, total_count, filtered_count, data or callbacks
+        :param start_time: int | None - start of the phase in nanoseconds since the epoch (time.time_ns()), now for None
+        """
+        return _NOOP_SPAN
+
+
+class _CallbackSpan(DTSpan):
+    __slots__ = ('callback', 'phase', 'start_time', 'attributes')
+
+    recording: bool = True
+
+    def __init__(self, callback: Callable[[str, float, dict[str, Any]], None], phase: str, start_time: int) -> None:
+        self.callback = callback
+        self.phase = phase
+        self.start_time = start_time
+        self.attributes: dict[str, Any] = {}
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: BaseException | None = None) -> None:
+        if error is not None:
+            self.attributes['error'] = str(error)
+        self.callback(self.phase, (time.time_ns() - self.start_time) / 1e9, self.attributes)
+
+
+class CallbackTracer(DTTracer):
+    """
+    Call the callback at the end of each phase, e.g. to log slow phases or to collect metrics
+    :param callback: Callable[[str, float, dict[str, Any]], None] - called with the phase, its duration in seconds
+           and the attributes of its span, the sql attribute is the statement, str() renders it
+    """
+
+    def __init__(self, callback: Callable[[str, float, dict[str, Any]], None]) -> None:
+        self.callback = callback
+
+    def start_span(self, phase: str, start_time: int | None = None) -> DTSpan:
+        return _CallbackSpan(self.callback, phase, time.time_ns() if start_time is None else start_time)
+
+
+class _OpenTelemetrySpan(DTSpan):
+    __slots__ = ('context', 'span', 'recording')
+
+    def __init__(self, context: Any) -> None:
+        # the context manager of start_as_current_span, the span is the current span (the parent of the phases) until
+        # the context is exited
+        self.context = context
+        self.span: Any = context.__enter__()
+        self.recording: bool = self.span.is_recording()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if key == 'sql':
+            self.span.set_attribute('db.statement', str(value))
+        elif key == 'params':
+            self.span.set_attribute('datatables.params', repr(value))
+        else:
+            self.span.set_attribute(f'datatables.{key}', value)
+
+    def end(self, error: BaseException | None = None) -> None:
+        # records the exception and sets the error status of the span
+        self.context.__exit__(None if error is None else type(error), error, None)
+
+
+class OpenTelemetryTracer(DTTracer):
+    """
+    Trace the phases as OpenTelemetry spans named datatables.<phase>, requires the opentelemetry-api package,
+    see the opentelemetry extra. The sql is rendered into the db.statement attribute of recording spans only.
+    :param tracer: Any - opentelemetry Tracer, defaults to the tracer named datatables of the global tracer provider
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        if tracer is None:
+            trace: ModuleType = importlib.import_module('opentelemetry.trace')
+            tracer = trace.get_tracer('datatables')
+        self.tracer = tracer
+
+    def start_span(self, phase: str, start_time: int | None = None) -> DTSpan:
+        return _OpenTelemetrySpan(self.tracer.start_as_current_span(f'datatables.{phase}', start_time=start_time))
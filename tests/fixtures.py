@@ -1,7 +1,11 @@
+import threading
+from pathlib import Path
 from typing import Any
+from typing import Iterator
 
 import pytest
 from sqlalchemy import FromClause
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import Engine
 from sqlalchemy.future import create_engine
@@ -152,6 +156,36 @@ def engine() -> Engine:
     return engine
 
 
+@pytest.fixture(scope='module')
+def file_engine(tmp_path_factory: pytest.TempPathFactory) -> Engine:
+    """
+    Engine of a database file with the users, for tests using several connections, e.g. from threads,
+    the connections of an in-memory database do not share it
+    """
+    path: Path = tmp_path_factory.mktemp('users') / 'users.db'
+    engine = create_engine(url=f'sqlite:///{path}')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([User(**user_dict) for user_dict in users.values()])
+        session.commit()
+    return engine
+
+
+@pytest.fixture(scope='function')
+def statements(engine: Engine) -> Iterator[list[str]]:
+    """The sql statements executed on the engine by the test, the statements of other threads are not recorded"""
+    executed: list[str] = []
+    thread: threading.Thread = threading.current_thread()
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if threading.current_thread() is thread:
+            executed.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
 @pytest.fixture(scope='module', autouse=True)
 def setup_db(engine) -> bool:
     Base.metadata.create_all(engine)
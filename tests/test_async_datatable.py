@@ -0,0 +1,156 @@
+import asyncio
+import json
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import Integer
+from sqlalchemy import column
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from datatables import datatable
+from datatables.async_datatable import AsyncDataTable
+from datatables.cache import TotalCountCache
+from datatables.count import CountStrategy
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import file_engine
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert column_names is not None
+    assert table is not None
+    assert file_engine is not None
+
+
+@pytest.fixture(scope='module')
+def async_engine(file_engine: Engine) -> AsyncEngine:
+    # a database file, the concurrent queries run on separate connections
+    return create_async_engine(url=f'sqlite+aiosqlite:///{file_engine.url.database}')
+
+
+def _run(async_engine: AsyncEngine, table: FromClause, column_names: list[str], **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom.org', length=5)
+
+    async def run() -> dict[str, Any]:
+        datatable: AsyncDataTable = AsyncDataTable(
+            table=table, column_names=column_names, **{'engine': async_engine, **kwargs}
+        )
+        await datatable.run(query_params)
+        return datatable.output_result()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_async_datatable(
+    async_engine: AsyncEngine, table: FromClause, column_names: list[str], concurrent: bool
+) -> None:
+    output: dict[str, Any] = _run(async_engine, table, column_names, concurrent=concurrent)
+    assert 'error' not in output
+    assert output['draw'] == 1
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 8
+    assert len(output['data']) == 5
+    assert list(output['data'][0].keys()) == column_names
+    assert [row['id'] for row in output['data']] == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_async_datatable_estimated_count(
+    async_engine: AsyncEngine,
+    table: FromClause,
+    column_names: list[str],
+    concurrent: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(datatable, 'estimate_query_count', lambda *args: 5000)
+    output: dict[str, Any] = _run(
+        async_engine, table, column_names, concurrent=concurrent, count_strategy=CountStrategy.ESTIMATED
+    )
+    # the estimated filtered count is clamped to the total once both are known
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 20
+    assert output['recordsFilteredApproximate'] is True
+
+
+def test_async_datatable_window_count(async_engine: AsyncEngine, table: FromClause, column_names: list[str]) -> None:
+    output: dict[str, Any] = _run(async_engine, table, column_names, concurrent=True, window_count=True)
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 8
+
+
+def test_async_datatable_session(async_engine: AsyncEngine, table: FromClause, column_names: list[str]) -> None:
+    output: dict[str, Any] = _run(
+        async_engine, table, column_names, concurrent=True, session=async_sessionmaker(async_engine), engine=None
+    )
+    assert output['recordsFiltered'] == 8
+
+    async def run() -> dict[str, Any]:
+        async with AsyncSession(async_engine) as session:
+            datatable: AsyncDataTable = AsyncDataTable(
+                table=table, column_names=column_names, session=session, concurrent=True
+            )
+            await datatable.run(create_query_params(column_names=column_names))
+            assert session.in_transaction()
+            return datatable.output_result()
+
+    assert asyncio.run(run())['recordsTotal'] == 20
+
+
+def test_async_datatable_error(async_engine: AsyncEngine, table: FromClause, column_names: list[str]) -> None:
+    output: dict[str, Any] = _run(async_engine, table, [*column_names, 'non_existing_column'])
+    assert 'error' in output
+
+
+def test_async_datatable_stream_result(async_engine: AsyncEngine, table: FromClause, column_names: list[str]) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom.org', length=-1)
+
+    async def run() -> list[str]:
+        datatable: AsyncDataTable = AsyncDataTable(
+            table=table, column_names=column_names, engine=async_engine, stream=True, yield_per=3
+        )
+        await datatable.run(query_params)
+        return [chunk async for chunk in datatable.stream_result()]
+
+    chunks: list[str] = asyncio.run(run())
+    assert len(chunks) == 5
+    output: dict[str, Any] = json.loads(''.join(chunks))
+    assert output['recordsFiltered'] == 8
+    assert [row['username'] for row in output['data']][:2] == ['spongebob', 'harold']
+    assert len(output['data']) == 8
+
+
+def test_async_datatable_stream_timeout(async_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch) -> None:
+    # aiosqlite statements can not be interrupted, a failing data query stands in for the timed out query
+    failing: FromClause = text('SELECT abs(-9223372036854775808) AS x').columns(column('x', Integer)).subquery()
+    monkeypatch.setattr(datatable, 'is_timeout_error', lambda exc: True)
+    cache: TotalCountCache = TotalCountCache()
+    cache.set(failing, 1)
+
+    async def run() -> list[str]:
+        async_datatable: AsyncDataTable = AsyncDataTable(
+            table=failing,
+            column_names=['x'],
+            engine=async_engine,
+            stream=True,
+            total_count_cache=cache,
+            statement_timeout=1,
+        )
+        await async_datatable.run(create_query_params(column_names=['x'], length=-1))
+        return [chunk async for chunk in async_datatable.stream_result()]
+
+    output: dict[str, Any] = json.loads(''.join(asyncio.run(run())))
+    assert output['error'] == 'The data query timed out'
+    assert output['errorCode'] == 'timeout'
+
+
+if __name__ == '__main__':
+    pytest.main()
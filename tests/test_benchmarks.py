@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.scenarios import SCENARIOS
+
+
+def test_benchmarks(tmp_path: Path) -> None:
+    output: Path = tmp_path / 'results.json'
+    main(['--rows', '200', '--repeat', '1', '--data-dir', str(tmp_path), '--output', str(output)])
+    report: dict[str, Any] = json.loads(output.read_text())
+    assert report['environment']['dialect'] == 'sqlite'
+    results: dict[str, dict[str, Any]] = {result['scenario']: result for result in report['results']}
+    assert set(results) == {scenario.name for scenario in SCENARIOS}
+    assert results['first_page']['records_filtered'] == 200
+    assert results['last_page_keyset']['returned'] == 10
+    assert results['all_rows']['returned'] == 200
+    # the generated table is reused
+    main(['--rows', '200', '--repeat', '1', '--data-dir', str(tmp_path), '--scenario', 'column_search'])
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,97 @@
+import time
+from typing import Any
+
+import pytest
+from sqlalchemy import select
+
+from datatables import cache as cache_module
+from datatables.cache import CacheBackend
+from datatables.cache import MemoryCacheBackend
+from datatables.cache import TotalCountCache
+from datatables.cache import table_cache_key
+from datatables.datatable import DataTableDefinition
+from tests.models import User
+
+
+def test_memory_cache_backend_get_set() -> None:
+    cache: MemoryCacheBackend = MemoryCacheBackend()
+    assert isinstance(cache, CacheBackend)
+    assert cache.get('foo') is None
+    cache.set('foo', 1)
+    assert cache.get('foo') == 1
+    cache.delete('foo')
+    assert cache.get('foo') is None
+    cache.delete('foo')
+    cache.set('bar', 2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_memory_cache_backend_lru_eviction() -> None:
+    cache: MemoryCacheBackend = MemoryCacheBackend(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # touch a, so that b becomes the least recently used entry
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_memory_cache_backend_ttl() -> None:
+    cache: MemoryCacheBackend = MemoryCacheBackend(ttl=0.01)
+    cache.set('default', 1)
+    cache.set('long', 2, ttl=60)
+    time.sleep(0.02)
+    assert cache.get('default') is None
+    assert cache.get('long') == 2
+
+
+def test_memory_cache_backend_maxsize_error() -> None:
+    with pytest.raises(ValueError):
+        MemoryCacheBackend(maxsize=0)
+
+
+def test_table_cache_key() -> None:
+    assert table_cache_key(User.__table__) == 'users'
+    subquery = select(User.id).where(User.color == 'red').subquery()
+    assert table_cache_key(subquery) == table_cache_key(select(User.id).where(User.color == 'red').subquery())
+    assert table_cache_key(subquery) != table_cache_key(select(User.id).where(User.color == 'pink').subquery())
+
+
+def test_table_cache_key_memoized(monkeypatch: pytest.MonkeyPatch) -> None:
+    rendered: list[Any] = []
+
+    def counting_select(*args: Any) -> Any:
+        rendered.append(args)
+        return select(*args)
+
+    monkeypatch.setattr(cache_module, 'select', counting_select)
+    subquery = select(User.id).where(User.color == 'red').subquery()
+    # the sql of a FromClause is rendered once, not on every cache access
+    assert table_cache_key(subquery) == table_cache_key(subquery) == table_cache_key(subquery)
+    assert len(rendered) == 1
+    # the key of a definition is only computed when it is used
+    definition: DataTableDefinition = DataTableDefinition(
+        table=select(User.id, User.color).subquery(), column_names=['id', 'color']
+    )
+    assert len(rendered) == 1
+    assert definition.table_key == table_cache_key(definition.table)
+    assert len(rendered) == 2
+
+
+def test_total_count_cache() -> None:
+    backend: MemoryCacheBackend = MemoryCacheBackend()
+    cache: TotalCountCache = TotalCountCache(backend=backend)
+    assert cache.get(User.__table__) is None
+    cache.set(User.__table__, 20)
+    assert cache.get(User.__table__) == 20
+    assert backend.get('dt:total:users') == 20
+    cache.invalidate(User.__table__)
+    assert cache.get(User.__table__) is None
+
+
+if __name__ == '__main__':
+    pytest.main()
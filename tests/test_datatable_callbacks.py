@@ -67,5 +67,24 @@ def test_datatable_callbacks(
     assert row[DTKey.ROW_DATA] == {'username': {'url': f'/actions/user/details/{row["username"]}'}}  # noqa: Q001
 
 
+def test_datatable_batch_callback(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    page_sizes: list[int] = []
+
+    def batch_callback(rows: list[dict[str, Any]]) -> None:
+        page_sizes.append(len(rows))
+        for row in rows:
+            row[DTKey.ROW_DATA] = {'position': rows.index(row)}
+
+    callbacks: DTDataCallbacks = DTDataCallbacks()
+    callbacks.set_batch_callback(batch_callback)
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, length=5)
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, callbacks=callbacks
+    )
+    output: dict[str, Any] = datatable.output_result()
+    assert page_sizes == [5]
+    assert [row[DTKey.ROW_DATA]['position'] for row in output['data']] == [0, 1, 2, 3, 4]
+
+
 if __name__ == '__main__':
     pytest.main()
@@ -0,0 +1,106 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import case
+from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy.sql.elements import Label
+
+from datatables.cache import MemoryCacheBackend
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert table is not None
+    assert engine is not None
+
+
+@pytest.fixture(scope='function')
+def computed_columns(table: FromClause) -> list[Any]:
+    other: FromClause = table.alias('other')
+    return [
+        'id',
+        (table.c.username + literal(' <') + table.c.email_address + literal('>')).label('contact'),
+        case((table.c.color.like('%red%'), 'reddish'), else_='other').label('tone'),
+        # correlated scalar subquery, number of users with the same color
+        select(func.count()).where(other.c.color == table.c.color).scalar_subquery().label('same_color'),
+    ]
+
+
+def _output(engine: Engine, table: FromClause, columns: list[Any], **kwargs: Any) -> dict[str, Any]:
+    names: list[str] = [column if isinstance(column, str) else column.name for column in columns]
+    query_params: dict[str, Any] = create_query_params(column_names=names, **kwargs)
+    return DataTable(request_params=query_params, engine=engine, column_names=columns, table=table).output_result()
+
+
+def test_datatable_computed_columns(engine: Engine, table: FromClause, computed_columns: list[Any]) -> None:
+    output: dict[str, Any] = _output(engine, table, computed_columns, length=2)
+    assert 'error' not in output
+    assert output['data'] == [
+        {'id': 1, 'contact': 'spongebob <spongebob@bikinibottom.org>', 'tone': 'other', 'same_color': 3},
+        {'id': 2, 'contact': 'harold <harold@bikinibottom.org>', 'tone': 'other', 'same_color': 3},
+    ]
+
+
+def test_datatable_computed_columns_search(engine: Engine, table: FromClause, computed_columns: list[Any]) -> None:
+    # the global search matches the computed values
+    output: dict[str, Any] = _output(engine, table, computed_columns, search='reddish')
+    assert output['recordsFiltered'] == 6
+    output = _output(engine, table, computed_columns, search='bs <kr')
+    assert [row['contact'] for row in output['data']] == ['krabs <krabs@@krabshack.com>']
+
+
+def test_datatable_computed_columns_order(engine: Engine, table: FromClause, computed_columns: list[Any]) -> None:
+    output: dict[str, Any] = _output(
+        engine, table, computed_columns, length=4, order=[{'column': 3, 'dir': 'desc'}, {'column': 0, 'dir': 'asc'}]
+    )
+    assert [(row['id'], row['same_color']) for row in output['data']] == [(1, 3), (2, 3), (3, 3), (4, 2)]
+
+
+def test_datatable_computed_columns_keyset(engine: Engine, table: FromClause, computed_columns: list[Any]) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=computed_columns, engine=engine, keyset_column='id'
+    )
+    names: list[str] = definition.column_names
+    query_params: dict[str, Any] = create_query_params(
+        column_names=names, length=3, order=[{'column': 1, 'dir': 'asc'}]
+    )
+    first: dict[str, Any] = definition.execute(query_params)
+    # computed columns may be null, the rows ordered by them are paged by offset
+    assert 'cursor' not in first
+    query_params = create_query_params(column_names=names, start=3, length=3, order=[{'column': 1, 'dir': 'asc'}])
+    second: dict[str, Any] = definition.execute(query_params)
+    contacts: list[str] = [row['contact'] for row in first['data'] + second['data']]
+    assert contacts == sorted(contacts)
+    assert len(set(contacts)) == 6
+    # ordered by the table columns only, the computed columns are selected with keyset paging
+    query_params = create_query_params(column_names=names, length=3)
+    assert 'cursor' in definition.execute(query_params)
+
+
+def test_datatable_computed_columns_statement_cache(engine: Engine, table: FromClause) -> None:
+    cache: MemoryCacheBackend = MemoryCacheBackend()
+    dash: Label[Any] = (table.c.username + literal('-')).label('name')
+    dot: Label[Any] = (table.c.username + literal('.')).label('name')
+    first: DataTableDefinition = DataTableDefinition(table=table, column_names=[dash], statement_cache=cache)
+    second: DataTableDefinition = DataTableDefinition(table=table, column_names=[dot], statement_cache=cache)
+    assert first.table_key != second.table_key
+
+
+def test_datatable_unlabelled_computed_column(engine: Engine, table: FromClause) -> None:
+    output: dict[str, Any] = _output(engine, table, ['id', func.upper(table.c.username)])
+    assert 'requires a label' in output['error']
+
+
+if __name__ == '__main__':
+    pytest.main()
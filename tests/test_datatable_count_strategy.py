@@ -0,0 +1,105 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from datatables.count import CountStrategy
+from datatables.count import _compile_with_params
+from datatables.count import estimate_table_count
+from datatables.datatable import DataTable
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+@pytest.fixture(scope='module')
+def analyzed(engine: Engine, setup_db: bool) -> None:
+    with Session(engine) as session:
+        session.execute(text('ANALYZE'))
+        # pretend the statistics are outdated, so that estimated counts can be told apart from exact counts
+        session.execute(text("UPDATE sqlite_stat1 SET stat = '1000 1' WHERE tbl = 'users'"))
+        session.commit()
+
+
+def _output(engine: Engine, column_names: list[str], table: FromClause, **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom.org')
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, **kwargs
+    )
+    return datatable.output_result()
+
+
+def test_estimate_table_count(engine: Engine, table: FromClause, analyzed: None) -> None:
+    with Session(engine) as session:
+        assert estimate_table_count(session, table) == 1000
+        assert estimate_table_count(session, table.select().subquery()) is None
+
+
+def test_datatable_count_strategy_exact(
+    engine: Engine, column_names: list[str], table: FromClause, analyzed: None
+) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, count_strategy=CountStrategy.EXACT)
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 8
+    assert 'recordsTotalApproximate' not in output
+    assert 'recordsFilteredApproximate' not in output
+
+
+def test_datatable_count_strategy_estimated(
+    engine: Engine, column_names: list[str], table: FromClause, analyzed: None
+) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, count_strategy=CountStrategy.ESTIMATED)
+    assert output['recordsTotal'] == 1000
+    assert output['recordsTotalApproximate'] is True
+    # sqlite has no row estimates for queries, the filtered count falls back to the exact count
+    assert output['recordsFiltered'] == 8
+    assert 'recordsFilteredApproximate' not in output
+
+
+@pytest.mark.parametrize('threshold,total', [(500, 1000), (5000, 20)])
+def test_datatable_count_strategy_hybrid(
+    engine: Engine, column_names: list[str], table: FromClause, analyzed: None, threshold: int, total: int
+) -> None:
+    output: dict[str, Any] = _output(
+        engine, column_names, table, count_strategy=CountStrategy.HYBRID, count_threshold=threshold
+    )
+    assert output['recordsTotal'] == total
+    assert output.get('recordsTotalApproximate', False) is (total != 20)
+
+
+def test_compile_with_params_expanding(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom.org')
+    query_params['searchPanes[color][0]'] = 'yellow'
+    query_params['searchPanes[color][1]'] = 'pink'
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, search_panes=['color']
+    )
+    stmt: Any = datatable._built_select_statement()
+    statement_params: dict[str, Any] = datatable._get_statement_params()
+    # the values of the IN filter of the pane selection are rendered as placeholders, not as postcompile markers
+    sql, params = _compile_with_params(stmt, postgresql.dialect(), statement_params)
+    assert 'POSTCOMPILE' not in sql
+    assert 'users.color IN (%(dt_pane_4_1)s, %(dt_pane_4_2)s)' in sql
+    assert params['dt_pane_4_1'] == 'yellow' and params['dt_pane_4_2'] == 'pink'
+    # the compiled statement runs as is
+    sql, params = _compile_with_params(stmt, engine.dialect, statement_params)
+    with engine.connect() as conn:
+        assert len(conn.exec_driver_sql(sql, params).all()) == 5
+
+
+if __name__ == '__main__':
+    pytest.main()
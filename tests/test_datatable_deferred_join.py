@@ -0,0 +1,94 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import literal
+from sqlalchemy import select
+
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def _outputs(engine: Engine, column_names: list[Any], table: FromClause, **kwargs: Any) -> list[dict[str, Any]]:
+    """Get the output without and with deferred join"""
+    names: list[str] = [name if isinstance(name, str) else name.name for name in column_names]
+    query_params: dict[str, Any] = create_query_params(column_names=names, **kwargs)
+    return [
+        DataTable(
+            request_params=query_params,
+            engine=engine,
+            column_names=column_names,
+            table=table,
+            deferred_join=deferred_join,
+            window_count=True,
+        ).output_result()
+        for deferred_join in (False, True)
+    ]
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {'start': 12, 'length': 5, 'order': [{'column': 4, 'dir': 'asc'}, {'column': 1, 'dir': 'desc'}]},
+        {'search': 'bikinibottom', 'start': 2, 'length': 3, 'order': [{'column': 3, 'dir': 'desc'}]},
+        {'search': 'bikinibottom', 'start': 10, 'length': 3},
+        {'length': -1},
+    ],
+)
+def test_datatable_deferred_join(
+    engine: Engine, column_names: list[str], table: FromClause, kwargs: dict[str, Any]
+) -> None:
+    plain, deferred = _outputs(engine, column_names, table, **kwargs)
+    assert 'error' not in deferred
+    assert deferred == plain
+
+
+def test_datatable_deferred_join_computed_order(engine: Engine, table: FromClause) -> None:
+    columns: list[Any] = ['id', (table.c.color + literal('/') + table.c.username).label('tag')]
+    plain, deferred = _outputs(engine, columns, table, start=3, length=4, order=[{'column': 1, 'dir': 'desc'}])
+    assert 'error' not in deferred
+    assert deferred == plain
+
+
+def test_datatable_deferred_join_statement(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, deferred_join=True, keyset_column='id'
+    )
+    datatable: DataTable = DataTable(
+        request_params=create_query_params(column_names=column_names, start=5, length=5), definition=definition
+    )
+    sql: str = str(datatable._get_paged_statement(datatable._built_select_statement())[0])
+    # the inner query selects the keys only
+    assert (
+        'JOIN (SELECT users.id AS id \nFROM users ORDER BY users.id ASC\n LIMIT :param_1 OFFSET :param_2) AS dt_keys'
+        in sql
+    )
+    # the cursor of the page seeks on the keys
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, start=10, length=5)
+    query_params['cursor'] = datatable.output_result()['cursor']
+    output: dict[str, Any] = definition.execute(query_params)
+    assert [row['id'] for row in output['data']] == [11, 12, 13, 14, 15]
+
+
+def test_datatable_deferred_join_requires_primary_key(table: FromClause) -> None:
+    names: FromClause = select(table.c.username, table.c.email_address).subquery()
+    with pytest.raises(ValueError, match='primary key'):
+        DataTableDefinition(table=names, column_names=['username', 'email_address'], deferred_join=True)
+
+
+if __name__ == '__main__':
+    pytest.main()
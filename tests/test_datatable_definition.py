@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy.orm import Session
+
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import file_engine
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert column_names is not None
+    assert table is not None
+    assert file_engine is not None
+
+
+def test_datatable_definition(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    definition: DataTableDefinition = DataTableDefinition(table=table, column_names=column_names, engine=file_engine)
+    assert definition.columns == [table.columns[name] for name in column_names]
+    assert definition.searchable == definition.orderable == frozenset(range(len(column_names)))
+    output: dict[str, Any] = definition.execute(create_query_params(column_names=column_names, search='chumbucket'))
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 2
+    assert [row['username'] for row in output['data']] == ['plankton', 'karen']
+
+
+def test_datatable_definition_errors(table: FromClause, column_names: list[str]) -> None:
+    with pytest.raises(ValueError):
+        DataTableDefinition(table=table, column_names=[*column_names, 'non_existing_column'])
+    with pytest.raises(ValueError):
+        DataTableDefinition(table=table, column_names=column_names, searchable_columns=['non_existing_column'])
+    with pytest.raises(ValueError):
+        DataTableDefinition(table=table, column_names=column_names[1:], keyset_column='id')
+
+
+def test_datatable_definition_threads(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    definition: DataTableDefinition = DataTableDefinition(table=table, column_names=column_names, engine=file_engine)
+
+    def execute(start: int) -> dict[str, Any]:
+        return definition.execute(create_query_params(column_names=column_names, start=start, length=1))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outputs: list[dict[str, Any]] = list(executor.map(execute, range(20)))
+    assert [output['data'][0]['id'] for output in outputs] == list(range(1, 21))
+
+
+def test_datatable_definition_allowed_columns(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table,
+        column_names=column_names,
+        engine=file_engine,
+        searchable_columns=['username'],
+        orderable_columns=['id'],
+    )
+    # the search value only matches email addresses, which may not be searched
+    output: dict[str, Any] = definition.execute(create_query_params(column_names=column_names, search='chumbucket'))
+    assert output['recordsFiltered'] == 0
+    # the order by color is ignored
+    output = definition.execute(create_query_params(column_names=column_names, order=[{'column': 4, 'dir': 'asc'}]))
+    assert [row['id'] for row in output['data']] == list(range(1, 11))
+
+
+def test_datatable_with_definition(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    definition: DataTableDefinition = DataTableDefinition(table=table, column_names=column_names)
+    query_params: dict[str, Any] = create_query_params(column_names=column_names)
+    with Session(file_engine) as session:
+        datatable: DataTable = DataTable(request_params=query_params, definition=definition, session=session)
+        assert datatable.output_result()['recordsTotal'] == 20
+    output: dict[str, Any] = DataTable(
+        request_params=query_params, definition=definition, engine=file_engine, table=table
+    ).output_result()
+    assert 'error' in output
+    with pytest.raises(ValueError):
+        DataTable(request_params=query_params, definition=definition)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,81 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables.cache import FilteredCountCache
+from datatables.datatable import DataTableDefinition
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import statements
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+    assert statements is not None
+
+
+def test_datatable_filtered_count_cache(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    cache: FilteredCountCache = FilteredCountCache()
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, filtered_count_cache=cache
+    )
+    output: dict[str, Any] = definition.execute(create_query_params(column_names, search='SquarePants', length=2))
+    assert output['recordsFiltered'] == 3
+    assert len(statements) == 3
+
+    # ordering and paging through the same search result query the data only
+    statements.clear()
+    output = definition.execute(
+        create_query_params(column_names, search='SquarePants', start=2, length=2, order=[{'column': 1, 'dir': 'desc'}])
+    )
+    assert output['recordsFiltered'] == 3
+    assert len(output['data']) == 1
+    assert len(statements) == 2
+
+    # another search is counted
+    statements.clear()
+    assert definition.execute(create_query_params(column_names, search='ChumBucket'))['recordsFiltered'] == 2
+    assert len(statements) == 3
+
+    cache.invalidate(table)
+    statements.clear()
+    assert definition.execute(create_query_params(column_names, search='SquarePants'))['recordsFiltered'] == 3
+    assert len(statements) == 3
+
+
+def test_datatable_filtered_count_cache_window_count(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table,
+        column_names=column_names,
+        engine=engine,
+        filtered_count_cache=FilteredCountCache(),
+        window_count=True,
+    )
+    assert definition.execute(create_query_params(column_names, search='SquarePants'))['recordsFiltered'] == 3
+    assert 'OVER ()' in statements[-1]
+
+    # the cached count replaces the window count
+    statements.clear()
+    output: dict[str, Any] = definition.execute(
+        create_query_params(column_names, search='SquarePants', order=[{'column': 2, 'dir': 'asc'}])
+    )
+    assert output['recordsFiltered'] == 3
+    assert len(statements) == 2
+    assert 'OVER ()' not in statements[-1]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,214 @@
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import insert
+from sqlalchemy.future import create_engine
+
+from datatables.base import DTCursor
+from datatables.datatable import DataTable
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+events: Table = Table(
+    'events',
+    MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('name', String(20), nullable=True),
+    Column('created', DateTime, nullable=False),
+)
+event_names: list[str] = ['id', 'name', 'created']
+
+
+@pytest.fixture(scope='module')
+def events_engine() -> Engine:
+    events_engine: Engine = create_engine(url='sqlite://')
+    events.metadata.create_all(events_engine)
+    with events_engine.begin() as conn:
+        conn.execute(
+            insert(events),
+            [
+                {
+                    'id': i,
+                    'name': None if i % 3 == 0 else f'event {i % 4}',
+                    'created': datetime(2024, 1, 1) + timedelta(hours=i % 7, minutes=i),
+                }
+                for i in range(1, 21)
+            ],
+        )
+    return events_engine
+
+
+def _page_events(events_engine: Engine, order: list[dict[str, str]]) -> tuple[list[int], list[str | None]]:
+    ids: list[int] = []
+    cursors: list[str | None] = []
+    cursor: str | None = None
+    for start in range(0, 20, 6):
+        query_params: dict[str, Any] = create_query_params(column_names=event_names, start=start, length=6, order=order)
+        if cursor:
+            query_params['cursor'] = cursor
+        output: dict[str, Any] = DataTable(
+            request_params=query_params,
+            engine=events_engine,
+            column_names=event_names,
+            table=events,
+            keyset_column='id',
+        ).output_result()
+        assert 'error' not in output
+        ids.extend(row['id'] for row in output['data'])
+        cursor = output.get('cursor')
+        cursors.append(cursor)
+    return ids, cursors
+
+
+def _run(engine: Engine, column_names: list[str], table: FromClause, query_params: dict[str, Any]) -> dict[str, Any]:
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, keyset_column='id'
+    )
+    return datatable.output_result()
+
+
+def _offset_page(engine: Engine, column_names: list[str], table: FromClause, **kwargs: Any) -> list[dict[str, Any]]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    datatable: DataTable = DataTable(request_params=query_params, engine=engine, column_names=column_names, table=table)
+    return datatable.output_result()['data']
+
+
+@pytest.mark.parametrize(
+    'order',
+    [
+        [{'column': '0', 'dir': 'asc'}],
+        [{'column': '4', 'dir': 'desc'}, {'column': '1', 'dir': 'desc'}],
+        [{'column': '4', 'dir': 'asc'}, {'column': '1', 'dir': 'desc'}],
+    ],
+)
+def test_datatable_keyset_pages(
+    engine: Engine, column_names: list[str], table: FromClause, order: list[dict[str, str]], monkeypatch
+) -> None:
+    seeks: list[DTCursor] = []
+    get_keyset_criterion = DataTable._get_keyset_criterion
+
+    def spy(datatable: DataTable, cursor: DTCursor) -> Any:
+        seeks.append(cursor)
+        return get_keyset_criterion(datatable, cursor)
+
+    monkeypatch.setattr(DataTable, '_get_keyset_criterion', spy)
+    cursor: str | None = None
+    for start in range(0, 20, 6):
+        query_params: dict[str, Any] = create_query_params(
+            column_names=column_names, start=start, length=6, order=order
+        )
+        if cursor:
+            query_params['cursor'] = cursor
+        output: dict[str, Any] = _run(engine, column_names, table, query_params)
+        assert 'error' not in output
+        assert output['recordsFiltered'] == 20
+        if start > 0:
+            # the cursor of the previous page leads to this page, so it has to be used for seeking
+            assert seeks[-1].start == start
+        assert output['data'] == _offset_page(engine, column_names, table, start=start, length=6, order=order)
+        cursor = output['cursor']
+    assert len(seeks) == 3
+
+
+def test_datatable_keyset_random_page_jump(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    first: dict[str, Any] = _run(engine, column_names, table, create_query_params(column_names=column_names))
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, start=15, length=5)
+    # the cursor leads to start 10, jumping to start 15 falls back to offset paging
+    query_params['cursor'] = first['cursor']
+    output: dict[str, Any] = _run(engine, column_names, table, query_params)
+    assert [row['id'] for row in output['data']] == [16, 17, 18, 19, 20]
+
+
+def test_datatable_keyset_changed_filter(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    first: dict[str, Any] = _run(engine, column_names, table, create_query_params(column_names=column_names, length=5))
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom', start=5)
+    query_params['cursor'] = first['cursor']
+    output: dict[str, Any] = _run(engine, column_names, table, query_params)
+    assert output['recordsFiltered'] == 8
+    assert len(output['data']) == 3
+
+
+def test_datatable_keyset_malformed_cursor(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, start=10)
+    query_params['cursor'] = 'not-a-cursor'
+    output: dict[str, Any] = _run(engine, column_names, table, query_params)
+    assert 'error' not in output
+    assert output['data'][0]['id'] == 11
+
+
+def test_datatable_keyset_column_error(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names[1:])
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names[1:], table=table, keyset_column='id'
+    )
+    assert 'error' in datatable.output_result()
+
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_datatable_keyset_nullable_order(events_engine: Engine, direction: str) -> None:
+    # the rows with null names would not be selected by the seek predicate, they are paged by offset
+    ids, cursors = _page_events(events_engine, [{'column': '1', 'dir': direction}])
+    assert sorted(ids) == list(range(1, 21))
+    assert cursors == [None, None, None, None]
+
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_datatable_keyset_datetime_order(events_engine: Engine, direction: str, monkeypatch) -> None:
+    seeks: list[DTCursor] = []
+    get_keyset_criterion = DataTable._get_keyset_criterion
+
+    def spy(datatable: DataTable, cursor: DTCursor) -> Any:
+        seeks.append(cursor)
+        return get_keyset_criterion(datatable, cursor)
+
+    monkeypatch.setattr(DataTable, '_get_keyset_criterion', spy)
+    ids, cursors = _page_events(events_engine, [{'column': '2', 'dir': direction}])
+    assert sorted(ids) == list(range(1, 21))
+    assert all(cursors)
+    # the cursor values are decoded back to datetime, the pages after the first are selected by keyset
+    assert len(seeks) == 3
+    assert all(isinstance(seek.values[0], datetime) for seek in seeks)
+
+
+def test_dt_cursor_typed_values() -> None:
+    values: list[Any] = [
+        datetime(2024, 1, 2, 3, 4, 5),
+        date(2024, 1, 2),
+        Decimal('1.10'),
+        UUID('12345678-1234-5678-1234-567812345678'),
+        'text',
+        None,
+    ]
+    token: str | None = DTCursor(start=10, values=values, signature='abc').encode()
+    assert token is not None
+    assert DTCursor.decode(token) == DTCursor(start=10, values=values, signature='abc')
+    assert DTCursor(start=10, values=[object()], signature='abc').encode() is None
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,130 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import Integer
+from sqlalchemy import column
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from datatables.cache import TotalCountCache
+from datatables.datatable import DataTable
+from datatables.timeout import QueryTimeouts
+from datatables.timeout import statement_timeout
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+# counting to ten million takes seconds in sqlite
+SLOW_QUERY: str = (
+    'WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 10000000) SELECT count(*) FROM n'
+)
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def _output(
+    engine: Engine, column_names: list[str], table: FromClause, start: int = 0, length: int = 10, **options: Any
+) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, start=start, length=length)
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, **options
+    )
+    return datatable.output_result()
+
+
+def test_datatable_page_size_limit(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, length=15, max_page_size=5)
+    assert output['length'] == 5
+    assert len(output['data']) == 5
+    # all rows are allowed unless disallowed
+    assert len(_output(engine, column_names, table, length=-1, max_page_size=5)['data']) == 20
+    output = _output(engine, column_names, table, length=-1, max_page_size=5, allow_all_rows=False)
+    assert output['length'] == 5
+    assert len(output['data']) == 5
+
+    output = _output(engine, column_names, table, length=15, max_page_size=5, clamp_limits=False)
+    assert output['errorCode'] == 'page_size_exceeded'
+    assert output['error'] == 'Page size 15 exceeds the maximum of 5'
+    assert output['data'] == []
+    output = _output(engine, column_names, table, length=-1, allow_all_rows=False)
+    assert output['errorCode'] == 'all_rows_not_allowed'
+
+
+def test_datatable_offset_limit(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, start=15, max_offset=10)
+    assert output['start'] == 10
+    assert [row['id'] for row in output['data']] == list(range(11, 21))
+    output = _output(engine, column_names, table, start=15, max_offset=10, clamp_limits=False)
+    assert output['errorCode'] == 'offset_exceeded'
+    assert 'errorCode' not in _output(engine, column_names, table, start=10, max_offset=10, clamp_limits=False)
+
+
+def test_datatable_offset_limit_keyset(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    options: dict[str, Any] = {'keyset_column': 'id', 'max_offset': 5, 'clamp_limits': False}
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, start=0, length=10)
+    first: dict[str, Any] = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, **options
+    ).output_result()
+    # the next page seeks from the cursor, it does not scan the offset rows
+    query_params = create_query_params(column_names=column_names, start=10, length=10)
+    query_params['cursor'] = first['cursor']
+    second: dict[str, Any] = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, **options
+    ).output_result()
+    assert 'error' not in second
+    assert [row['id'] for row in second['data']] == list(range(11, 21))
+
+
+def test_statement_timeout(engine: Engine) -> None:
+    with Session(engine) as session:
+        with pytest.raises(OperationalError, match='interrupted'):
+            with statement_timeout(session, 0.05):
+                session.execute(text(SLOW_QUERY))
+        # the handler is removed again
+        assert session.scalar(text('SELECT 1')) == 1
+
+
+def test_datatable_statement_timeout(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    slow_table: FromClause = text(SLOW_QUERY).columns().subquery('slow')
+    output: dict[str, Any] = _output(engine, [], slow_table, statement_timeout=0.05)
+    assert output['error'] == 'The total count query timed out'
+    assert output['errorCode'] == 'timeout'
+    assert 'error' not in _output(engine, column_names, table, statement_timeout=1)
+
+
+def test_datatable_query_timeouts(engine: Engine) -> None:
+    slow_table: FromClause = (
+        text(SLOW_QUERY.replace('SELECT count(*) FROM n', 'SELECT x FROM n')).columns(column('x', Integer)).subquery()
+    )
+    cache: TotalCountCache = TotalCountCache()
+    cache.set(slow_table, 10_000_000)
+    with Session(engine) as session:
+        # ordering by x makes the page query generate all rows
+        datatable: DataTable = DataTable(
+            request_params=create_query_params(column_names=['x']),
+            session=session,
+            column_names=['x'],
+            table=slow_table,
+            total_count_cache=cache,
+            statement_timeout=QueryTimeouts(total_count=None, data=0.05),
+        )
+        output: dict[str, Any] = datatable.output_result()
+        assert output['error'] == 'The data query timed out'
+        assert output['recordsTotal'] == 10_000_000
+        # the session is still usable
+        assert session.scalar(text('SELECT 1')) == 1
+
+
+if __name__ == '__main__':
+    pytest.main()
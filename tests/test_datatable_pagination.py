@@ -3,6 +3,9 @@ from typing import Any
 import pytest
 from sqlalchemy import Engine
 from sqlalchemy import FromClause
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.compiler import Compiled
 
 from datatables.datatable import DataTable
 from tests.fixtures import column_names
@@ -92,5 +95,26 @@ def test_datatable_page_size(engine: Engine, column_names: list[str], table: Fro
     assert data[0]['id'] == 1 + int(query_params['start'])
 
 
+@pytest.mark.parametrize('start,length', [(0, -1), (5, -1), (0, 5)])
+def test_datatable_paged_statement(
+    engine: Engine, column_names: list[str], table: FromClause, start: int, length: int
+) -> None:
+    datatable: DataTable = DataTable(
+        request_params=create_query_params(column_names=column_names, start=start, length=length),
+        engine=engine,
+        column_names=column_names,
+        table=table,
+    )
+    assert len(datatable.output_result()['data']) == 20 - start if length < 0 else length
+    paged = datatable._get_paged_statement(datatable._built_select_statement())[0]
+    # all rows are selected without a limit, postgres and mysql reject negative limits
+    for dialect in (postgresql.dialect(), mysql.dialect()):
+        compiled: Compiled = paged.compile(dialect=dialect)
+        assert all(value >= 0 for value in compiled.params.values())
+        assert sorted(compiled.params.values()) == sorted(value for value in (start, length) if value > 0)
+    if start == 0 and length < 0:
+        assert 'LIMIT' not in str(paged.compile(dialect=postgresql.dialect()))
+
+
 if __name__ == '__main__':
     pytest.main()
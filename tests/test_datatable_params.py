@@ -0,0 +1,95 @@
+import json
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables.base import DTColumn
+from datatables.base import DTColumnOrder
+from datatables.base import DTParams
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableBase
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def _json_params(
+    column_names: list[str], search: str = '', order: list[dict[str, Any]] | None = None
+) -> dict[str, Any]:
+    """request body as sent by datatables with ajax.contentType application/json"""
+    body: dict[str, Any] = {
+        'draw': 3,
+        'start': 0,
+        'length': 5,
+        'search': {'value': search, 'regex': False},
+        'columns': [
+            {'data': name, 'name': name, 'searchable': True, 'orderable': True, 'search': {'value': '', 'regex': False}}
+            for name in column_names
+        ],
+        'order': order or [{'column': 0, 'dir': 'asc'}],
+    }
+    return json.loads(json.dumps(body))
+
+
+def test_parse_flat_params(column_names: list[str]) -> None:
+    query_params: dict[str, Any] = create_query_params(
+        column_names=column_names, search='foo', order=[{'column': 4, 'dir': 'desc'}, {'column': 1, 'dir': 'asc'}]
+    )
+    query_params['columns[2][search][value]'] = 'bar'
+    query_params['columns[3][searchable]'] = 'false'
+    params: DTParams = DataTableBase._parse_params(query_params)
+    assert params.draw == 1
+    assert params.search_value == 'foo'
+    assert params.search_regex is False
+    assert len(params.columns) == len(column_names)
+    assert params.columns[2] == DTColumn(index=2, data='email_address', name='email_address', search_value='bar')
+    assert params.columns[3].searchable is False
+    assert params.order == [DTColumnOrder(column_index=4, is_asc=False), DTColumnOrder(column_index=1, is_asc=True)]
+
+
+def test_parse_json_params(column_names: list[str]) -> None:
+    body: dict[str, Any] = _json_params(column_names, search='foo', order=[{'column': 2, 'dir': 'desc'}])
+    body['columns'][1]['search'] = {'value': 'bar', 'regex': True}
+    params: DTParams = DataTableBase._parse_params(body)
+    flat: DTParams = DataTableBase._parse_params(create_query_params(column_names=column_names, search='foo'))
+    assert params.draw == 3
+    assert params.length == 5
+    assert params.search_value == 'foo'
+    assert params.columns[0] == flat.columns[0]
+    assert params.columns[1].search_value == 'bar'
+    assert params.columns[1].search_regex is True
+    assert params.order == [DTColumnOrder(column_index=2, is_asc=False)]
+
+
+def test_parse_missing_params() -> None:
+    params: DTParams = DataTableBase._parse_params({'draw': '2'})
+    assert params.draw == 2
+    assert params.length == -1
+    assert params.search_value == ''
+    assert not params.columns
+    assert not params.order
+
+
+def test_datatable_json_params(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    body: dict[str, Any] = _json_params(column_names, search='bikinibottom.org')
+    datatable: DataTable = DataTable(request_params=body, engine=engine, column_names=column_names, table=table)
+    output: dict[str, Any] = datatable.output_result()
+    assert output['draw'] == 3
+    assert output['recordsFiltered'] == 8
+    assert [row['id'] for row in output['data']] == [1, 2, 3, 4, 5]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,147 @@
+from typing import Any
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy.orm import Session
+
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from datatables.prefetch import PagePrefetcher
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import file_engine
+from tests.fixtures import statements
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+    assert file_engine is not None
+    assert statements is not None
+
+
+@pytest.fixture(scope='module')
+def engine(file_engine: Engine) -> Engine:
+    # the connections of an in-memory database are not shared with the prefetch threads
+    return file_engine
+
+
+@pytest.fixture(scope='function')
+def prefetcher() -> Iterator[PagePrefetcher]:
+    prefetcher: PagePrefetcher = PagePrefetcher(max_rows=5)
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+def _data_statements(statements: list[str]) -> list[str]:
+    return [statement for statement in statements if 'LIMIT' in statement]
+
+
+def test_datatable_prefetch(
+    engine: Engine, column_names: list[str], table: FromClause, prefetcher: PagePrefetcher, statements: list[str]
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, prefetcher=prefetcher
+    )
+    first: dict[str, Any] = definition.execute(create_query_params(column_names, search='b', start=0, length=3))
+    prefetcher.wait()
+    assert len(prefetcher.pages) == 1
+
+    statements.clear()
+    second: dict[str, Any] = definition.execute(create_query_params(column_names, search='b', start=3, length=3))
+    # the page was prefetched, only the counts are queried
+    assert _data_statements(statements) == []
+    expected: dict[str, Any] = DataTable(
+        request_params=create_query_params(column_names, search='b', start=3, length=3),
+        engine=engine,
+        column_names=column_names,
+        table=table,
+    ).output_result()
+    assert second == expected
+    assert second['recordsFiltered'] == first['recordsFiltered']
+
+    # changes to the served page do not leak into the prefetched page
+    second['data'][0]['username'] = 'changed'
+    second['data'].clear()
+    assert definition.execute(create_query_params(column_names, search='b', start=3, length=3)) == expected
+
+    # a changed search misses the prefetched pages
+    prefetcher.wait()
+    statements.clear()
+    definition.execute(create_query_params(column_names, search='s', start=3, length=3))
+    assert len(_data_statements(statements)) == 1
+
+
+def test_datatable_prefetch_keyset(
+    engine: Engine, column_names: list[str], table: FromClause, prefetcher: PagePrefetcher, statements: list[str]
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, prefetcher=prefetcher, keyset_column='id'
+    )
+    first: dict[str, Any] = definition.execute(create_query_params(column_names, length=5))
+    prefetcher.wait()
+    query_params: dict[str, Any] = create_query_params(column_names, start=5, length=5)
+    query_params['cursor'] = first['cursor']
+    statements.clear()
+    second: dict[str, Any] = definition.execute(query_params)
+    assert _data_statements(statements) == []
+    assert [row['id'] for row in second['data']] == [6, 7, 8, 9, 10]
+    # the cursor of the prefetched page leads to the page after it
+    prefetcher.wait()
+    query_params = create_query_params(column_names, start=10, length=5)
+    query_params['cursor'] = second['cursor']
+    statements.clear()
+    third: dict[str, Any] = definition.execute(query_params)
+    assert _data_statements(statements) == []
+    assert [row['id'] for row in third['data']] == [11, 12, 13, 14, 15]
+
+
+def test_datatable_prefetch_limits(
+    engine: Engine, column_names: list[str], table: FromClause, prefetcher: PagePrefetcher
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, prefetcher=prefetcher
+    )
+    # pages over max_rows, the last page and all rows are not prefetched
+    definition.execute(create_query_params(column_names, length=10))
+    definition.execute(create_query_params(column_names, start=18, length=5))
+    definition.execute(create_query_params(column_names, length=-1))
+    # externally managed sessions are not used by the prefetch threads
+    with Session(engine) as session:
+        definition.execute(create_query_params(column_names, length=5), session=session)
+    prefetcher.wait()
+    assert len(prefetcher.pages) == 0
+
+
+def test_datatable_prefetch_max_offset(
+    engine: Engine, column_names: list[str], table: FromClause, prefetcher: PagePrefetcher
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, prefetcher=prefetcher, max_offset=5
+    )
+    # the next pages start beyond max_offset
+    definition.execute(create_query_params(column_names, start=3, length=5))
+    definition.execute(create_query_params(column_names, start=5, length=5))
+    prefetcher.wait()
+    assert len(prefetcher.pages) == 0
+    definition.execute(create_query_params(column_names, start=0, length=5))
+    prefetcher.wait()
+    assert len(prefetcher.pages) == 1
+
+    # the pages after it are reached by keyset
+    keyset: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, prefetcher=prefetcher, max_offset=5, keyset_column='id'
+    )
+    prefetcher.clear()
+    keyset.execute(create_query_params(column_names, start=3, length=5))
+    prefetcher.wait()
+    assert len(prefetcher.pages) == 1
+
+
+if __name__ == '__main__':
+    pytest.main()
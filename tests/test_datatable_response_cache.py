@@ -0,0 +1,114 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables.cache import ResponseCache
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def _request(column_names: list[str], draw: int, **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    query_params['draw'] = str(draw)
+    return query_params
+
+
+def test_datatable_response_cache(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    cache: ResponseCache = ResponseCache()
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, response_cache=cache
+    )
+    first: DataTable = DataTable(request_params=_request(column_names, 1, search='bob'), definition=definition)
+    assert not first.cached
+    assert first.etag is not None
+
+    second: DataTable = DataTable(request_params=_request(column_names, 2, search='bob'), definition=definition)
+    assert second.cached
+    assert second.etag == first.etag
+    # the cached response is served with the draw of the request
+    assert second.output_result() == {**first.output_result(), 'draw': 2}
+
+    # other request parameters are cached separately
+    other: DataTable = DataTable(
+        request_params=_request(column_names, 3, search='bob', length=1), definition=definition
+    )
+    assert not other.cached
+    assert other.etag != first.etag
+    assert len(other.output_result()['data']) == 1
+
+    cache.invalidate(table)
+    third: DataTable = DataTable(request_params=_request(column_names, 4, search='bob'), definition=definition)
+    assert not third.cached
+    # the content did not change
+    assert third.etag == first.etag
+
+
+def test_datatable_response_cache_copies(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, response_cache=ResponseCache()
+    )
+    first: dict[str, Any] = definition.execute(_request(column_names, 1, search='bob'))
+    expected: list[dict[str, Any]] = [dict(row) for row in first['data']]
+    # changes to the served responses do not leak into the cache
+    first['data'][0]['username'] = 'changed'
+    first['data'].append({})
+    second: dict[str, Any] = definition.execute(_request(column_names, 2, search='bob'))
+    assert second['data'] == expected
+    second['data'].clear()
+    assert definition.execute(_request(column_names, 3, search='bob'))['data'] == expected
+
+
+def test_datatable_response_cache_errors(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table,
+        column_names=column_names,
+        engine=engine,
+        response_cache=ResponseCache(),
+        max_offset=10,
+        clamp_limits=False,
+    )
+    for draw in (1, 2):
+        datatable: DataTable = DataTable(request_params=_request(column_names, draw, start=20), definition=definition)
+        assert datatable.output_result()['errorCode'] == 'offset_exceeded'
+        assert not datatable.cached
+        assert datatable.etag is None
+
+
+def test_datatable_not_modified(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    uncached: DataTable = DataTable(
+        request_params=_request(column_names, 1), engine=engine, column_names=column_names, table=table
+    )
+    assert uncached.etag is None
+    assert not uncached.not_modified('*')
+
+    datatable: DataTable = DataTable(
+        request_params=_request(column_names, 1),
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        response_cache=ResponseCache(),
+    )
+    assert datatable.etag is not None
+    assert datatable.not_modified(datatable.etag)
+    assert datatable.not_modified(f'"other", W/{datatable.etag}')
+    assert not datatable.not_modified('"other"')
+    assert not datatable.not_modified(None)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,204 @@
+import copy
+import enum
+from typing import Any
+
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import Engine
+from sqlalchemy import Enum
+from sqlalchemy import FromClause
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import create_engine
+
+from datatables.cache import SearchPanesCache
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from datatables.search_panes import search_panes_statement
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import statements
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+    assert statements is not None
+
+
+def _query_params(column_names: list[str], panes: dict[str, list[str]], **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    for data, values in panes.items():
+        for i, value in enumerate(values):
+            query_params[f'searchPanes[{data}][{i}]'] = value
+    return query_params
+
+
+def _counts(output: dict[str, Any], data: str) -> dict[Any, tuple[int, int]]:
+    return {option['value']: (option['total'], option['count']) for option in output['searchPanes']['options'][data]}
+
+
+def test_datatable_search_panes(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, search_panes=['color', 'id']
+    )
+    output: dict[str, Any] = definition.execute(_query_params(column_names, {}, length=100))
+    assert 'error' not in output
+    colors: dict[Any, tuple[int, int]] = _counts(output, 'color')
+    assert colors['yellow'] == (3, 3)
+    assert colors['red'] == (2, 2)
+    assert sum(total for total, _ in colors.values()) == 20
+    # the values of other column types are listed as strings
+    assert _counts(output, 'id')['7'] == (1, 1)
+
+    output = definition.execute(_query_params(column_names, {'color': ['yellow', 'pink'], 'id': ['1', '4', '5', '6']}))
+    # the selected values filter the records
+    assert [row['id'] for row in output['data']] == [1, 4, 5]
+    assert output['recordsFiltered'] == 3
+    assert output['recordsTotal'] == 20
+    colors = _counts(output, 'color')
+    assert colors['yellow'] == (3, 1)
+    assert colors['pink'] == (2, 2)
+    assert colors['red'] == (2, 0)
+
+    # combined with the global search
+    output = definition.execute(_query_params(column_names, {'color': ['yellow', 'pink']}, search='Squarepants'))
+    assert output['recordsFiltered'] == 3
+    assert _counts(output, 'color')['pink'] == (2, 0)
+
+
+def test_datatable_search_panes_json(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = {
+        'draw': 1,
+        'start': 0,
+        'length': 10,
+        'search': {'value': '', 'regex': False},
+        'columns': [
+            {'data': name, 'name': '', 'searchable': True, 'orderable': True, 'search': {'value': '', 'regex': False}}
+            for name in column_names
+        ],
+        'order': [{'column': 0, 'dir': 'asc'}],
+        'searchPanes': {'color': ['red'], 'username': []},
+    }
+    datatable: DataTable = DataTable(
+        request_params=query_params,
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        search_panes=['color', 'username'],
+    )
+    assert datatable.params.search_panes == {'color': ['red']}
+    output: dict[str, Any] = datatable.output_result()
+    assert [row['username'] for row in output['data']] == ['larry', 'krabs']
+    assert _counts(output, 'username')['krabs'] == (1, 1)
+    assert _counts(output, 'username')['spongebob'] == (1, 0)
+
+
+def test_datatable_search_panes_columns(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    # the selections of columns without a pane are ignored
+    output: dict[str, Any] = DataTable(
+        request_params=_query_params(column_names, {'username': ['bb']}),
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        search_panes=['color'],
+    ).output_result()
+    assert output['recordsFiltered'] == 20
+    assert list(output['searchPanes']['options']) == ['color']
+    # without panes there are no options
+    output = DataTable(
+        request_params=_query_params(column_names, {}), engine=engine, column_names=column_names, table=table
+    ).output_result()
+    assert 'searchPanes' not in output
+
+
+def test_datatable_search_panes_cache(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table,
+        column_names=column_names,
+        engine=engine,
+        search_panes=['color'],
+        search_panes_cache=SearchPanesCache(),
+    )
+    first: dict[str, Any] = definition.execute(_query_params(column_names, {'color': ['grey']}))
+    assert len(statements) == 4
+    assert 'UNION ALL' not in statements[-1] and 'GROUP BY' in statements[-1]
+
+    # paging through the same filter serves the pane options from the cache
+    statements.clear()
+    second: dict[str, Any] = definition.execute(_query_params(column_names, {'color': ['grey']}, start=1))
+    assert len(statements) == 3
+    assert second['searchPanes'] == first['searchPanes']
+
+    # changes to the served options do not leak into the cache
+    expected: dict[str, Any] = copy.deepcopy(second['searchPanes'])
+    first['searchPanes']['options']['color'][0]['count'] = -1
+    second['searchPanes']['options']['color'].clear()
+    third: dict[str, Any] = definition.execute(_query_params(column_names, {'color': ['grey']}, start=2))
+    assert third['searchPanes'] == expected
+
+
+def test_search_panes_statement(table: FromClause) -> None:
+    panes: list[tuple[int, Any]] = [(1, table.c.username), (4, table.c.color)]
+    union: str = str(search_panes_statement(table, panes, table.c.id > 3, False))
+    assert union.count('GROUP BY') == 2
+    assert 'UNION ALL' in union
+
+    grouped: str = str(search_panes_statement(table, panes, table.c.id > 3, True).compile(dialect=postgresql.dialect()))
+    assert 'GROUP BY GROUPING SETS(users.username, users.color)' in grouped
+    assert 'sum(CASE WHEN (users.id > %(id_1)s) THEN %(param_1)s ELSE %(param_2)s END) AS dt_count' in grouped
+
+
+class Status(enum.Enum):
+    open = 'open'
+    done = 'done'
+
+
+def test_datatable_search_panes_enum() -> None:
+    tasks: Table = Table(
+        'tasks',
+        MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('status', Enum(Status, name='status')),
+        Column('name', String(20)),
+    )
+    tasks_engine: Engine = create_engine(url='sqlite://')
+    tasks.metadata.create_all(tasks_engine)
+    with tasks_engine.begin() as conn:
+        conn.execute(
+            insert(tasks),
+            [{'id': i, 'name': f'n{i % 2}', 'status': Status.open if i < 4 else Status.done} for i in range(6)],
+        )
+    names: list[str] = ['id', 'status', 'name']
+    definition: DataTableDefinition = DataTableDefinition(
+        table=tasks, column_names=names, engine=tasks_engine, search_panes=['status', 'name']
+    )
+    # the enum and the string pane values share the value column of the union
+    output: dict[str, Any] = definition.execute(_query_params(names, {'status': ['done']}))
+    assert 'error' not in output
+    assert [row['id'] for row in output['data']] == [4, 5]
+    assert _counts(output, 'status') == {'done': (2, 2), 'open': (4, 0)}
+    assert _counts(output, 'name') == {'n0': (3, 1), 'n1': (3, 1)}
+
+    grouped: str = str(
+        search_panes_statement(tasks, [(1, tasks.c.status), (2, tasks.c.name)], None, True).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert 'GROUPING SETS(CAST(tasks.status AS VARCHAR), tasks.name)' in grouped
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,149 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import Select
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+
+from datatables.datatable import DataTable
+from datatables.search import LikeSearch
+from datatables.search import MySQLFullTextSearch
+from datatables.search import PostgresFullTextSearch
+from datatables.search import SearchPredicate
+from datatables.search import SearchStrategy
+from datatables.search import SQLiteFullTextSearch
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+@pytest.fixture(scope='module')
+def fts_table(engine: Engine, setup_db: bool) -> str:
+    # external content table, the index is (re)built from the rows of the users table
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                'CREATE VIRTUAL TABLE users_fts USING fts5(fullname, email_address, '
+                "content='users', content_rowid='id')"
+            )
+        )
+        connection.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+    return 'users_fts'
+
+
+def _output(
+    engine: Engine, column_names: list[str], table: FromClause, strategy: SearchStrategy, **kwargs: Any
+) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, search_strategy=strategy
+    )
+    return datatable.output_result()
+
+
+def test_datatable_sqlite_full_text_search(
+    engine: Engine, column_names: list[str], table: FromClause, fts_table: str
+) -> None:
+    strategy: SQLiteFullTextSearch = SQLiteFullTextSearch(fts_table, key=table.c.id)
+    output: dict[str, Any] = _output(engine, column_names, table, strategy, search='squarepants')
+    assert 'error' not in output
+    assert output['recordsFiltered'] == 3
+    assert [row['username'] for row in output['data']] == ['spongebob', 'harold', 'margaret']
+    # terms are matched as prefixes and all terms are required
+    assert _output(engine, column_names, table, strategy, search='plank')['recordsFiltered'] == 2
+    assert _output(engine, column_names, table, strategy, search='plankton chum')['recordsFiltered'] == 2
+    assert _output(engine, column_names, table, strategy, search='plankton krabs')['recordsFiltered'] == 0
+    # fts5 query syntax in the search value is searched for literally
+    assert _output(engine, column_names, table, strategy, search='"star OR NOT')['recordsFiltered'] == 0
+    assert _output(engine, column_names, table, strategy, search='   ')['recordsFiltered'] == 20
+
+
+def test_datatable_full_text_search_column_search(
+    engine: Engine, column_names: list[str], table: FromClause, fts_table: str
+) -> None:
+    strategy: SQLiteFullTextSearch = SQLiteFullTextSearch(fts_table, key=table.c.id)
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom')
+    query_params[f'columns[{column_names.index("color")}][search][value]'] = 'yellow'
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, search_strategy=strategy
+    )
+    # column searches use LIKE by default
+    assert datatable.output_result()['recordsFiltered'] == 3
+
+
+def test_datatable_full_text_search_regex(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='^pat', regex=True)
+    datatable: DataTable = DataTable(
+        request_params=query_params,
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        searchable_columns=['username', 'fullname'],
+        search_strategy=PostgresFullTextSearch(),
+    )
+    # regex searches fall back to the column search strategy, which works on sqlite too
+    assert datatable.output_result()['recordsFiltered'] == 2
+
+
+def test_like_search_is_default(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, LikeSearch(), search='chumbucket')
+    assert output['recordsFiltered'] == 2
+
+
+def _compile_global_search(strategy: SearchStrategy, table: FromClause, dialect: Any) -> str:
+    columns: list[tuple[int, Any]] = [(1, table.c.username), (2, table.c.email_address)]
+    predicate: SearchPredicate | None = strategy.global_search(columns, 'sponge bob', False)
+    assert predicate is not None
+    stmt: Select[Any] = select(table.c.id).where(predicate.build())
+    return str(stmt.compile(dialect=dialect))
+
+
+def test_postgres_full_text_search(table: FromClause) -> None:
+    sql: str = _compile_global_search(PostgresFullTextSearch(config='english'), table, postgresql.dialect())
+    assert (
+        'to_tsvector(%(to_tsvector_1)s, concat_ws(%(concat_ws_1)s, users.username, users.email_address)) '
+        '@@ plainto_tsquery(%(plainto_tsquery_1)s, %(dt_search)s)'
+    ) in sql
+    sql = _compile_global_search(PostgresFullTextSearch(document=table.c.fullname), table, postgresql.dialect())
+    assert 'users.fullname @@ plainto_tsquery' in sql
+
+
+def test_mysql_full_text_search(table: FromClause) -> None:
+    strategy: MySQLFullTextSearch = MySQLFullTextSearch()
+    sql: str = _compile_global_search(strategy, table, mysql.dialect())
+    assert 'MATCH (users.username, users.email_address) AGAINST (%s IN BOOLEAN MODE)' in sql
+    assert strategy.get_query('sponge  +bob* -') == '+sponge* +bob*'
+
+
+def test_full_text_search_shape(table: FromClause) -> None:
+    columns: list[tuple[int, Any]] = [(1, table.c.username), (2, table.c.email_address)]
+
+    def shape(strategy: SearchStrategy) -> Any:
+        predicate: SearchPredicate | None = strategy.global_search(columns, 'bob', False)
+        assert predicate is not None
+        return predicate.shape
+
+    # the configuration shapes the criterion, definitions sharing a statement cache do not get each others statements
+    assert shape(PostgresFullTextSearch()) == shape(PostgresFullTextSearch())
+    assert shape(PostgresFullTextSearch()) != shape(PostgresFullTextSearch(config='english'))
+    assert shape(PostgresFullTextSearch()) != shape(PostgresFullTextSearch(document=table.c.fullname))
+    assert shape(SQLiteFullTextSearch('users_fts', table.c.id)) != shape(SQLiteFullTextSearch('other_fts', table.c.id))
+    assert shape(MySQLFullTextSearch()) != shape(MySQLFullTextSearch(columns=[table.c.username]))
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,84 @@
+import json
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables import serialize
+from datatables.base import DTDataCallbacks
+from datatables.datatable import DataTable
+from datatables.serialize import dump_json
+from datatables.serialize import dump_json_bytes
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+values: dict[str, Any] = {
+    'day': date(2024, 1, 5),
+    'time': datetime(2024, 1, 5, 10, 30, 15, 250),
+    'price': Decimal('12.50'),
+    'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+}
+expected: dict[str, Any] = {
+    'day': '2024-01-05',
+    'time': '2024-01-05T10:30:15.000250',
+    'price': '12.50',
+    'uuid': '12345678-1234-5678-1234-567812345678',
+}
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def test_datatable_array_rows(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='chumbucket')
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, array_rows=True
+    )
+    output: dict[str, Any] = datatable.output_result()
+    assert output['data'] == [
+        [11, 'plankton', 'plankton@chumbucket.com', 'Sheldon Plankton', 'green'],
+        [12, 'karen', 'karen@chumbucket.com', 'Karen Plankton', 'metal'],
+    ]
+    assert json.loads(datatable.output_json()) == output
+
+
+def test_datatable_array_rows_callbacks(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    datatable: DataTable = DataTable(
+        request_params=create_query_params(column_names=column_names),
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        callbacks=DTDataCallbacks(),
+        array_rows=True,
+    )
+    assert 'array_rows' in datatable.output_result()['error']
+
+
+def test_dump_json() -> None:
+    assert json.loads(dump_json(values)) == expected
+    assert json.loads(dump_json_bytes(values)) == expected
+    with pytest.raises(TypeError):
+        dump_json({'value': object()})
+
+
+def test_dump_json_bytes_without_fast_encoders(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serialize, '_orjson', None)
+    monkeypatch.setattr(serialize, '_msgspec_json', None)
+    assert json.loads(dump_json_bytes(values)) == expected
+
+
+if __name__ == '__main__':
+    pytest.main()
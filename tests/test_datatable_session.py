@@ -0,0 +1,70 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import sessionmaker
+
+from datatables.datatable import DataTable
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import file_engine
+from tests.fixtures import table
+from tests.models import User
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert column_names is not None
+    assert table is not None
+    assert file_engine is not None
+
+
+def _output(table: FromClause, column_names: list[str], **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names)
+    return DataTable(request_params=query_params, table=table, column_names=column_names, **kwargs).output_result()
+
+
+def test_datatable_external_session(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    with Session(file_engine) as session:
+        session.add(User(username='nat', fullname='Nat Peterson', email_address='nat@bikinibottom.org', color='blue'))
+        session.flush()
+        output: dict[str, Any] = _output(table, column_names, session=session)
+        # the pending row of the request scoped session is counted
+        assert output['recordsTotal'] == 21
+        assert session.is_active
+        session.rollback()
+    assert _output(table, column_names, engine=file_engine)['recordsTotal'] == 20
+
+
+def test_datatable_external_connection(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    with file_engine.connect() as connection:
+        connection.execute(
+            User.__table__.insert().values(
+                username='nat', fullname='Nat Peterson', email_address='nat@bikinibottom.org', color='blue'
+            )
+        )
+        assert _output(table, column_names, session=connection)['recordsTotal'] == 21
+        # the transaction of the connection is neither committed nor closed
+        assert connection.in_transaction()
+        connection.rollback()
+    assert _output(table, column_names, engine=file_engine)['recordsTotal'] == 20
+
+
+def test_datatable_session_factory(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    output: dict[str, Any] = _output(table, column_names, session=sessionmaker(file_engine))
+    assert 'error' not in output
+    assert output['recordsTotal'] == 20
+    assert len(output['data']) == 10
+
+
+def test_datatable_engine_or_session(file_engine: Engine, table: FromClause, column_names: list[str]) -> None:
+    with pytest.raises(ValueError):
+        _output(table, column_names)
+    with pytest.raises(ValueError):
+        _output(table, column_names, engine=file_engine, session=sessionmaker(file_engine))
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,91 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy.sql.elements import ColumnElement
+
+from datatables.cache import MemoryCacheBackend
+from datatables.datatable import DataTable
+from datatables.search import LikeSearch
+from datatables.search import SearchPredicate
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def _output(
+    engine: Engine,
+    column_names: list[str],
+    table: FromClause,
+    cache: MemoryCacheBackend,
+    color: str = '',
+    **kwargs: Any,
+) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    query_params[f'columns[{column_names.index("color")}][search][value]'] = color
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, statement_cache=cache
+    )
+    return datatable.output_result()
+
+
+def test_datatable_statement_cache(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    cache: MemoryCacheBackend = MemoryCacheBackend()
+    assert _output(engine, column_names, table, cache, search='bikinibottom.org')['recordsFiltered'] == 8
+    assert len(cache) == 1
+    # same request shape with another search value reuses the cached statement
+    assert _output(engine, column_names, table, cache, search='chumbucket')['recordsFiltered'] == 2
+    assert _output(engine, column_names, table, cache, search='no such user')['recordsFiltered'] == 0
+    assert len(cache) == 1
+
+    # another order, no search and a column search have different statements
+    output: dict[str, Any] = _output(
+        engine, column_names, table, cache, search='chumbucket', order=[{'column': 0, 'dir': 'desc'}]
+    )
+    assert [row['id'] for row in output['data']] == [12, 11]
+    assert _output(engine, column_names, table, cache)['recordsFiltered'] == 20
+    assert _output(engine, column_names, table, cache, color='red')['recordsFiltered'] == 6
+    assert _output(engine, column_names, table, cache, color='pink')['recordsFiltered'] == 4
+    assert len(cache) == 4
+
+
+class CountingSearch(LikeSearch):
+    def __init__(self) -> None:
+        self.calls: int = 0
+
+    def global_search(
+        self, columns: list[tuple[int, ColumnElement[Any]]], value: str, regex: bool
+    ) -> SearchPredicate | None:
+        self.calls += 1
+        return super().global_search(columns, value, regex)
+
+    def column_search(self, index: int, column: ColumnElement[Any], value: str, regex: bool) -> SearchPredicate | None:
+        self.calls += 1
+        return super().column_search(index, column, value, regex)
+
+
+def test_datatable_search_predicates_built_once(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    strategy: CountingSearch = CountingSearch()
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom.org')
+    query_params[f'columns[{column_names.index("color")}][search][value]'] = 'yellow'
+    output: dict[str, Any] = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, search_strategy=strategy
+    ).output_result()
+    assert output['recordsFiltered'] == 3
+    # the global and the column search predicates are built once per request
+    assert strategy.calls == 2
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,86 @@
+import json
+from typing import Any
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables.base import DTDataCallbacks
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def test_datatable_stream_result(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='bikinibottom.org', length=-1)
+    expected: dict[str, Any] = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table
+    ).output_result()
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, stream=True, yield_per=3
+    )
+    # only the counts are queried by the constructor
+    assert datatable.data == []
+    assert datatable.records_filtered == 8
+    chunks: list[str] = list(datatable.stream_result())
+    # head, 3 batches of at most 3 rows and tail
+    assert len(chunks) == 5
+    assert json.loads(''.join(chunks)) == expected
+
+
+def test_datatable_stream_result_callbacks_and_cursor(
+    engine: Engine, column_names: list[str], table: FromClause
+) -> None:
+    callbacks: DTDataCallbacks = DTDataCallbacks()
+    callbacks.set_row_id_getter(lambda row: str(row['id']))
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table,
+        column_names=column_names,
+        engine=engine,
+        callbacks=callbacks,
+        keyset_column='id',
+        yield_per=2,
+    )
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, length=5)
+    output: dict[str, Any] = json.loads(''.join(definition.stream(query_params)))
+    assert output == json.loads(json.dumps(definition.execute(query_params)))
+    assert [row['DT_RowId'] for row in output['data']] == ['1', '2', '3', '4', '5']
+    assert output['cursor']
+
+
+def test_datatable_stream_result_closed_early(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, yield_per=1
+    )
+    chunks: Iterator[str] = definition.stream(create_query_params(column_names=column_names, length=-1))
+    assert next(chunks).endswith('"data":[')
+    assert json.loads(next(chunks))['id'] == 1
+    # closing the iterator releases the session
+    chunks.close()
+
+
+def test_datatable_stream_result_error(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search='^(', regex=True)
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, stream=True
+    )
+    output: dict[str, Any] = json.loads(''.join(datatable.stream_result()))
+    assert output['error']
+    assert output['data'] == []
+
+
+if __name__ == '__main__':
+    pytest.main()
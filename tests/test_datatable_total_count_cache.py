@@ -0,0 +1,48 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables.cache import TotalCountCache
+from datatables.datatable import DataTable
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def test_datatable_total_count_cache(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    cache: TotalCountCache = TotalCountCache()
+    query_params: dict[str, Any] = create_query_params(column_names=column_names)
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, total_count_cache=cache
+    )
+    assert datatable.output_result()['recordsTotal'] == 20
+    assert cache.get(table) == 20
+
+    # the cached count is served without counting again
+    cache.set(table, 42)
+    datatable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, total_count_cache=cache
+    )
+    assert datatable.output_result()['recordsTotal'] == 42
+
+    cache.invalidate(table)
+    datatable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, total_count_cache=cache
+    )
+    assert datatable.output_result()['recordsTotal'] == 20
+
+
+if __name__ == '__main__':
+    pytest.main()
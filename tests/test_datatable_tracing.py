@@ -0,0 +1,149 @@
+import logging
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import Select
+
+from datatables import DTDataCallbacks
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from datatables.tracing import CallbackTracer
+from datatables.tracing import DTTracer
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+class RecordingTracer(CallbackTracer):
+    def __init__(self) -> None:
+        super().__init__(self.record)
+        self.phases: list[tuple[str, float, dict[str, Any]]] = []
+
+    def record(self, phase: str, duration: float, attributes: dict[str, Any]) -> None:
+        self.phases.append((phase, duration, attributes))
+
+    def attributes(self, phase: str) -> dict[str, Any]:
+        return next(attributes for name, _, attributes in self.phases if name == phase)
+
+
+def test_datatable_tracing(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    tracer: RecordingTracer = RecordingTracer()
+    callbacks: DTDataCallbacks = DTDataCallbacks()
+    callbacks.set_row_id_getter(lambda row: f'row_{row["id"]}')  # noqa: Q001
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, callbacks=callbacks, tracer=tracer
+    )
+    output: dict[str, Any] = definition.execute(create_query_params(column_names, search='SquarePants', length=2))
+    assert len(output['data']) == 2
+
+    assert [phase for phase, _, _ in tracer.phases] == [
+        'parse',
+        'total_count',
+        'filtered_count',
+        'data',
+        'callbacks',
+        'request',
+    ]
+    assert all(duration >= 0 for _, duration, _ in tracer.phases)
+    assert tracer.attributes('total_count') == {'records_total': 20, 'approximate': False}
+    filtered: dict[str, Any] = tracer.attributes('filtered_count')
+    assert filtered['records_filtered'] == 3
+    assert filtered['params'] == {'dt_search': '%SquarePants%'}
+    data: dict[str, Any] = tracer.attributes('data')
+    # the statement is passed as is, it is only compiled by str()
+    assert isinstance(data['sql'], Select)
+    # the first page has no offset
+    assert str(data['sql']).endswith('LIMIT :param_1')
+    assert data['params'] == {'dt_search': '%SquarePants%'}
+    assert data['rows'] == 2
+    assert tracer.attributes('callbacks') == {'rows': 2}
+    assert tracer.attributes('request') == {'records_total': 20, 'records_filtered': 3, 'rows': 2, 'cached': False}
+
+
+def test_datatable_tracing_error(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    tracer: RecordingTracer = RecordingTracer()
+    query_params: dict[str, Any] = create_query_params(column_names, length=100)
+    output: dict[str, Any] = DataTable(
+        request_params=query_params,
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        tracer=tracer,
+        max_page_size=10,
+        clamp_limits=False,
+    ).output_result()
+    assert output['errorCode'] == 'page_size_exceeded'
+    assert [phase for phase, _, _ in tracer.phases] == ['parse', 'request']
+    assert tracer.attributes('request')['error'] == output['error']
+
+
+def test_datatable_tracing_stream(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    tracer: RecordingTracer = RecordingTracer()
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, engine=engine, tracer=tracer, yield_per=5
+    )
+    chunks: list[str] = list(definition.stream(create_query_params(column_names, length=-1)))
+    assert len(chunks) == 6
+    # the data is traced while it is streamed, after the request span of the counts
+    assert [phase for phase, _, _ in tracer.phases] == ['parse', 'total_count', 'request', 'data']
+    assert tracer.attributes('data')['rows'] == 20
+
+
+def test_datatable_tracing_disabled(
+    engine: Engine, column_names: list[str], table: FromClause, caplog: pytest.LogCaptureFixture
+) -> None:
+    definition: DataTableDefinition = DataTableDefinition(table=table, column_names=column_names, engine=engine)
+    assert type(definition.tracer) is DTTracer
+    assert not definition.tracer.start_span('data').recording
+    with caplog.at_level(logging.INFO):
+        assert len(definition.execute(create_query_params(column_names))['data']) == 10
+    # the statement is logged lazily, rendered by the enabled log handler
+    assert any(record.getMessage().startswith('stmt: SELECT') for record in caplog.records)
+
+
+def test_opentelemetry_tracer(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    from datatables.tracing import OpenTelemetryTracer
+
+    exporter: InMemorySpanExporter = InMemorySpanExporter()
+    provider: TracerProvider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table,
+        column_names=column_names,
+        engine=engine,
+        tracer=OpenTelemetryTracer(provider.get_tracer('datatables')),
+    )
+    definition.execute(create_query_params(column_names, search='SquarePants'))
+    spans: dict[str, Any] = {span.name: span for span in exporter.get_finished_spans()}
+    assert set(spans) == {
+        'datatables.request',
+        'datatables.parse',
+        'datatables.total_count',
+        'datatables.filtered_count',
+        'datatables.data',
+    }
+    request_id: int = spans['datatables.request'].context.span_id
+    assert all(span.parent.span_id == request_id for name, span in spans.items() if name != 'datatables.request')
+    assert spans['datatables.data'].attributes['db.statement'].startswith('SELECT')
+    assert spans['datatables.data'].attributes['datatables.rows'] == 3
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,77 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from datatables.datatable import DataTable
+from datatables.datatable import DataTableDefinition
+from datatables.search import SearchPredicate
+from datatables.search import TrigramSearch
+from datatables.search import trigram_index_ddl
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+
+
+def _output(engine: Engine, column_names: list[str], table: FromClause, **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    datatable: DataTable = DataTable(
+        request_params=query_params,
+        engine=engine,
+        column_names=column_names,
+        table=table,
+        search_strategy=TrigramSearch(),
+    )
+    return datatable.output_result()
+
+
+def test_datatable_trigram_search(engine: Engine, column_names: list[str], table: FromClause) -> None:
+    # contains search, case insensitive
+    assert _output(engine, column_names, table, search='SQUAREPANTS')['recordsFiltered'] == 3
+    assert _output(engine, column_names, table, search='ChumBucket')['recordsFiltered'] == 2
+    # like wildcards are searched for literally
+    assert _output(engine, column_names, table, search='%')['recordsFiltered'] == 0
+
+
+def test_trigram_search_postgresql(table: FromClause) -> None:
+    columns: list[tuple[int, Any]] = [(1, table.c.username), (2, table.c.email_address)]
+    predicate: SearchPredicate | None = TrigramSearch().global_search(columns, '50%', False)
+    assert predicate is not None
+    assert predicate.params == {'dt_search': '%50\\%%'}
+    sql: str = str(select(table.c.id).where(predicate.build()).compile(dialect=postgresql.dialect()))
+    assert "users.username ILIKE %(dt_search)s ESCAPE '\\\\' OR users.email_address ILIKE %(dt_search)s" in sql
+
+    similar: SearchPredicate | None = TrigramSearch(similarity=True).global_search(columns, 'spongbob', False)
+    assert similar is not None and similar.shape != predicate.shape
+    assert similar.params == {'dt_search': 'spongbob'}
+    sql = str(select(table.c.id).where(similar.build()).compile(dialect=postgresql.dialect()))
+    assert '(users.username %% %(dt_search)s) OR (users.email_address %% %(dt_search)s)' in sql
+
+
+def test_trigram_index_ddl(column_names: list[str], table: FromClause) -> None:
+    definition: DataTableDefinition = DataTableDefinition(
+        table=table, column_names=column_names, searchable_columns=['id', 'username', 'fullname']
+    )
+    assert trigram_index_ddl(definition) == [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_trgm ON users USING gin (username gin_trgm_ops)',
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_fullname_trgm ON users USING gin (fullname gin_trgm_ops)',
+    ]
+    assert trigram_index_ddl(definition, concurrently=False)[1].startswith('CREATE INDEX IF NOT EXISTS')
+
+
+if __name__ == '__main__':
+    pytest.main()
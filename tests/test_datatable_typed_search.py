@@ -0,0 +1,152 @@
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from sqlalchemy import Boolean
+from sqlalchemy import Column
+from sqlalchemy import Date
+from sqlalchemy import DateTime
+from sqlalchemy import Engine
+from sqlalchemy import Enum
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import Numeric
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import select
+from sqlalchemy.future import create_engine
+
+from datatables.datatable import DataTable
+from datatables.search import SearchPredicate
+from datatables.search import TypedSearch
+from tests.fixtures import create_query_params
+
+metadata: MetaData = MetaData()
+orders: Table = Table(
+    'orders',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('customer', String(50)),
+    Column('total', Numeric(10, 2)),
+    Column('ordered_on', Date),
+    Column('shipped_at', DateTime),
+    Column('status', Enum('open', 'shipped', 'reopened', name='status')),
+    Column('paid', Boolean),
+)
+column_names: list[str] = ['id', 'customer', 'total', 'ordered_on', 'shipped_at', 'status', 'paid']
+rows: list[dict[str, Any]] = [
+    {
+        'id': 1,
+        'customer': 'spongebob',
+        'total': Decimal('12.50'),
+        'ordered_on': date(2024, 1, 5),
+        'shipped_at': datetime(2024, 1, 6, 10, 30),
+        'status': 'shipped',
+        'paid': True,
+    },
+    {
+        'id': 2,
+        'customer': 'patrick',
+        'total': Decimal('3.00'),
+        'ordered_on': date(2024, 2, 1),
+        'shipped_at': None,
+        'status': 'open',
+        'paid': False,
+    },
+    {
+        'id': 3,
+        'customer': 'sandy',
+        'total': Decimal('2024.00'),
+        'ordered_on': date(2023, 12, 31),
+        'shipped_at': datetime(2024, 1, 2, 8, 0),
+        'status': 'reopened',
+        'paid': True,
+    },
+    {
+        'id': 12,
+        'customer': 'squid_ward',
+        'total': Decimal('12.00'),
+        'ordered_on': date(2024, 1, 31),
+        'shipped_at': datetime(2024, 2, 1, 0, 0),
+        'status': 'shipped',
+        'paid': False,
+    },
+]
+
+
+@pytest.fixture(scope='module')
+def typed_engine() -> Engine:
+    engine: Engine = create_engine(url='sqlite://')
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(orders.insert(), rows)
+    return engine
+
+
+def _ids(engine: Engine, search: str = '', **column_search: str) -> list[int]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, search=search)
+    for name, value in column_search.items():
+        query_params[f'columns[{column_names.index(name)}][search][value]'] = value
+    datatable: DataTable = DataTable(
+        request_params=query_params,
+        engine=engine,
+        column_names=column_names,
+        table=orders,
+        search_strategy=TypedSearch(),
+    )
+    output: dict[str, Any] = datatable.output_result()
+    assert 'error' not in output
+    return [row['id'] for row in output['data']]
+
+
+def test_typed_column_search(typed_engine: Engine) -> None:
+    assert _ids(typed_engine, id='12') == [12]
+    assert _ids(typed_engine, id='1..3') == [1, 2, 3]
+    assert _ids(typed_engine, total='12.5') == [1]
+    assert _ids(typed_engine, ordered_on='2024-01') == [1, 12]
+    assert _ids(typed_engine, ordered_on='2023') == [3]
+    assert _ids(typed_engine, ordered_on='2024-01-31..2024-02') == [2, 12]
+    assert _ids(typed_engine, shipped_at='2024-01-06') == [1]
+    assert _ids(typed_engine, shipped_at='2024-02-01T00:00:00') == [12]
+    assert _ids(typed_engine, status='open') == [2, 3]
+    assert _ids(typed_engine, paid='true') == [1, 3]
+    # strings match by prefix, like wildcards are searched for literally
+    assert _ids(typed_engine, customer='s') == [1, 3, 12]
+    assert _ids(typed_engine, customer='squid_') == [12]
+    assert _ids(typed_engine, customer='_') == []
+    # search values that no value of the column type can match filter out all rows
+    assert _ids(typed_engine, id='abc') == []
+    assert _ids(typed_engine, ordered_on='2024-13') == []
+
+
+def test_typed_global_search(typed_engine: Engine) -> None:
+    # 2024 matches the year of the dates, the total and no customer
+    assert _ids(typed_engine, search='2024') == [1, 2, 3, 12]
+    assert _ids(typed_engine, search='12') == [12]
+    assert _ids(typed_engine, search='pat') == [2]
+    assert _ids(typed_engine, search='xyz') == []
+
+
+def test_typed_global_search_skips_unmatchable_columns() -> None:
+    strategy: TypedSearch = TypedSearch()
+    columns: list[tuple[int, Any]] = [(i, orders.c[name]) for i, name in enumerate(column_names)]
+    predicate: SearchPredicate | None = strategy.global_search(columns, 'sandy', False)
+    assert predicate is not None
+    sql: str = str(select(orders.c.id).where(predicate.build()))
+    assert sql.endswith("WHERE orders.customer LIKE :dt_search_all_1 ESCAPE '\\'")
+    assert predicate.params == {'dt_search_all_1': 'sandy%'}
+    # the statement shape depends on the columns the value can match
+    other: SearchPredicate | None = strategy.global_search(columns, '42', False)
+    assert other is not None and other.shape != predicate.shape
+    assert strategy.global_search(columns, 'patrick', False).shape == predicate.shape
+
+
+def test_typed_search_contains(typed_engine: Engine) -> None:
+    strategy: TypedSearch = TypedSearch(prefix=False)
+    assert strategy.match(orders.c.customer, 'and') == ('like', ['%and%'])
+
+
+if __name__ == '__main__':
+    pytest.main()
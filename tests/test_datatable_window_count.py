@@ -0,0 +1,77 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy import FromClause
+
+from datatables.datatable import DataTable
+from tests.fixtures import column_names
+from tests.fixtures import create_query_params
+from tests.fixtures import engine
+from tests.fixtures import setup_db
+from tests.fixtures import statements
+from tests.fixtures import table
+
+
+@pytest.fixture(scope='function', autouse=True)
+def setup() -> None:
+    assert setup_db is not None
+    assert column_names is not None
+    assert table is not None
+    assert engine is not None
+    assert statements is not None
+
+
+def _output(engine: Engine, column_names: list[str], table: FromClause, **kwargs: Any) -> dict[str, Any]:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names, **kwargs)
+    datatable: DataTable = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table, window_count=True
+    )
+    return datatable.output_result()
+
+
+def test_datatable_unfiltered_skips_filtered_count(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    query_params: dict[str, Any] = create_query_params(column_names=column_names)
+    output: dict[str, Any] = DataTable(
+        request_params=query_params, engine=engine, column_names=column_names, table=table
+    ).output_result()
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 20
+    # total count and data only
+    assert len(statements) == 2
+
+
+def test_datatable_window_count(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, search='bikinibottom.org', length=5)
+    assert output['recordsTotal'] == 20
+    assert output['recordsFiltered'] == 8
+    assert len(output['data']) == 5
+    assert list(output['data'][0].keys()) == column_names
+    assert len(statements) == 2
+    assert 'OVER ()' in statements[1]
+
+
+def test_datatable_window_count_no_match(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, search='no such user')
+    assert output['recordsFiltered'] == 0
+    assert output['data'] == []
+    assert len(statements) == 2
+
+
+def test_datatable_window_count_page_past_end(
+    engine: Engine, column_names: list[str], table: FromClause, statements: list[str]
+) -> None:
+    output: dict[str, Any] = _output(engine, column_names, table, search='bikinibottom.org', start=10)
+    assert output['recordsFiltered'] == 8
+    assert output['data'] == []
+    assert len(statements) == 3
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -99,5 +99,43 @@ def test_dt_data_callbacks_set_2_getters(table_row: dict[str, Any]) -> None:
     assert table_row.get(DTKey.ROW_DATA) == row_data
 
 
+def test_dt_data_callbacks_getters_called_once(table_row: dict[str, Any]) -> None:
+    calls: list[str] = []
+
+    def getter(row: dict[str, Any]) -> str:
+        calls.append(row['code'])
+        return f'row_{row["pk"]}'
+
+    callbacks: DTDataCallbacks = DTDataCallbacks()
+    callbacks.set_row_id_getter(getter=getter)
+    callbacks.run(table_row)
+    assert table_row[DTKey.ROW_ID] == 'row_1'
+    assert calls == ['8000.1']
+
+
+def test_dt_data_callbacks_batch_callback(table_row: dict[str, Any]) -> None:
+    batches: list[list[dict[str, Any]]] = []
+
+    def batch_callback(rows: list[dict[str, Any]]) -> None:
+        batches.append(rows)
+        # e.g. one lookup for all rows
+        names: dict[int, str] = {row['pk']: row['name'].upper() for row in rows}
+        for row in rows:
+            row[DTKey.ROW_ATTR] = {'title': names[row['pk']]}
+
+    callbacks: DTDataCallbacks = DTDataCallbacks()
+    callbacks.set_row_class_getter(getter=lambda row: 'child' if row['parent_code'] else '')
+    callbacks.set_batch_callback(callback=batch_callback)
+    assert callbacks.batch_callback is batch_callback
+    rows: list[dict[str, Any]] = [table_row, {**table_row, 'pk': 2, 'parent_code': '', 'name': 'bar'}]
+    callbacks.run_batch(rows)
+    assert len(batches) == 1
+    assert [row.get(DTKey.ROW_CLASS) for row in rows] == ['child', None]
+    assert [row[DTKey.ROW_ATTR] for row in rows] == [{'title': 'FOO'}, {'title': 'BAR'}]
+    # no call for an empty page
+    callbacks.run_batch([])
+    assert len(batches) == 1
+
+
 if __name__ == '__main__':
     pytest.main()